@@ -0,0 +1,5865 @@
+# hash_generator.py - the whole program; Hash_Generator_v3.0.py only launches it, so that this
+# module is imported (its compiled bytecode cached in __pycache__) instead of compiled on every run.
+
+from __future__ import annotations
+
+import os
+import sys
+import csv
+import json
+import stat
+import errno
+import time
+import hashlib
+import zlib
+import mmap
+import datetime
+import contextlib
+import functools
+import importlib
+import importlib.machinery
+import importlib.util
+import queue
+import threading
+import atexit
+from pathlib import Path
+TYPE_CHECKING = False  # the names below only appear in annotations (never evaluated: see the __future__ import),
+if TYPE_CHECKING:      # so importing typing (~5 ms, a tenth of a CLI run) is left to type checkers
+    from typing import Optional, Callable, List, Dict, Iterable, Iterator, Any
+
+# GUI libs: imported by _load_gui() only when the window is opened, so the CLI
+# runs on headless servers and doesn't pay for the Tk stack at startup.
+tk = filedialog = messagebox = ttk = ctk = None
+
+def _load_gui():
+    global tk, filedialog, messagebox, ttk, ctk
+    if ctk is not None:
+        return
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
+    try:
+        import customtkinter as ctk
+    except Exception as e:
+        raise RuntimeError("Este programa requiere customtkinter. Instálalo con `pip install customtkinter`. Error: " + str(e))
+
+# optional libs: availability is checked cheaply at startup, the import happens on first use
+_OPTIONAL_MODULES: Dict[str, Any] = {}
+
+def _module_available(name: str) -> bool:
+    """Whether name is installed; a dotted name is looked up in its package's folders without importing the package."""
+    try:
+        top, _, rest = name.partition('.')
+        spec = importlib.util.find_spec(top)
+        for part in rest.split('.') if rest else ():
+            if spec is None or not spec.submodule_search_locations:
+                return False
+            spec = importlib.machinery.PathFinder.find_spec(f"{spec.name}.{part}", list(spec.submodule_search_locations))
+        return spec is not None
+    except Exception:
+        return False
+
+def _optional_import(name: str):
+    """Import an optional dependency the first time it's needed; None if it isn't installed."""
+    if name not in _OPTIONAL_MODULES:
+        try:
+            _OPTIONAL_MODULES[name] = importlib.import_module(name)
+        except Exception:
+            _OPTIONAL_MODULES[name] = None
+    return _OPTIONAL_MODULES[name]
+
+# --------------------------- Config ---------------------------
+CHUNK = 4 * 1024 * 1024
+DEFAULT_WORKERS = max(1, min(8, os.cpu_count() or 1))
+EXEC_MODES = ["Hilos", "Procesos"]  # thread pool (GIL released by hashlib) / process pool (pure-Python or GIL-bound hashers)
+EXEC_MODE_AUTO = "Auto"  # per job: processes if an algorithm holds the GIL (Algorithm.releases_gil), else threads
+PROCESS_BUNDLE_BYTES = 64 * 1024 * 1024  # process mode ships work in bundles of ~this many bytes...
+PROCESS_BUNDLE_FILES = 512               # ...or this many files, whichever comes first
+IO_BACKENDS = ["auto", "read", "readinto", "mmap", "readahead"]
+MMAP_MIN_SIZE = 256 * 1024 * 1024  # "auto" maps regular files at least this big, smaller ones use readinto
+READAHEAD_DEPTH = 4  # "readahead": buffers a reader thread may fill ahead of the hasher
+NETWORK_FS_TYPES = ("nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "fuse.sshfs", "afs", "ceph", "glusterfs")  # "auto" reads these ahead
+
+SYMLINK_POLICIES = ["files", "skip", "follow"]  # hash links to files only / ignore all links / also descend linked dirs
+WALK_QUEUE_SIZE = 4096  # paths the directory walker may run ahead of the hashing pool
+PROGRESS_HZ = 10  # progress callbacks / UI refreshes per second, at most
+BATCH_VIEW_ROWS = 30        # batch table rows rendered until the widget reports its real height
+BATCH_IMPORT_CHUNK = 5000   # paths handed from a folder/list import thread to the UI at a time
+SAMPLE_BLOCK = 64 * 1024  # sampled-block fingerprint: SAMPLE_COUNT blocks of this size...
+SAMPLE_COUNT = 8          # ...at head, tail and evenly spaced offsets
+DEDUPE_EDGE = 16 * 1024  # duplicate finder: the partial hash reads this many bytes at the head and at the tail
+DEDUPE_BATCH = 1024      # files partially hashed per thread-pool round
+COMPARE_METHODS = ["bytes", "hash", "sample"]  # lockstep byte comparison, stops at the first difference / both files hashed at once / sampled fingerprints only
+COMPARE_METHOD_LABELS = {"Bytes (para en la 1ª diferencia)": "bytes", "Hash de ambos en paralelo": "hash", "Huella rápida (muestreo)": "sample"}
+ARCHIVE_SEP = "!"  # archive members are recorded as "bundle.zip!dir/file.txt"
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+VERIFY_LEVELS = ["full", "sample", "quick"]  # stat -> sample -> full hash / stat -> sample / stat + mtime
+VERIFY_LEVEL_LABELS = {"Completa": "full", "Muestreo": "sample", "Rápida (stat)": "quick"}
+
+# Runtime engine settings (changed from the Config tab / CLI flags, copied into process-pool workers)
+ENGINE_SETTINGS: Dict[str, Any] = {
+    'io_backend': "auto",
+    'drop_cache': True,  # posix_fadvise(DONTNEED) behind the read position so hashing doesn't evict the page cache
+    'cache': True,        # consult/store the persistent digest cache
+    'cache_trust': True,  # False = "forzar recálculo": always hash, but refresh the cache
+    'audit_backend': "csv",
+    'chunk_size': CHUNK,  # read size; a value tuned by the benchmark is loaded from SETTINGS_FILE
+    'readahead_depth': READAHEAD_DEPTH,
+}
+LOGS_DIR = Path("logs")
+LOGS_DIR.mkdir(exist_ok=True)
+SETTINGS_FILE = LOGS_DIR / "settings.json"
+PERSISTED_SETTINGS = ('chunk_size', 'readahead_depth')  # ENGINE_SETTINGS keys kept across runs
+AUDIT_CSV = LOGS_DIR / "audit_log.csv"
+AUDIT_JSONL = LOGS_DIR / "audit_log.jsonl"
+AUDIT_DB = LOGS_DIR / "audit_log.sqlite3"
+AUDIT_BACKENDS = ["csv", "jsonl", "sqlite"]
+AUDIT_FIELDS = ["timestamp","algorithm","path_or_text","type","size_bytes","duration","hash"]
+AUDIT_QUEUE_MAX = 10000        # rows waiting for the writer thread; append_audit blocks beyond this
+AUDIT_FLUSH_ROWS = 500         # write a batch every this many rows...
+AUDIT_FLUSH_SECONDS = 1.0      # ...or this long after the first pending row
+AUDIT_MAX_BYTES = 50 * 1024 * 1024  # csv/jsonl are rotated to audit_log.1.csv ... past this size
+AUDIT_KEEP = 5                 # rotated files kept
+AUDIT_HISTORY_SHOWN = 20       # entries listed by the Config tab's history dialog
+JOURNAL_FORMAT = "hash-generator-journal"
+JOURNAL_SUFFIX = ".journal"  # a manifest's resume journal sits next to it: manifest.jsonl.journal
+BATCH_JOURNAL = LOGS_DIR / "batch.journal"
+BATCH_FILE_LIST = LOGS_DIR / "batch.files"  # GUI: the journaled batch's file list, one JSON [path, size] per line
+PENDING_MANIFEST = LOGS_DIR / "pending_manifest.json"  # GUI: the manifest job in progress, offered for resuming at the next start
+MONITOR_SUFFIX = ".monitor"     # changes seen by the monitor, journaled next to the manifest until it's merged into it (on stop)
+MONITOR_INTERVAL = 30.0         # polling monitor (no inotify): seconds between stat passes over the tree...
+MONITOR_POLL_DUTY = 0.1         # ...stretched so the passes take at most this share of the time
+MONITOR_SETTLE = 1.0            # inotify: quiet time after the last event before the touched files are re-hashed
+MONITOR_BATCH_SECONDS = 30.0    # inotify: touched files are handed over at least this often while events keep coming
+DIGEST_CACHE_DB = LOGS_DIR / "digest_cache.sqlite3"
+DIGEST_CACHE_MAX_ENTRIES = 2_000_000  # LRU eviction beyond this many (file identity, algorithm) rows
+DIGEST_CACHE_FLUSH_ROWS = 500         # new digests / last_used touches committed together, every this many...
+DIGEST_CACHE_FLUSH_SECONDS = 1.0      # ...or this long after the first pending one (and at the end of a job)
+HASHSET_FORMAT = "hash-generator-hashset"
+HASHSET_MAGIC = b"HGHSET1\n"
+HASHSET_HEADER_SIZE = 4096  # magic + JSON header, space padded; the sorted fixed-width digests start here
+HASHSET_BLOOM_BITS = 10     # Bloom filter bits per digest...
+HASHSET_BLOOM_PROBES = 7    # ...and probes: about 1% of unknown digests get past it to the binary search
+
+def _load_saved_settings():
+    try:
+        with open(SETTINGS_FILE, 'r', encoding='utf-8') as fh:
+            saved = json.load(fh)
+    except (OSError, ValueError):
+        return
+    if isinstance(saved, dict):
+        ENGINE_SETTINGS.update({k: v for k, v in saved.items() if k in PERSISTED_SETTINGS and isinstance(v, type(ENGINE_SETTINGS[k]))})
+
+def save_engine_setting(key: str, value: Any):
+    """Set ENGINE_SETTINGS[key] and persist it to SETTINGS_FILE for the next runs."""
+    if key not in PERSISTED_SETTINGS:
+        raise Exception(f'Ajuste no persistente: {key}')
+    ENGINE_SETTINGS[key] = value
+    try:
+        with open(SETTINGS_FILE, 'r', encoding='utf-8') as fh:
+            saved = json.load(fh)
+    except (OSError, ValueError):
+        saved = {}
+    saved[key] = value
+    tmp = SETTINGS_FILE.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(saved, fh, indent=2)
+    os.replace(tmp, SETTINGS_FILE)
+
+_load_saved_settings()
+
+# Sampled fingerprint (sample_digest): BLAKE2b-128 of the size plus SAMPLE_COUNT blocks read with pread.
+# Constant cost per file, for triage only: equal fingerprints do NOT prove two files identical.
+FINGERPRINT_ALGO = "QUICK-FINGERPRINT"
+# Tree (Merkle) hashes: name -> (leaf algorithm, leaf size). The file is cut into leaves hashed
+# in parallel and combined pairwise into a root; the value is NOT the plain SHA256 of the file.
+TREE_ALGOS: Dict[str, tuple[str, int]] = {"SHA256-TREE-64M": ("SHA256", 64 * 1024 * 1024)}
+TREE_WORKERS = DEFAULT_WORKERS  # threads hashing leaves of one file (hashlib releases the GIL)
+TREE_MAX_RANGES_SHOWN = 5       # corrupted byte ranges listed in a verification detail
+# algorithm plugins: *.py files next to the program defining register(register_algorithm)
+PLUGINS_DIR = Path(sys.executable if getattr(sys, 'frozen', False) else __file__).resolve().parent / "plugins"
+
+# --------------------------- Helpers ---------------------------
+
+def ts() -> str:
+    """ISO timestamp (not for filenames)."""
+    return datetime.datetime.now().isoformat()
+
+def safe_timestamp() -> str:
+    """Timestamp safe to use in filenames on Windows: YYYYMMDD_HHMMSS"""
+    return datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+# failures of things working behind the caller's back (digest cache, audit writer) that the program
+# survives: the GUI shows them in a dialog, the CLI on stderr before exiting
+_background_errors: "queue.Queue[str]" = queue.Queue()
+
+def report_background_error(message: str):
+    _background_errors.put(message)
+
+def pending_background_errors() -> List[str]:
+    out = []
+    while True:
+        try:
+            out.append(_background_errors.get_nowait())
+        except queue.Empty:
+            return out
+
+class CRC32Hash:
+    def __init__(self):
+        self.value = 0
+    def update(self, data: bytes):
+        self.value = zlib.crc32(data, self.value)
+    def hexdigest(self):
+        return format(self.value & 0xFFFFFFFF, '08x')
+
+class Adler32Hash:
+    def __init__(self):
+        self.value = 1
+    def update(self, data: bytes):
+        self.value = zlib.adler32(data, self.value)
+    def hexdigest(self):
+        return format(self.value & 0xFFFFFFFF, '08x')
+
+@functools.lru_cache(maxsize=1)
+def _crc32c_table() -> tuple:
+    table = []
+    for n in range(256):
+        c = n
+        for _ in range(8):
+            c = (c >> 1) ^ 0x82F63B78 if c & 1 else c >> 1
+        table.append(c)
+    return tuple(table)
+
+def _crc32c_python(crc: int, data: bytes) -> int:
+    table = _crc32c_table()
+    crc ^= 0xFFFFFFFF
+    for b in bytes(data):
+        crc = table[(crc ^ b) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+@functools.lru_cache(maxsize=1)
+def _crc32c_extend() -> Callable[[int, bytes], int]:
+    """crc32c(crc, data): the 'crc32c' package (SSE4.2 / ARMv8 CRC instructions), else google-crc32c, else pure Python (slow)."""
+    mod = _optional_import('crc32c')
+    if mod is not None:
+        return lambda crc, data: mod.crc32c(data, crc)
+    mod = _optional_import('google_crc32c')
+    if mod is not None:
+        return lambda crc, data: mod.extend(crc, bytes(data))
+    return _crc32c_python
+
+class CRC32CHash:
+    """CRC-32C (Castagnoli, as in iSCSI / ext4 / cloud storage checksums)."""
+    def __init__(self):
+        self.value = 0
+        self._extend = _crc32c_extend()
+    def update(self, data: bytes):
+        self.value = self._extend(self.value, data)
+    def hexdigest(self):
+        return format(self.value & 0xFFFFFFFF, '08x')
+
+# --------------------------- Algorithm registry ---------------------------
+class Algorithm:
+    """
+    A registered hash algorithm. factory() returns a new hasher (update / hexdigest); it's only
+    called when the algorithm is used, so optional modules are imported then, not at startup.
+    requires: module that must be installed for the algorithm to be offered (found with find_spec,
+    not imported). releases_gil: whether hashing runs outside the GIL, so threads scale; otherwise
+    "Auto" execution mode uses processes (pick_exec_mode).
+    """
+    __slots__ = ('name', 'factory', 'digest_size', 'cryptographic', 'releases_gil', 'requires')
+
+    def __init__(self, name: str, factory: Callable[[], Any], digest_size: int, cryptographic: bool = True,
+                 releases_gil: bool = True, requires: Optional[str] = None):
+        self.name = name
+        self.factory = factory
+        self.digest_size = digest_size
+        self.cryptographic = cryptographic
+        self.releases_gil = releases_gil
+        self.requires = requires
+
+    def available(self) -> bool:
+        return self.requires is None or _module_available(self.requires)
+
+ALGORITHMS: Dict[str, Algorithm] = {}  # canonical name -> Algorithm, in registration order
+_ALGO_NAMES: Dict[str, str] = {}       # upper-case name -> canonical name
+SUPPORTED_ALGOS: List[str] = []        # registered and available, as offered in the menus / accepted by parse_algo_list
+
+def register_algorithm(name: str, factory: Callable[[], Any], digest_size: int, cryptographic: bool = True,
+                       releases_gil: bool = True, requires: Optional[str] = None) -> Algorithm:
+    """Add an algorithm (built-in or from a plugin); it's listed in SUPPORTED_ALGOS if requires is installed."""
+    if name.upper() in _ALGO_NAMES:
+        raise Exception(f'Algoritmo ya registrado: {name}')
+    algo = Algorithm(name, factory, digest_size, cryptographic, releases_gil, requires)
+    ALGORITHMS[name] = algo
+    _ALGO_NAMES[name.upper()] = name
+    if algo.available():
+        SUPPORTED_ALGOS.append(name)
+    return algo
+
+def _require(module: str, package: str):
+    """Import an optional module for a hasher factory, or explain what to install."""
+    mod = _optional_import(module)
+    if mod is None:
+        raise Exception(f'{module} no disponible (instala {package})')
+    return mod
+
+def _no_stream_hasher():
+    raise Exception(f'{FINGERPRINT_ALGO} lee bloques sueltos del archivo: no se puede calcular sobre un flujo de datos')
+
+for _name, _new, _size in (("MD5", hashlib.md5, 16), ("SHA1", hashlib.sha1, 20), ("SHA256", hashlib.sha256, 32), ("SHA512", hashlib.sha512, 64),
+                           ("BLAKE2b", hashlib.blake2b, 64), ("BLAKE2s", hashlib.blake2s, 32),
+                           ("SHA3-256", hashlib.sha3_256, 32), ("SHA3-512", hashlib.sha3_512, 64)):
+    register_algorithm(_name, _new, _size)  # hashlib releases the GIL on large buffers
+register_algorithm("Whirlpool", lambda: _require('Crypto.Hash.Whirlpool', 'pycryptodome').new(), 64, releases_gil=False,
+                   requires='Crypto.Hash.Whirlpool')  # not just 'Crypto': the old pycrypto has that package too
+register_algorithm("BLAKE3", lambda: _require('blake3', 'blake3').blake3(), 32, requires='blake3')
+register_algorithm("xxHash64", lambda: _require('xxhash', 'xxhash').xxh64(), 8, cryptographic=False, requires='xxhash')
+register_algorithm("XXH3-64", lambda: _require('xxhash', 'xxhash').xxh3_64(), 8, cryptographic=False, requires='xxhash')
+register_algorithm("XXH3-128", lambda: _require('xxhash', 'xxhash').xxh3_128(), 16, cryptographic=False, requires='xxhash')
+register_algorithm("CRC32", CRC32Hash, 4, cryptographic=False)  # zlib releases the GIL past 5 KB
+register_algorithm("CRC32C", CRC32CHash, 4, cryptographic=False,
+                   releases_gil=_module_available('crc32c') or _module_available('google_crc32c'))  # the pure-Python fallback holds it
+register_algorithm("Adler32", Adler32Hash, 4, cryptographic=False)
+for _name, (_base, _) in TREE_ALGOS.items():
+    register_algorithm(_name, lambda name=_name: TreeHash(name), ALGORITHMS[_base].digest_size)  # leaves hashed on threads
+register_algorithm(FINGERPRINT_ALGO, _no_stream_hasher, 16, cryptographic=False)  # sample_digest, BLAKE2b-128
+
+def plugin_files(folder: Path = PLUGINS_DIR) -> List[str]:
+    return [str(p) for p in sorted(folder.glob("*.py"))] if folder.is_dir() else []
+
+def load_plugins(paths: Iterable[str]) -> List[str]:
+    """
+    Import each plugin file and call its register(register_algorithm) to add algorithms,
+    e.g. register_algorithm("MURMUR3-128", lambda: ..., 16, cryptographic=False, requires="mmh3").
+    A plugin that fails is skipped; returns the error messages.
+    """
+    errors = []
+    for path in map(Path, paths):
+        try:
+            spec = importlib.util.spec_from_file_location(f"hashgen_plugin_{path.stem}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.register(register_algorithm)
+        except Exception as e:
+            errors.append(f"{path.name}: {e}")
+    return errors
+
+_plugins: Optional[List[str]] = None  # plugin files loaded in this process, None until they're first needed
+
+def ensure_plugins() -> List[str]:
+    """
+    Load the plugins once, when they're first needed: an algorithm name that isn't built in, the
+    `algorithms` listing, the GUI menus. Nothing from PLUGINS_DIR runs before that (nor for commands
+    that never ask). Failures are background errors. Returns the files, for process-pool workers.
+    """
+    global _plugins
+    if _plugins is None:
+        _plugins = plugin_files()
+        for err in load_plugins(_plugins):
+            report_background_error(f"Plugin omitido: {err}")
+    return _plugins
+
+def algorithm_info(algo: str) -> Algorithm:
+    """Registry entry for algo (canonical name, or any case)."""
+    info = ALGORITHMS.get(algo) or ALGORITHMS.get(_ALGO_NAMES.get(algo.upper(), ''))
+    if info is None and _plugins is None:
+        ensure_plugins()
+        info = ALGORITHMS.get(_ALGO_NAMES.get(algo.upper(), ''))
+    if info is None:
+        raise Exception('Algoritmo no soportado: '+algo)
+    return info
+
+def _init_hasher(algo: str):
+    info = ALGORITHMS.get(algo)  # canonical names (what parse_algo_list and the menus give) skip the case folding
+    return (info or algorithm_info(algo)).factory()
+
+def pick_exec_mode(mode: str, algos: Iterable[str]) -> str:
+    """EXEC_MODE_AUTO -> "Procesos" if one of algos holds the GIL while hashing, else "Hilos"; other modes are kept."""
+    if mode != EXEC_MODE_AUTO:
+        return mode
+    infos = [ALGORITHMS.get(_ALGO_NAMES.get((a or '').upper(), '')) for a in algos]
+    return "Hilos" if all(info is None or info.releases_gil for info in infos) else "Procesos"
+
+def parse_algo_list(text: str) -> List[str]:
+    """Parse 'SHA256, MD5 CRC32' into canonical names from SUPPORTED_ALGOS (order kept, no duplicates)."""
+    out = []
+    for tok in text.replace(';', ',').replace(' ', ',').split(','):
+        tok = tok.strip()
+        if not tok:
+            continue
+        a = _ALGO_NAMES.get(tok.upper())
+        if a is None and _plugins is None:
+            ensure_plugins()
+            a = _ALGO_NAMES.get(tok.upper())
+        if a is None or a not in SUPPORTED_ALGOS:
+            raise Exception('Algoritmo no soportado: '+tok)
+        if a not in out:
+            out.append(a)
+    return out
+
+# --------------------------- Digest cache ---------------------------
+class DigestCache:
+    """
+    Persistent digest cache (SQLite under LOGS_DIR).
+    Key = file identity (st_dev, st_ino, st_size, st_mtime_ns) + algorithm, value = hex digest.
+    Bounded by max_entries with least-recently-used eviction; hits/misses are counted per process.
+    Writes (new digests, last_used of hits) are committed in batches: flush() / close() to force them.
+    """
+    def __init__(self, db_path: Path = DIGEST_CACHE_DB, max_entries: int = DIGEST_CACHE_MAX_ENTRIES):
+        import sqlite3  # only paid for when the cache is used
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._new: Dict[tuple, str] = {}        # key -> digest, not committed yet
+        self._touched: Dict[tuple, float] = {}  # key -> last_used of a hit, not committed yet
+        self._first_pending: Optional[float] = None
+        self._conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS digests (
+            dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER, algorithm TEXT,
+            digest TEXT NOT NULL, last_used REAL NOT NULL,
+            PRIMARY KEY (dev, ino, size, mtime_ns, algorithm))""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS digests_lru ON digests(last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def identity(st: os.stat_result) -> tuple[int, int, int, int]:
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def get(self, st: os.stat_result, algo: str) -> Optional[str]:
+        key = self.identity(st) + (algo,)
+        with self._lock:
+            if key in self._new:
+                self.hits += 1
+                return self._new[key]
+            row = self._conn.execute("SELECT digest FROM digests WHERE dev=? AND ino=? AND size=? AND mtime_ns=? AND algorithm=?", key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            self._changed()
+            return row[0]
+
+    def put(self, st: os.stat_result, algo: str, digest: str):
+        key = self.identity(st) + (algo,)
+        with self._lock:
+            self._touched.pop(key, None)
+            self._new[key] = digest
+            self._changed()
+
+    def _changed(self):
+        # new digests and last_used touches are committed together, not one transaction per file
+        now = time.monotonic()
+        if self._first_pending is None:
+            self._first_pending = now
+        if len(self._new) + len(self._touched) >= DIGEST_CACHE_FLUSH_ROWS or now - self._first_pending >= DIGEST_CACHE_FLUSH_SECONDS:
+            self._flush()
+
+    def _flush(self):
+        self._first_pending = None
+        if not self._new and not self._touched:
+            return
+        now = time.time()
+        self._conn.executemany("INSERT OR REPLACE INTO digests VALUES (?,?,?,?,?,?,?)", [k + (d, now) for k, d in self._new.items()])
+        self._conn.executemany("UPDATE digests SET last_used=? WHERE dev=? AND ino=? AND size=? AND mtime_ns=? AND algorithm=?",
+                               [(t,) + k for k, t in self._touched.items()])
+        self._conn.commit()
+        added = len(self._new)
+        self._new.clear()
+        self._touched.clear()
+        if (self._puts + added) // 1000 != self._puts // 1000:
+            self._evict()
+        self._puts += added
+
+    def flush(self):
+        """Commit the digests and last_used touches still pending."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            # drop a little more than needed so eviction doesn't run on every insert
+            excess += self.max_entries // 20
+            self._conn.execute("DELETE FROM digests WHERE rowid IN (SELECT rowid FROM digests ORDER BY last_used LIMIT ?)", (excess,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._flush()
+            entries = self._conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def clear(self):
+        with self._lock:
+            self._new.clear()
+            self._touched.clear()
+            self._first_pending = None
+            self._conn.execute("DELETE FROM digests")
+            self._conn.commit()
+            self.hits = self.misses = 0
+
+_digest_cache: Optional[DigestCache] = None
+_digest_cache_pid: Optional[int] = None
+
+def get_digest_cache() -> Optional[DigestCache]:
+    """Per-process DigestCache, or None if disabled or the database can't be opened."""
+    global _digest_cache, _digest_cache_pid
+    if not ENGINE_SETTINGS['cache']:
+        return None
+    if _digest_cache is None or _digest_cache_pid != os.getpid():
+        try:
+            _digest_cache = DigestCache(DIGEST_CACHE_DB)
+            _digest_cache_pid = os.getpid()
+        except Exception as e:
+            ENGINE_SETTINGS['cache'] = False
+            report_background_error(f"Caché de hashes desactivada: no se pudo abrir {DIGEST_CACHE_DB}: {e}")
+            return None
+    return _digest_cache
+
+def flush_digest_cache():
+    """Commit this process's pending cache writes (end of a job or of a process-pool bundle)."""
+    if _digest_cache is not None and _digest_cache_pid == os.getpid():
+        try:
+            _digest_cache.flush()
+        except Exception as e:
+            report_background_error(f"Caché de hashes: {e}")
+
+def close_digest_cache():
+    """Flush and close the cache (registered with atexit)."""
+    global _digest_cache
+    if _digest_cache is not None and _digest_cache_pid == os.getpid():
+        with contextlib.suppress(Exception):
+            _digest_cache.close()
+    _digest_cache = None
+
+atexit.register(close_digest_cache)
+
+# --------------------------- I/O backends ---------------------------
+def _fadvise(fd: int, offset: int, length: int, advice_name: str):
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        pass
+
+def select_io_backend(path: str, size: int, backend: Optional[str] = None) -> str:
+    """Resolve 'auto' (or None = ENGINE_SETTINGS) to a concrete backend for this file."""
+    backend = backend or ENGINE_SETTINGS['io_backend']
+    if backend != "auto":
+        return backend
+    if is_network_path(path):
+        return "readahead"
+    if size >= MMAP_MIN_SIZE and os.path.isfile(path):
+        return "mmap"
+    return "readinto"
+
+@functools.lru_cache(maxsize=1)
+def _mount_table() -> tuple[tuple[str, str], ...]:
+    """(mount point, fs type) pairs from /proc/self/mounts, longest mount point first (empty off Linux)."""
+    try:
+        with open('/proc/self/mounts', 'r', encoding='utf-8', errors='replace') as fh:
+            mounts = [(ln.split()[1].replace('\\040', ' '), ln.split()[2]) for ln in fh if len(ln.split()) > 2]
+    except OSError:
+        return ()
+    return tuple(sorted(mounts, key=lambda m: len(m[0]), reverse=True))
+
+def is_network_path(path: str) -> bool:
+    """UNC paths, or (Linux) files on a NETWORK_FS_TYPES mount: high latency per read, worth reading ahead."""
+    if path.startswith(('\\\\', '//')):
+        return True
+    full = os.path.abspath(path)
+    for mnt, fstype in _mount_table():
+        if full == mnt or full.startswith(mnt.rstrip('/') + '/'):
+            return fstype in NETWORK_FS_TYPES
+    return False
+
+def _read_ahead(f, chunk_size: int, depth: int, stats: Optional[Dict[str, Any]] = None) -> Iterator[memoryview]:
+    """
+    Double-buffered reads: a reader thread fills up to `depth` buffers of a fixed ring while the
+    caller hashes the current one (readinto and hashlib both release the GIL, so they overlap).
+    Buffers are recycled: each yielded view is only valid until the next iteration.
+    stats (optional) gets 'read_time' (reader inside readinto) and 'reader_blocked' (reader waiting
+    for a free buffer, i.e. the hasher is the bottleneck).
+    """
+    ring = [bytearray(chunk_size) for _ in range(depth + 1)]
+    free: "queue.Queue[Optional[int]]" = queue.Queue()
+    filled: "queue.Queue[tuple[Any, int]]" = queue.Queue()
+    for i in range(len(ring)):
+        free.put(i)
+    stop = threading.Event()
+    times = {'read_time': 0.0, 'reader_blocked': 0.0}
+
+    def reader():
+        try:
+            while True:
+                t0 = time.perf_counter()
+                i = free.get()
+                t1 = time.perf_counter()
+                if i is None or stop.is_set():
+                    return
+                n = f.readinto(ring[i])
+                times['reader_blocked'] += t1 - t0
+                times['read_time'] += time.perf_counter() - t1
+                filled.put((i, n))
+                if not n:
+                    return
+        except BaseException as e:
+            filled.put((e, 0))
+
+    thread = threading.Thread(target=reader, name="read-ahead", daemon=True)
+    thread.start()
+    try:
+        while True:
+            i, n = filled.get()
+            if isinstance(i, BaseException):
+                raise i
+            if not n:
+                break
+            yield memoryview(ring[i])[:n]
+            free.put(i)
+    finally:
+        stop.set()
+        free.put(None)
+        thread.join()
+        if stats is not None:
+            stats.update(times)
+
+def read_file_chunks(path: str, backend: Optional[str] = None, chunk_size: Optional[int] = None,
+                     stats: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    Yield the content of path in chunk_size pieces using the chosen backend:
+      read      fresh bytes object per chunk (legacy path)
+      readinto  one preallocated bytearray reused for every chunk (memoryview slices)
+      mmap      memoryview slices of a read-only mapping
+      readahead ring of readahead_depth buffers filled by a reader thread (_read_ahead; stats gets its timings)
+    Buffers yielded by readinto/mmap/readahead are only valid until the next iteration: consume, don't keep.
+    """
+    chunk_size = chunk_size or ENGINE_SETTINGS['chunk_size']
+    drop_cache = ENGINE_SETTINGS['drop_cache']
+    with open(path, 'rb') as f:
+        fd = f.fileno()
+        size = os.fstat(fd).st_size
+        backend = select_io_backend(path, size, backend)
+        _fadvise(fd, 0, 0, 'POSIX_FADV_SEQUENTIAL')
+        offset = 0
+        if backend == "mmap" and size > 0:
+            mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            try:
+                if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                view = memoryview(mm)
+                while offset < size:
+                    n = min(chunk_size, size - offset)
+                    yield view[offset:offset + n]
+                    if drop_cache:
+                        _fadvise(fd, offset, n, 'POSIX_FADV_DONTNEED')
+                    offset += n
+                view.release()
+            finally:
+                try:
+                    mm.close()
+                except BufferError:
+                    pass  # a consumer still holds a slice; the mapping goes away with it
+        elif backend == "readahead":
+            with contextlib.closing(_read_ahead(f, chunk_size, max(1, int(ENGINE_SETTINGS['readahead_depth'])), stats)) as chunks:
+                for view in chunks:
+                    n = len(view)
+                    yield view
+                    if drop_cache:
+                        _fadvise(fd, offset, n, 'POSIX_FADV_DONTNEED')
+                    offset += n
+        elif backend == "readinto":
+            buf = bytearray(chunk_size)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                yield view[:n]
+                if drop_cache:
+                    _fadvise(fd, offset, n, 'POSIX_FADV_DONTNEED')
+                offset += n
+        else:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+                if drop_cache:
+                    _fadvise(fd, offset, len(chunk), 'POSIX_FADV_DONTNEED')
+                offset += len(chunk)
+
+def _pread(f, size: int, offset: int) -> bytes:
+    if hasattr(os, 'pread'):
+        return os.pread(f.fileno(), size, offset)
+    f.seek(offset)
+    return f.read(size)
+
+def sample_offsets(size: int, block: int = SAMPLE_BLOCK, count: int = SAMPLE_COUNT) -> List[int]:
+    """Head, tail and evenly spaced block offsets (the whole file when it's smaller than count blocks)."""
+    if size <= block * count:
+        return list(range(0, size, block))
+    step = (size - block) / (count - 1)
+    return [int(i * step) for i in range(count)]
+
+def sample_digest(path: str, size: Optional[int] = None) -> str:
+    """BLAKE2b-128 of the size plus sampled blocks: constant cost per file, NOT a full-content hash."""
+    if size is None:
+        size = os.path.getsize(path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(size.to_bytes(8, 'little'))
+    with open(path, 'rb') as f:
+        for off in sample_offsets(size):
+            h.update(_pread(f, SAMPLE_BLOCK, off))
+    return h.hexdigest()
+
+class SampleHasher:
+    """sample_digest of a stream of known size (an archive member): the sampled blocks are picked out as the data goes by."""
+    def __init__(self, size: int):
+        self._h = hashlib.blake2b(digest_size=16)
+        self._h.update(size.to_bytes(8, 'little'))
+        self._blocks = [(off, min(off + SAMPLE_BLOCK, size)) for off in sample_offsets(size)]
+        self._pos = 0
+
+    def update(self, data: bytes):
+        start, end = self._pos, self._pos + len(data)
+        self._pos = end
+        while self._blocks and self._blocks[0][0] < end:
+            a, b = self._blocks[0]
+            self._h.update(data[max(a, start) - start:min(b, end) - start])
+            if b > end:
+                break  # the rest of this block comes with the next chunk
+            self._blocks.pop(0)
+
+    def hexdigest(self) -> str:
+        return self._h.hexdigest()
+
+def benchmark_io_backends(path: str, algo: str = "SHA256", backends: Optional[List[str]] = None, repeat: int = 3,
+                          chunk_size: Optional[int] = None, cold: bool = False) -> List[Dict[str, Any]]:
+    """Hash path with each backend and report the best MB/s of `repeat` runs (cold: drop the file from the page cache first)."""
+    size = os.path.getsize(path)
+    out = []
+    for backend in backends or IO_BACKENDS[1:]:
+        best = None
+        for _ in range(max(1, repeat)):
+            if cold:
+                _drop_file_cache(path)
+            start = time.perf_counter()
+            h = _init_hasher(algo)
+            for chunk in read_file_chunks(path, backend, chunk_size):
+                h.update(chunk)
+            h.hexdigest()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        out.append({'backend': backend, 'algorithm': algo, 'size_bytes': size, 'seconds': best,
+                    'mb_s': (size / (1024 * 1024)) / best if best else 0.0})
+    return out
+
+def _drop_file_cache(path: str):
+    """Best effort: evict path from the page cache so the next read hits the disk (Linux; no-op elsewhere)."""
+    try:
+        with open(path, 'rb') as f:
+            _fadvise(f.fileno(), 0, 0, 'POSIX_FADV_DONTNEED')
+    except OSError:
+        pass
+
+# --------------------------- Progress ---------------------------
+MB = 1024 * 1024
+
+class ProgressMeter:
+    """
+    Byte counter for one file: update(n) after every chunk, callback(snapshot) at most
+    hz times per second and once more from finish(). Snapshot keys: done, total (bytes),
+    pct, mb_s (since the previous report), avg_mb_s, eta (seconds or None).
+    """
+    def __init__(self, total: int, callback: Optional[Callable[[Dict[str, Any]], None]] = None, hz: float = PROGRESS_HZ):
+        self.total = total
+        self.callback = callback
+        self.done = 0
+        self.mb_s = 0.0
+        self.interval = 1.0 / hz
+        self.start = self._last_t = time.monotonic()
+        self._last_done = 0
+        self._next = self.start + self.interval
+
+    def update(self, n: int) -> bool:
+        """Count n more bytes; True if a report was made (the caller may refresh its UI then)."""
+        self.done += n
+        now = time.monotonic()
+        if now < self._next:
+            return False
+        self._report(now)
+        return True
+
+    def finish(self, done: Optional[int] = None):
+        if done is not None:
+            self.done = done
+        self._report(time.monotonic())
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = now or time.monotonic()
+        elapsed = now - self.start
+        avg = self.done / elapsed / MB if elapsed > 0 else 0.0
+        remaining = max(0, self.total - self.done)
+        return {'done': self.done, 'total': self.total, 'pct': int(self.done * 100 / self.total) if self.total else 100,
+                'mb_s': self.mb_s, 'avg_mb_s': avg, 'eta': remaining / (avg * MB) if avg > 0 else None}
+
+    def _report(self, now: float):
+        dt = now - self._last_t
+        if dt > 0:
+            self.mb_s = (self.done - self._last_done) / dt / MB
+        self._last_t, self._last_done = now, self.done
+        self._next = now + self.interval
+        if self.callback:
+            self.callback(self.snapshot(now))
+
+class JobMetrics:
+    """
+    Totals of a HashJob, updated by its threads and read by the UI/CLI whenever it likes.
+    Files are counted as the job enumerates them; expect() fixes the totals up front when known.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.files_total = self.bytes_total = 0
+        self.files_done = self.bytes_done = 0
+        self.enumerated = False
+        self._expected = False
+        self._pending: Dict[Any, int] = {}  # in-flight key -> file size
+        self._partial: Dict[Any, int] = {}  # in-flight key -> bytes read so far
+        self.start = time.monotonic()
+        self._rate_t, self._rate_done, self._rate = self.start, 0, 0.0
+        self.io_wait = self.hash_time = 0.0  # summed over files that report them (hash_file_task results)
+
+    def expect(self, files: int, nbytes: int):
+        with self._lock:
+            self.files_total, self.bytes_total = files, nbytes
+            self._expected = self.enumerated = True
+
+    def add(self, key, nbytes: int):
+        with self._lock:
+            self._pending[key] = nbytes
+            if not self._expected:
+                self.files_total += 1
+                self.bytes_total += nbytes
+
+    def progress(self, key, done: int):
+        with self._lock:
+            if key in self._pending:
+                self._partial[key] = done
+
+    def file_done(self, key, value: Any = None):
+        with self._lock:
+            self._partial.pop(key, None)
+            self.bytes_done += self._pending.pop(key, 0)
+            self.files_done += 1
+            for v in (value if isinstance(value, list) else (value,)):  # a MultiResult counts each member
+                if isinstance(v, dict) and 'io_wait' in v:
+                    self.io_wait += v['io_wait']
+                    self.hash_time += sum(v.get('timings', {}).values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            done = self.bytes_done + sum(self._partial.values())
+            dt = now - self._rate_t
+            if dt >= 1.0 / PROGRESS_HZ:
+                # smoothed instantaneous rate, so a burst of cached files doesn't make it jump around
+                self._rate = 0.7 * self._rate + 0.3 * ((done - self._rate_done) / dt / MB)
+                self._rate_t, self._rate_done = now, done
+            elapsed = now - self.start
+            avg = done / elapsed / MB if elapsed > 0 else 0.0
+            eta = None
+            if self.enumerated and avg > 0:
+                eta = max(0, self.bytes_total - done) / (avg * MB)
+            return {'files_done': self.files_done, 'files_total': self.files_total, 'bytes_done': done,
+                    'bytes_total': self.bytes_total, 'mb_s': self._rate, 'avg_mb_s': avg, 'eta': eta,
+                    'elapsed': elapsed, 'enumerated': self.enumerated, 'io_wait': self.io_wait, 'hash_time': self.hash_time,
+                    'pct': int(done * 100 / self.bytes_total) if self.bytes_total else (100 if self.enumerated else 0)}
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    return (f"{h}:" if h else "") + f"{rem // 60:02d}:{rem % 60:02d}"
+
+def format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+def format_file_progress(snap: Dict[str, Any]) -> str:
+    return f"{snap['pct']}% - {snap['mb_s']:.0f} MB/s - ETA {format_eta(snap['eta'])}"
+
+def format_job_metrics(snap: Dict[str, Any]) -> str:
+    total = snap['files_total'] if snap['enumerated'] else f"{snap['files_total']}+"
+    return (f"{snap['files_done']}/{total} archivos — {format_bytes(snap['bytes_done'])} de {format_bytes(snap['bytes_total'])} — "
+            f"{snap['mb_s']:.0f} MB/s (media {snap['avg_mb_s']:.0f}) — ETA {format_eta(snap['eta'])}" + format_io_split(snap))
+
+def format_io_split(snap: Dict[str, Any]) -> str:
+    """' — E/S 70% / hash 30%': where the workers' time went (waiting for reads vs inside the hashers)."""
+    busy = snap.get('io_wait', 0.0) + snap.get('hash_time', 0.0)
+    if busy <= 0:
+        return ""
+    return f" — E/S {snap['io_wait'] * 100 / busy:.0f}% / hash {snap['hash_time'] * 100 / busy:.0f}%"
+
+# --------------------------- Tree hash ---------------------------
+def _tree_leaf_hasher(base: str):
+    h = _init_hasher(base)
+    h.update(b'\x00')  # leaf / node prefixes keep a leaf from ever equalling an inner node
+    return h
+
+def tree_root(base: str, leaves: List[str]) -> str:
+    """Combine hex leaf digests pairwise (prefix 0x01) up to the root; an odd last node moves up as is."""
+    level = [bytes.fromhex(x) for x in leaves] or [_tree_leaf_hasher(base).digest()]
+    while len(level) > 1:
+        nxt = []
+        for i in range(0, len(level) - 1, 2):
+            h = _init_hasher(base)
+            h.update(b'\x01' + level[i] + level[i + 1])
+            nxt.append(h.digest())
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0].hex()
+
+class TreeHash:
+    """Sequential form of a tree hash (same root as tree_hash_file), for when it shares one read with other algorithms."""
+    def __init__(self, algo: str):
+        self.base, self.leaf_size = TREE_ALGOS[algo]
+        self.leaves: List[str] = []
+        self._leaf = _tree_leaf_hasher(self.base)
+        self._filled = 0
+
+    def update(self, data):
+        view = memoryview(data)
+        while len(view):
+            take = min(len(view), self.leaf_size - self._filled)
+            self._leaf.update(view[:take])
+            self._filled += take
+            view = view[take:]
+            if self._filled == self.leaf_size:
+                self.leaves.append(self._leaf.hexdigest())
+                self._leaf = _tree_leaf_hasher(self.base)
+                self._filled = 0
+
+    def all_leaves(self) -> List[str]:
+        if self._filled or not self.leaves:
+            return self.leaves + [self._leaf.hexdigest()]
+        return list(self.leaves)
+
+    def hexdigest(self) -> str:
+        return tree_root(self.base, self.all_leaves())
+
+def _tree_leaf(path: str, base: str, offset: int, length: int) -> str:
+    h = _tree_leaf_hasher(base)
+    with open(path, 'rb') as f:
+        fd = f.fileno()
+        _fadvise(fd, offset, length, 'POSIX_FADV_SEQUENTIAL')
+        pos, end = offset, offset + length
+        while pos < end:
+            data = _pread(f, min(ENGINE_SETTINGS['chunk_size'], end - pos), pos)
+            if not data:
+                raise Exception(f'El archivo cambió de tamaño durante el hash: {path}')
+            h.update(data)
+            pos += len(data)
+        if ENGINE_SETTINGS['drop_cache']:
+            _fadvise(fd, offset, length, 'POSIX_FADV_DONTNEED')
+    return h.hexdigest()
+
+def tree_leaf_ranges(size: int, leaf_size: int) -> List[tuple[int, int]]:
+    """(offset, length) of every leaf; an empty file still has one (empty) leaf."""
+    return [(off, min(leaf_size, size - off)) for off in range(0, size, leaf_size)] or [(0, 0)]
+
+def tree_hash_file(path: str, algo: str, workers: Optional[int] = None, control: Optional["JobControl"] = None,
+                   progress_cb: Optional[Callable[[Dict[str, Any]], None]] = None, leaves: Optional[List[int]] = None) -> tuple[str, List[str]]:
+    """
+    Hash the leaves of path in parallel (pread at each leaf's offset) -> (root hex, leaf hex digests).
+    If leaves (indices) is given only those are hashed and root is '' - used to check a byte range.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    base, leaf_size = TREE_ALGOS[algo]
+    ranges = tree_leaf_ranges(os.path.getsize(path), leaf_size)
+    todo = [ranges[i] for i in leaves] if leaves is not None else ranges
+    meter = ProgressMeter(sum(n for _, n in todo), progress_cb)
+    out = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers or TREE_WORKERS, len(todo)))) as ex:
+        futures = [ex.submit(_tree_leaf, path, base, off, n) for off, n in todo]
+        try:
+            for fut, (_, n) in zip(futures, todo):
+                out.append(fut.result())
+                meter.update(n)
+                if control:
+                    control.checkpoint()
+        except BaseException:
+            for fut in futures:
+                fut.cancel()
+            raise
+    if leaves is not None:
+        return '', out
+    return tree_root(base, out), out
+
+def tree_bad_ranges(algo: str, expected: List[str], actual: List[str], indices: Optional[List[int]] = None) -> List[tuple[int, int]]:
+    """Byte ranges (first, last) of the leaves whose digest differs."""
+    leaf_size = TREE_ALGOS[algo][1]
+    indices = indices if indices is not None else range(max(len(expected), len(actual)))
+    bad = []
+    for pos, i in enumerate(indices):
+        got = actual[pos] if pos < len(actual) else None
+        if i >= len(expected) or got != expected[i]:
+            bad.append((i * leaf_size, (i + 1) * leaf_size - 1))
+    return bad
+
+def tree_verify_range(path: str, algo: str, expected: List[str], start: int, end: int, control: Optional["JobControl"] = None) -> List[tuple[int, int]]:
+    """Check only the leaves overlapping bytes [start, end) against the recorded leaves: corrupted ranges."""
+    leaf_size = TREE_ALGOS[algo][1]
+    size = os.path.getsize(path)
+    last = min(max(end, start + 1), size) - 1
+    indices = [i for i in range(start // leaf_size, last // leaf_size + 1) if i * leaf_size < size] or [0]
+    _, actual = tree_hash_file(path, algo, control=control, leaves=indices)
+    return tree_bad_ranges(algo, expected, actual, indices)
+
+def format_byte_ranges(ranges: List[tuple[int, int]]) -> str:
+    shown = ', '.join(f'{a}-{b}' for a, b in ranges[:TREE_MAX_RANGES_SHOWN])
+    return 'bytes ' + shown + (f' (+{len(ranges) - TREE_MAX_RANGES_SHOWN} más)' if len(ranges) > TREE_MAX_RANGES_SHOWN else '')
+
+def compute_hashes_file_sync(path: str, algos: List[str], progress_cb: Optional[Callable[[int], None]] = None, tk_root: Optional[tk.Tk] = None, control: Optional["JobControl"] = None,
+                             io_backend: Optional[str] = None, stats: Optional[Dict[str, Any]] = None,
+                             progress_snapshot_cb: Optional[Callable[[Dict[str, Any]], None]] = None) -> tuple[Dict[str, str], Dict[str, float], float]:
+    """
+    Compute several digests of one file reading each chunk only once.
+    Returns (digests, timings, duration): digests/timings keyed by algorithm name,
+    timings = seconds spent inside each hasher's update().
+    progress_cb gets the percentage done and progress_snapshot_cb whole ProgressMeter snapshots
+    (at most PROGRESS_HZ per second, tk_root is refreshed at the same pace); control (optional) lets a job pause/cancel between chunks;
+    io_backend overrides ENGINE_SETTINGS. Digests found in the DigestCache for the file's current identity are not recomputed;
+    if stats is given, stats['cached'] lists the algorithms served from the cache,
+    stats['leaves'] the leaf digests of tree algorithms and stats['io_wait'] the seconds spent
+    waiting for data (plus the reader thread's read_time / reader_blocked with readahead).
+    A tree algorithm requested on its own hashes its leaves in parallel; together with
+    other algorithms it is fed from the same sequential read.
+    """
+    algos = list(dict.fromkeys(algos))
+    if not algos:
+        raise Exception('No se indicó ningún algoritmo')
+    start = time.time()
+    st = os.stat(path)
+    total = st.st_size
+
+    def report(snap):
+        if progress_cb:
+            progress_cb(snap['pct'])
+        if progress_snapshot_cb:
+            progress_snapshot_cb(snap)
+        if tk_root:
+            try:
+                tk_root.update()
+            except Exception:
+                pass
+    meter = ProgressMeter(total, report)
+    cache = get_digest_cache()
+    cached = {}
+    if cache is not None and ENGINE_SETTINGS['cache_trust']:
+        for a in algos:
+            try:
+                d = cache.get(st, a)
+            except Exception:
+                d = None
+            if d is not None:
+                cached[a] = d
+    leaves = {}
+    for a in [a for a in cached if a in TREE_ALGOS]:
+        # tree entries are cached as 'root:leaf1leaf2...' so the leaf list survives a cache hit
+        root, _, packed = cached[a].partition(':')
+        width = len(root)
+        cached[a] = root
+        leaves[a] = [packed[i:i + width] for i in range(0, len(packed), width)]
+    if stats is not None:
+        stats['stat'] = st
+        stats['cached'] = list(cached)
+        stats['leaves'] = leaves
+    if len(cached) == len(algos):
+        meter.finish(total)
+        return dict(cached), {a: 0.0 for a in algos}, time.time() - start
+    timings = {a: 0.0 for a in algos}
+    computed = {}
+    pending = [a for a in algos if a not in cached]
+    if FINGERPRINT_ALGO in pending:
+        # a few positioned reads whatever the size, never part of the sequential read
+        t0 = time.perf_counter()
+        computed[FINGERPRINT_ALGO] = sample_digest(path, total)
+        timings[FINGERPRINT_ALGO] = time.perf_counter() - t0
+        pending.remove(FINGERPRINT_ALGO)
+    if all(a in TREE_ALGOS for a in pending):
+        for a in pending:
+            t0 = time.perf_counter()
+            computed[a], leaves[a] = tree_hash_file(path, a, control=control, progress_cb=report)
+            timings[a] = time.perf_counter() - t0
+        pending = []
+    hashers = [(a, _init_hasher(a)) for a in pending]
+    io_wait = 0.0
+    reads = {}
+    if hashers:
+        with contextlib.closing(read_file_chunks(path, io_backend, stats=reads)) as chunks:
+            while True:
+                # time spent waiting for the next chunk = blocked on I/O (hashing time is in timings)
+                t0 = time.perf_counter()
+                chunk = next(chunks, None)
+                io_wait += time.perf_counter() - t0
+                if chunk is None:
+                    break
+                if control:
+                    control.checkpoint()
+                for a, h in hashers:
+                    t0 = time.perf_counter()
+                    h.update(chunk)
+                    timings[a] += time.perf_counter() - t0
+                meter.update(len(chunk))
+    for a, h in hashers:
+        t0 = time.perf_counter()
+        computed[a] = h.hexdigest()
+        timings[a] += time.perf_counter() - t0
+        if isinstance(h, TreeHash):
+            leaves[a] = h.all_leaves()
+    if cache is not None:
+        try:
+            # only trust what we read if the file didn't change underneath us
+            if DigestCache.identity(os.stat(path)) == DigestCache.identity(st):
+                for a, d in computed.items():
+                    cache.put(st, a, d + ':' + ''.join(leaves[a]) if a in leaves else d)
+        except Exception:
+            pass
+    if stats is not None:
+        stats['leaves'] = leaves
+        stats['io_wait'] = io_wait
+        stats.update(reads)
+    digests = {a: cached[a] if a in cached else computed[a] for a in algos}
+    duration = time.time() - start
+    meter.finish(total)
+    return digests, timings, duration
+
+# compute_hash_file_sync adapted to tkinter: accepts root to call update()
+def compute_hash_file_sync(path: str, algo: str, progress_cb: Optional[Callable[[int], None]] = None, tk_root: Optional[tk.Tk] = None, control: Optional["JobControl"] = None,
+                           progress_snapshot_cb: Optional[Callable[[Dict[str, Any]], None]] = None) -> tuple[str, float]:
+    """Compute file hash synchronously but keep GUI responsive by calling tk_root.update() if provided."""
+    digests, _, duration = compute_hashes_file_sync(path, [algo], progress_cb, tk_root, control, progress_snapshot_cb=progress_snapshot_cb)
+    return digests[algo], duration
+
+def format_hashes_field(hashes: Dict[str, str]) -> str:
+    """Serialize {algo: digest} for CSV manifests: 'MD5:abc;CRC32:def'."""
+    return ';'.join(f'{a}:{h}' for a, h in hashes.items())
+
+def entry_hashes(entry: Dict) -> Dict[str, str]:
+    """All digests recorded for a manifest entry ('hash' + optional 'hashes' dict or CSV string)."""
+    out = {}
+    raw = entry.get('hashes')
+    if isinstance(raw, dict):
+        out.update({a: h for a, h in raw.items() if h})
+    elif isinstance(raw, str) and raw:
+        for part in raw.split(';'):
+            a, _, h = part.partition(':')
+            if a.strip() and h.strip():
+                out[a.strip()] = h.strip()
+    return out
+
+# --------------------------- Directory walker ---------------------------
+def parse_size(text: Any) -> Optional[int]:
+    """'512', '64K', '1.5G' -> bytes (binary units); '' / None -> None."""
+    if text is None or isinstance(text, int):
+        return text
+    t = str(text).strip().upper().rstrip('B')
+    if not t:
+        return None
+    mult = 1
+    if t[-1] in "KMGT":
+        mult = 1024 ** ("KMGT".index(t[-1]) + 1)
+        t = t[:-1]
+    try:
+        return int(float(t) * mult)
+    except ValueError:
+        raise Exception(f'Tamaño no válido: {text}')
+
+def _compile_patterns(patterns: Iterable[str]):
+    """Glob patterns, or regular expressions with a 're:' prefix, as one compiled regex (None if empty)."""
+    import re
+    import fnmatch
+    parts = [p[3:] if p.startswith('re:') else fnmatch.translate(p) for p in patterns if p]
+    return re.compile('|'.join(f'(?:{p})' for p in parts)) if parts else None
+
+class WalkOptions:
+    """
+    Filters for walk_files. include/exclude are glob patterns (or 're:<regex>') tested against both
+    the name and the relative path with '/' separators; exclude also prunes directories (.git, node_modules).
+    min_size/max_size bound file sizes; symlinks is one of SYMLINK_POLICIES; same_fs keeps to the root's filesystem.
+    """
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = (), min_size: Optional[int] = None,
+                 max_size: Optional[int] = None, symlinks: str = "files", same_fs: bool = False):
+        if symlinks not in SYMLINK_POLICIES:
+            raise Exception(f'Política de enlaces no válida: {symlinks}')
+        self.include = [p for p in include if p]
+        self.exclude = [p for p in exclude if p]
+        self.min_size = parse_size(min_size)
+        self.max_size = parse_size(max_size)
+        self.symlinks = symlinks
+        self.same_fs = same_fs
+        self._include = _compile_patterns(self.include)
+        self._exclude = _compile_patterns(self.exclude)
+
+    def excluded(self, rel: str, name: str) -> bool:
+        return self._exclude is not None and bool(self._exclude.match(name) or self._exclude.match(rel))
+
+    def wants_file(self, rel: str, name: str, size: int) -> bool:
+        if self.excluded(rel, name):
+            return False
+        if self._include is not None and not (self._include.match(name) or self._include.match(rel)):
+            return False
+        if self.min_size is not None and size < self.min_size:
+            return False
+        return self.max_size is None or size <= self.max_size
+
+    def is_default(self) -> bool:
+        return self.to_dict() == WalkOptions().to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'include': self.include, 'exclude': self.exclude, 'min_size': self.min_size, 'max_size': self.max_size,
+                'symlinks': self.symlinks, 'same_fs': self.same_fs}
+
+    @classmethod
+    def from_dict(cls, d: Optional[Dict[str, Any]]) -> "WalkOptions":
+        d = d or {}
+        return cls(d.get('include') or (), d.get('exclude') or (), d.get('min_size'), d.get('max_size'),
+                   d.get('symlinks') or "files", bool(d.get('same_fs')))
+
+def walk_files(root: str, options: Optional[WalkOptions] = None, skip: Iterable[str] = ()) -> Iterator[tuple[str, os.stat_result]]:
+    """
+    (path, stat) of every file under root passing options, via os.scandir so the DirEntry's
+    type (and, on Windows, stat) data is reused. Unreadable entries are skipped like os.walk does.
+    """
+    opts = options or WalkOptions()
+    skip = {os.path.normcase(os.path.abspath(p)) for p in skip}
+    root_st = os.stat(root)
+    root_dev = root_st.st_dev
+    follow = opts.symlinks == "follow"
+    seen_dirs = {(root_dev, root_st.st_ino)}  # follow mode: every directory walked, so links never revisit one
+    stack = [(root, "")]
+    while stack:
+        folder, rel_folder = stack.pop()
+        subdirs = []
+        try:
+            it = os.scandir(folder)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                rel = rel_folder + entry.name
+                try:
+                    is_link = entry.is_symlink()
+                    if is_link and opts.symlinks == "skip":
+                        continue
+                    if entry.is_dir(follow_symlinks=follow):
+                        if opts.excluded(rel, entry.name):
+                            continue
+                        if opts.same_fs or follow:
+                            st = entry.stat()
+                            if opts.same_fs and st.st_dev != root_dev:
+                                continue
+                            if follow:
+                                if (st.st_dev, st.st_ino) in seen_dirs:
+                                    continue
+                                seen_dirs.add((st.st_dev, st.st_ino))
+                        subdirs.append((entry.path, rel + "/"))
+                    elif entry.is_file():
+                        st = entry.stat()
+                        if opts.same_fs and st.st_dev != root_dev:
+                            continue
+                        if not opts.wants_file(rel, entry.name, st.st_size):
+                            continue
+                        if skip and os.path.normcase(os.path.abspath(entry.path)) in skip:
+                            continue
+                        yield entry.path, st
+                except OSError:
+                    continue
+        stack.extend(reversed(subdirs))
+
+def prefetch(items: Iterable[Any], maxsize: int = WALK_QUEUE_SIZE) -> Iterator[Any]:
+    """
+    Iterate items on a producer thread, at most maxsize ahead of the consumer: a slow directory
+    walk (NFS, cold disks) keeps going while the pool hashes. Closing the iterator stops the producer.
+    """
+    q: "queue.Queue[tuple[str, Any]]" = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for it in items:
+                if not put(('item', it)):
+                    return
+            put(('end', None))
+        except Exception as e:
+            put(('error', e))
+
+    threading.Thread(target=produce, name="walker", daemon=True).start()
+    try:
+        while True:
+            kind, value = q.get()
+            if kind == 'item':
+                yield value
+            elif kind == 'error':
+                raise value
+            else:
+                return
+    finally:
+        stop.set()
+
+def walk_manifest_items(folder: str, algos: List[str], options: Optional[WalkOptions] = None, skip: Iterable[str] = (),
+                        done: Optional[Dict[str, tuple[int, int]]] = None, archives: bool = False) -> Iterator[tuple[int, tuple]]:
+    """
+    (index, (path, algos, size)) job items for a folder, walked on a prefetch thread.
+    done ({relative path: (size, mtime_ns)}, from a resumed journal) files that still match are skipped.
+    archives: zip/tar files get (path, algos, size, True) items, hashed member by member.
+    """
+    for idx, (path, st) in enumerate(prefetch(walk_files(folder, options, skip))):
+        if done and done.get(os.path.relpath(path, folder)) == (st.st_size, st.st_mtime_ns):
+            continue
+        if archives and is_archive_name(path):
+            yield idx, (path, algos, st.st_size, True)
+        else:
+            yield idx, (path, algos, st.st_size)
+
+# --------------------------- Job engine ---------------------------
+class JobCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled."""
+
+class JobControl:
+    """Pause / cancel flags shared between the UI thread and the workers of a job."""
+    def __init__(self):
+        self._cancel = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def cancel(self):
+        self._cancel.set()
+        self._running.set()  # wake paused workers so they can exit
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def checkpoint(self):
+        """Block while paused; raise JobCancelled once cancelled."""
+        self._running.wait()
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+class MultiResult(list):
+    """Task value standing for several results of one job item (e.g. archive members): each one is emitted as its own 'result' event."""
+
+def hash_file_task(arg: tuple, control: Optional[JobControl] = None, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Job task: arg = (path, algos[, size[, archives]]). Top-level so the process pool can pickle it.
+    With archives true a zip/tar path is opened instead and its members come back as a MultiResult.
+    """
+    path, algos = arg[0], arg[1]
+    if len(arg) > 3 and arg[3] and is_archive_name(path):
+        return hash_archive_task(arg, control, progress)
+    stats = {}
+    digests, timings, duration = compute_hashes_file_sync(path, algos, control=control, stats=stats, progress_snapshot_cb=progress)
+    st = stats['stat']
+    return {'path': path, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'digests': digests, 'timings': timings, 'duration': duration,
+            'cached': stats.get('cached', []), 'leaves': stats.get('leaves', {}), 'io_wait': stats.get('io_wait', 0.0)}
+
+def manifest_file_task(arg: tuple, control: Optional[JobControl] = None, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """hash_file_task plus the sampled fingerprint the tiered verifier checks after stat."""
+    res = hash_file_task(arg, control, progress)
+    if isinstance(res, MultiResult):
+        return res  # archive members: verified by one pass over the archive, no sampled fingerprint
+    res['sample'] = res['digests'].get(FINGERPRINT_ALGO) or sample_digest(res['path'], res['size'])
+    return res
+
+# --------------------------- Compare ---------------------------
+def _diff_in_chunk(ca, cb) -> tuple[int, int]:
+    """(offset of the first differing byte, number of differing bytes) of two equal-length, unequal chunks."""
+    n = len(ca)
+    x = int.from_bytes(ca, 'big') ^ int.from_bytes(cb, 'big')
+    return n - 1 - (x.bit_length() - 1) // 8, n - x.to_bytes(n, 'big').count(0)
+
+def compare_files_bytes(a: str, b: str, algo: Optional[str] = None, count_all: bool = False, control: Optional[JobControl] = None,
+                        progress_cb: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Lockstep chunk comparison of two same-size files (B is read on a second thread while A is read).
+    Stops at the first differing chunk unless count_all; digests (if algo) are only complete when the
+    whole files were read. Returns {equal, first_diff, diff_bytes, compared, digest_a, digest_b}.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    size = os.path.getsize(a)
+    chunk = ENGINE_SETTINGS['chunk_size']
+    meter = ProgressMeter(size, progress_cb)
+    ha = _init_hasher(algo) if algo else None
+    hb = _init_hasher(algo) if algo else None
+    first_diff, diff_bytes, pos = None, 0, 0
+    with open(a, 'rb') as fa, open(b, 'rb') as fb, ThreadPoolExecutor(max_workers=1) as ex:
+        for f in (fa, fb):
+            _fadvise(f.fileno(), 0, 0, 'POSIX_FADV_SEQUENTIAL')
+        while pos < size:
+            if control:
+                control.checkpoint()
+            fut = ex.submit(_pread, fb, chunk, pos)
+            ca = _pread(fa, chunk, pos)
+            cb = fut.result()
+            if len(ca) != len(cb) or not ca:
+                raise Exception('Un archivo cambió de tamaño durante la comparación')
+            if ha is not None:
+                ha.update(ca)
+                hb.update(cb)
+            if ca != cb:
+                off, n = _diff_in_chunk(ca, cb)
+                if first_diff is None:
+                    first_diff = pos + off
+                diff_bytes += n
+            pos += len(ca)
+            meter.update(len(ca))
+            if first_diff is not None and not count_all:
+                break
+    meter.finish()
+    whole = pos >= size
+    return {'equal': first_diff is None, 'first_diff': first_diff, 'diff_bytes': diff_bytes, 'compared': pos,
+            'digest_a': ha.hexdigest() if ha is not None and whole else None,
+            'digest_b': hb.hexdigest() if hb is not None and whole else None}
+
+def _file_digest(path: str, algo: str) -> str:
+    """Process-pool worker for compare_files_hashed."""
+    return compute_hashes_file_sync(path, [algo])[0][algo]
+
+def compare_files_hashed(a: str, b: str, algo: str, control: Optional[JobControl] = None,
+                         progress_cb: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Hash both files at the same time on two threads (digest cache included); no offsets, only digests.
+    An algorithm that holds the GIL gets two processes instead (no progress or cancel until both are done).
+    """
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+    sizes = {a: os.path.getsize(a), b: os.path.getsize(b)}
+    meter = ProgressMeter(sum(sizes.values()), progress_cb)
+    if not algorithm_info(algo).releases_gil:
+        with ProcessPoolExecutor(max_workers=2, initializer=_apply_engine_settings, initargs=(dict(ENGINE_SETTINGS), _plugins or [])) as ex:
+            da, db = ex.map(_file_digest, [a, b], [algo, algo])
+        meter.finish()
+        return {'equal': da == db, 'first_diff': None, 'diff_bytes': None, 'compared': sizes[a], 'digest_a': da, 'digest_b': db}
+    done = {a: 0, b: 0}
+    lock = threading.Lock()
+
+    def hash_one(path):
+        def progress(snap):
+            with lock:
+                meter.update(snap['done'] - done[path])
+                done[path] = snap['done']
+        return compute_hashes_file_sync(path, [algo], control=control, progress_snapshot_cb=progress)[0][algo]
+
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fa, fb = ex.submit(hash_one, a), ex.submit(hash_one, b)
+        da, db = fa.result(), fb.result()
+    meter.finish()
+    return {'equal': da == db, 'first_diff': None, 'diff_bytes': None, 'compared': sizes[a], 'digest_a': da, 'digest_b': db}
+
+def compare_files_engine(a: str, b: str, algo: str = "SHA256", method: str = "bytes", count_all: bool = False,
+                         control: Optional[JobControl] = None, progress_cb: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Compare two files, cheapest test first: different sizes answer without reading anything;
+    same sizes go to compare_files_bytes (method "bytes"), compare_files_hashed ("hash") or only
+    compare the sampled fingerprints ("sample", also used whenever algo is FINGERPRINT_ALGO).
+    Result keys: equal, reason ('size' | method), size_a, size_b, first_diff, diff_bytes, compared,
+    digest_a, digest_b (None when not computed), duration.
+    """
+    if method not in COMPARE_METHODS:
+        raise Exception(f'Método de comparación no soportado: {method}')
+    if algo == FINGERPRINT_ALGO:
+        method = "sample"
+    start = time.time()
+    size_a, size_b = os.path.getsize(a), os.path.getsize(b)
+    if size_a != size_b:
+        res = {'equal': False, 'reason': 'size', 'first_diff': None, 'diff_bytes': None, 'compared': 0, 'digest_a': None, 'digest_b': None}
+    elif method == "sample":
+        da, db = sample_digest(a, size_a), sample_digest(b, size_b)
+        res = {'equal': da == db, 'reason': method, 'first_diff': None, 'diff_bytes': None, 'compared': 0, 'digest_a': da, 'digest_b': db}
+    elif method == "hash":
+        res = dict(compare_files_hashed(a, b, algo, control, progress_cb), reason=method)
+    else:
+        res = dict(compare_files_bytes(a, b, algo, count_all, control, progress_cb), reason=method)
+    res.update(size_a=size_a, size_b=size_b, duration=time.time() - start)
+    return res
+
+def compare_task(arg: tuple, control: Optional[JobControl] = None, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Job task: arg = (a, b, algo, method, count_all)."""
+    return compare_files_engine(*arg, control=control, progress_cb=progress)
+
+def format_compare_result(res: Dict[str, Any], algo: str) -> str:
+    if res['reason'] == 'size':
+        return f"DISTINTO tamaño: A={res['size_a']} bytes, B={res['size_b']} bytes (sin leer los archivos)"
+    if res['reason'] == 'sample':
+        if res['equal']:
+            return f"PROBABLEMENTE IGUALES: misma huella {FINGERPRINT_ALGO} {res['digest_a']} (solo bloques de muestra, no es una comparación completa)"
+        return f"DISTINTO {FINGERPRINT_ALGO} A={res['digest_a']} B={res['digest_b']}"
+    if res['equal']:
+        return f"COINCIDENCIA {algo} {res['digest_a']}" if res['digest_a'] else f"COINCIDENCIA ({res['size_a']} bytes idénticos)"
+    if res['first_diff'] is None:
+        return f"DISTINTO {algo} A={res['digest_a']} B={res['digest_b']}"
+    if res['compared'] < res['size_a']:
+        count = f"{res['diff_bytes']} bytes distintos en los primeros {res['compared']} comparados"
+    else:
+        count = f"{res['diff_bytes']} bytes distintos en total"
+    line = f"DISTINTO desde el byte {res['first_diff']} ({count})"
+    if res['digest_a']:
+        line += f" {algo} A={res['digest_a']} B={res['digest_b']}"
+    return line
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def _arg_size(arg: tuple) -> int:
+    """Default job weight: the size carried in the arg (walker items) or a stat of arg[0]."""
+    if len(arg) > 2 and isinstance(arg[2], int):
+        return arg[2]
+    return _file_size(arg[0])
+
+def bundle_by_bytes(items: Iterable[tuple[Any, Any, int]], max_bytes: int = PROCESS_BUNDLE_BYTES, max_files: int = PROCESS_BUNDLE_FILES) -> Iterable[List[tuple[Any, Any]]]:
+    """Group (key, arg, bytes) items into (key, arg) bundles of roughly max_bytes so big and small files balance across processes."""
+    bundle, size = [], 0
+    for key, arg, w in items:
+        if bundle and (size + w > max_bytes or len(bundle) >= max_files):
+            yield bundle
+            bundle, size = [], 0
+        bundle.append((key, arg))
+        size += w
+    if bundle:
+        yield bundle
+
+def _apply_engine_settings(settings: Dict[str, Any], plugins: List[str]):
+    """Process-pool initializer: workers start with the parent's ENGINE_SETTINGS and plugin algorithms."""
+    global _plugins
+    ENGINE_SETTINGS.update(settings)
+    if _plugins is None and plugins:  # spawned worker (a forked one already has them)
+        _plugins = list(plugins)
+        load_plugins(_plugins)
+
+def _run_bundle(func: Callable, bundle: List[tuple[Any, Any]]) -> List[tuple[Any, str, Any]]:
+    """Process-pool worker: only paths go in and only digests come back, never file contents."""
+    out = []
+    for key, arg in bundle:
+        try:
+            out.append((key, 'result', func(arg, None, None)))
+        except Exception as e:
+            out.append((key, 'error', str(e)))
+    flush_digest_cache()  # workers exit without running atexit
+    return out
+
+class HashJob:
+    """
+    Run func(arg, control, progress_cb) for every (key, arg) of items on a thread pool.
+    hashlib releases the GIL on large buffers, so files really hash in parallel.
+    Nothing here touches Tk: the UI drains self.events with after(). Events are tuples
+      ('progress', key, snapshot) | ('result', key, value) | ('error', key, message) | ('done', None, cancelled)
+    with ProgressMeter snapshots (at most PROGRESS_HZ per file); job-wide totals are in self.metrics.
+    items may be a lazy iterator (e.g. a directory walk); at most 2*workers tasks are in flight.
+
+    mode="Procesos" uses a process pool instead, for hashers that hold the GIL (Algorithm.releases_gil
+    false; pick_exec_mode chooses for "Auto") or lots of tiny files. func must then be a top-level function; work is
+    sent in bundles balanced by weight(arg) bytes, pause/cancel apply between bundles and only
+    per-file results (no percentages) are reported.
+    """
+    def __init__(self, func: Callable[[Any, JobControl, Callable[[int], None]], Any], items: Iterable[tuple[Any, Any]], workers: int = DEFAULT_WORKERS,
+                 mode: str = "Hilos", weight: Optional[Callable[[Any], int]] = None):
+        self.func = func
+        self.items = items
+        self.workers = max(1, int(workers))
+        self.mode = mode
+        self.weight = weight or _arg_size
+        self.control = JobControl()
+        self.metrics = JobMetrics()
+        # bounded, so a fast producer (e.g. a stat pass over millions of entries) waits for the consumer
+        self.events: "queue.Queue[tuple[str, Any, Any]]" = queue.Queue(maxsize=10000)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "HashJob":
+        self._thread = threading.Thread(target=self._dispatch, name="HashJob", daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _emit(self, event: tuple[str, Any, Any]):
+        while True:
+            try:
+                self.events.put(event, timeout=0.2)
+                return
+            except queue.Full:
+                if self.control.cancelled and event[0] != 'done':
+                    return  # nobody may be draining any more (window closed)
+
+    def _stopped(self) -> bool:
+        try:
+            self.control.checkpoint()
+            return False
+        except JobCancelled:
+            return True
+
+    def _emit_results(self, key, value):
+        for v in (value if isinstance(value, MultiResult) else (value,)):
+            self._emit(('result', key, v))
+
+    def _weighed(self) -> Iterator[tuple[Any, Any, int]]:
+        for key, arg in self.items:
+            w = self.weight(arg)
+            self.metrics.add(key, w)
+            yield key, arg, w
+        self.metrics.enumerated = True
+
+    def _run_one(self, key, arg):
+        if self.control.cancelled:
+            return
+
+        def progress(snap):
+            self.metrics.progress(key, snap['done'])
+            self._emit(('progress', key, snap))
+        try:
+            value = self.func(arg, self.control, progress)
+            self.metrics.file_done(key, value)
+            self._emit_results(key, value)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            self.metrics.file_done(key)
+            self._emit(('error', key, str(e)))
+
+    def _dispatch(self):
+        if self.mode == "Procesos":
+            return self._dispatch_processes()
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash") as ex:
+                in_flight = set()
+                for key, arg, _ in self._weighed():
+                    try:
+                        self.control.checkpoint()
+                    except JobCancelled:
+                        break
+                    if len(in_flight) >= self.workers * 2:
+                        _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    in_flight.add(ex.submit(self._run_one, key, arg))
+                wait(in_flight)
+        except Exception as e:
+            self._emit(('error', None, str(e)))
+        finally:
+            flush_digest_cache()
+            self._emit(('done', None, self.control.cancelled))
+
+    def _emit_bundle(self, fut):
+        try:
+            for key, kind, value in fut.result():
+                self.metrics.file_done(key, value)
+                if kind == 'result':
+                    self._emit_results(key, value)
+                else:
+                    self._emit((kind, key, value))
+        except Exception as e:
+            self._emit(('error', None, str(e)))
+
+    def _dispatch_processes(self):
+        from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+        ex = None
+        try:
+            ex = ProcessPoolExecutor(max_workers=self.workers, initializer=_apply_engine_settings, initargs=(dict(ENGINE_SETTINGS), _plugins or []))
+            in_flight = set()
+            for bundle in bundle_by_bytes(self._weighed()):
+                try:
+                    self.control.checkpoint()
+                except JobCancelled:
+                    break
+                if len(in_flight) >= self.workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        self._emit_bundle(fut)
+                in_flight.add(ex.submit(_run_bundle, self.func, bundle))
+            while in_flight and not self.control.cancelled:
+                done, in_flight = wait(in_flight, timeout=0.5, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    self._emit_bundle(fut)
+        except Exception as e:
+            self._emit(('error', None, str(e)))
+        finally:
+            if ex is not None:
+                ex.shutdown(wait=not self.control.cancelled, cancel_futures=True)
+            self._emit(('done', None, self.control.cancelled))
+
+# --------------------------- Archives ---------------------------
+def is_archive_name(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+def split_archive_path(path: str) -> Optional[tuple[str, str]]:
+    """'dir/bundle.zip!a/b.txt' -> ('dir/bundle.zip', 'a/b.txt'); None for a plain path."""
+    i = path.find(ARCHIVE_SEP)
+    while i != -1:
+        if is_archive_name(path[:i]):
+            return path[:i], path[i + 1:]
+        i = path.find(ARCHIVE_SEP, i + 1)
+    return None
+
+def iter_archive_members(raw, name: str) -> Iterator[tuple[str, int, Optional[int], Any]]:
+    """
+    (member name, size, mtime_ns, readable) for every regular file of the zip/tar open as raw, in
+    archive order; each readable is only valid until the next member. Tars (gz/bz2/xz included) are
+    read in stream mode, a single forward pass that forgets each header once it's been handled.
+    """
+    import tarfile
+    import zipfile
+    if name.lower().endswith('.zip'):
+        with zipfile.ZipFile(raw) as zf:
+            for info in sorted(zf.infolist(), key=lambda i: i.header_offset):
+                if info.is_dir():
+                    continue
+                try:
+                    mtime_ns = int(datetime.datetime(*info.date_time).timestamp()) * 1_000_000_000
+                except (ValueError, OverflowError):
+                    mtime_ns = None
+                with zf.open(info) as fh:
+                    yield info.filename, info.file_size, mtime_ns, fh
+        return
+    with tarfile.open(fileobj=raw, mode='r|*') as tf:
+        while True:
+            member = tf.next()
+            if member is None:
+                return
+            tf.members.clear()  # stream mode would otherwise keep every TarInfo
+            if member.isfile():
+                yield member.name, member.size, int(member.mtime) * 1_000_000_000, tf.extractfile(member)
+
+def _hash_stream(fh, algos: List[str], control: Optional[JobControl] = None, on_chunk: Optional[Callable[[], None]] = None,
+                 size: Optional[int] = None) -> tuple[Dict[str, str], Dict[str, float], Dict[str, List[str]]]:
+    """
+    Feed a readable through one hasher per algorithm: (digests, seconds per algorithm, tree leaves).
+    FINGERPRINT_ALGO needs the stream's size: its blocks are sampled from the data read for the others
+    (a compressed member can't be read at an offset without decompressing what comes before anyway).
+    """
+    chunk = ENGINE_SETTINGS['chunk_size']
+    hashers = {a: SampleHasher(size) if a == FINGERPRINT_ALGO and size is not None else _init_hasher(a) for a in algos}
+    timings = dict.fromkeys(algos, 0.0)
+    while True:
+        if control:
+            control.checkpoint()
+        data = fh.read(chunk)
+        if not data:
+            break
+        for a, h in hashers.items():
+            t0 = time.perf_counter()
+            h.update(data)
+            timings[a] += time.perf_counter() - t0
+        if on_chunk:
+            on_chunk()
+    leaves = {a: h.all_leaves() for a, h in hashers.items() if isinstance(h, TreeHash)}
+    return {a: h.hexdigest() for a, h in hashers.items()}, timings, leaves
+
+def hash_archive_task(arg: tuple, control: Optional[JobControl] = None, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> MultiResult:
+    """
+    Job task: arg = (archive path, algos, ...) -> a hash_file_task-like result per member, with
+    path 'archive!member', without extracting anything. Progress counts compressed bytes read.
+    """
+    path, algos = arg[0], list(dict.fromkeys(arg[1]))
+    out = MultiResult()
+    with open(path, 'rb') as raw:
+        _fadvise(raw.fileno(), 0, 0, 'POSIX_FADV_SEQUENTIAL')
+        meter = ProgressMeter(os.fstat(raw.fileno()).st_size, progress)
+
+        def on_chunk():
+            meter.update(max(0, raw.tell() - meter.done))
+        for name, size, mtime_ns, fh in iter_archive_members(raw, path):
+            start = time.time()
+            digests, timings, leaves = _hash_stream(fh, algos, control, on_chunk, size)
+            out.append({'path': path + ARCHIVE_SEP + name, 'size': size, 'mtime_ns': mtime_ns, 'digests': digests, 'timings': timings,
+                        'duration': time.time() - start, 'cached': [], 'leaves': leaves, 'io_wait': 0.0})
+        meter.finish(meter.total)
+    return out
+
+def verify_archive(path: str, members: Dict[str, tuple[Dict[str, str], Optional[int]]], control: Optional[JobControl] = None) -> Iterator[tuple[str, str, str]]:
+    """
+    Check {member: ({algo: expected}, size)} in one pass over the archive: (member, status, detail)
+    for each of them (MISSING if absent) plus EXTRA for members the manifest doesn't list.
+    """
+    seen = set()
+    with open(path, 'rb') as raw:
+        for name, size, _, fh in iter_archive_members(raw, path):
+            if name not in members:
+                yield name, 'EXTRA', ''
+                continue
+            seen.add(name)
+            expected_all, exp_size = members[name]
+            if not expected_all:
+                yield name, 'ERROR', '(no recorded digest)'
+                continue
+            if exp_size is not None and size != exp_size:
+                yield name, 'SIZE_MISMATCH', f"(expected {exp_size} bytes, got {size})"
+                continue
+            actual_all = _hash_stream(fh, list(expected_all), control, size=size)[0]
+            bad = [a for a in expected_all if actual_all.get(a) != expected_all[a]]
+            if bad:
+                yield name, 'MISMATCH', f'{bad[0]} (expected {expected_all[bad[0]]}, got {actual_all.get(bad[0])})'
+            else:
+                yield name, 'OK', ''
+    for name in members:
+        if name not in seen:
+            yield name, 'MISSING', ''
+
+# --------------------------- Manifest TXT helpers ---------------------------
+def _write_manifest_txt_header(f) -> None:
+    f.write("# MANIFEST - formato TXT (humano legible)\n")
+    f.write(f"# generado: {ts()}\n\n")
+
+def _write_manifest_txt_entry(f, it: Dict) -> None:
+    fname = it.get('file') or it.get('path') or ''
+    alg = it.get('algorithm') or it.get('alg') or ''
+    h = it.get('hash') or it.get('checksum') or ''
+    f.write(f"Archivo: {fname}\n")
+    if alg:
+        f.write(f"Algoritmo: {alg}\n")
+    f.write(f"Hash: {h}\n")
+    for extra_alg, extra_h in (it.get('hashes') or {}).items():
+        if extra_alg != alg:
+            f.write(f"Hash {extra_alg}: {extra_h}\n")
+    f.write("\n")
+
+def export_manifest_txt(entries: List[Dict[str,str]], file_path: str) -> None:
+    """Export manifest in human-readable TXT format."""
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
+        _write_manifest_txt_header(f)
+        for it in entries:
+            _write_manifest_txt_entry(f, it)
+
+def iter_manifest_txt(file_path: str) -> Iterator[Dict[str,str]]:
+    """Stream entries of a human readable manifest TXT."""
+    def entry(b):
+        e = {'path': b['file'], 'hash': b['hash'], 'algorithm': b['algorithm']}
+        if b['hashes']:
+            e['hashes'] = b['hashes']
+        return e
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buf = {'file': None, 'algorithm': None, 'hash': None, 'hashes': {}}
+        for line in f:
+            s = line.strip()
+            if not s:
+                if buf['file'] and buf['hash']:
+                    yield entry(buf)
+                buf = {'file': None, 'algorithm': None, 'hash': None, 'hashes': {}}
+                continue
+            if s.lower().startswith('archivo:'):
+                buf['file'] = s.partition(':')[2].strip()
+            elif s.lower().startswith('algoritmo:'):
+                buf['algorithm'] = s.partition(':')[2].strip()
+            elif s.lower().startswith('hash:'):
+                buf['hash'] = s.partition(':')[2].strip()
+            elif s.lower().startswith('hash ') and ':' in s:
+                # extra digests written by multi-algorithm manifests: "Hash MD5: ..."
+                head, _, val = s.partition(':')
+                buf['hashes'][head[5:].strip()] = val.strip()
+            else:
+                if '|' in s:
+                    parts = [p.strip() for p in s.split('|')]
+                    if len(parts) >= 3:
+                        buf['file'] = parts[0]
+                        buf['algorithm'] = parts[1]
+                        buf['hash'] = parts[2]
+        if buf['file'] and buf['hash']:
+            yield entry(buf)
+
+def parse_manifest_txt(file_path: str) -> List[Dict[str,str]]:
+    """Parse human readable manifest TXT into list of entries."""
+    return list(iter_manifest_txt(file_path))
+
+# --------------------------- Batch export ---------------------------
+BATCH_EXPORT_KINDS = ("txt", "csv", "json", "jsonl")
+BATCH_EXPORT_FIELDS = ['file', 'size', 'hash', 'duration', 'algorithm', 'known']
+BATCH_SUMMARY_FORMAT = "hash-generator-batch-summary"
+
+def batch_export_kind(file_path: str) -> Optional[str]:
+    """'txt', 'csv', 'json' or 'jsonl' from the file name (ignoring a .gz / .xz suffix), None if it names none."""
+    lower = file_path.lower()
+    for comp in ('.gz', '.xz'):
+        if lower.endswith(comp):
+            lower = lower[:-len(comp)]
+    ext = lower.rpartition('.')[2]
+    return ext if ext in BATCH_EXPORT_KINDS else None
+
+def _open_export(file_path: str, kind: str):
+    """Text handle for an export; gzip / xz compressed when the name ends in .gz / .xz."""
+    newline = '' if kind == 'csv' else '\n'
+    lower = file_path.lower()
+    if lower.endswith('.gz'):
+        import gzip
+        return gzip.open(file_path, 'wt', compresslevel=6, encoding='utf-8', newline=newline)
+    if lower.endswith('.xz'):
+        import lzma
+        return lzma.open(file_path, 'wt', encoding='utf-8', newline=newline)
+    return open(file_path, 'w', encoding='utf-8', newline=newline)
+
+def _as_seconds(v) -> Optional[float]:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None  # 'caché', '-', progress text
+
+class BatchExportWriter:
+    """
+    Write batch rows (dicts with BATCH_EXPORT_FIELDS) one at a time, in TXT, CSV, JSON or JSONL,
+    optionally gzip / xz compressed, so exporting a million rows needs no more memory than one.
+    What depends on every row (element count, total duration) is kept as running totals and written
+    at the end: the TXT trailer and, in JSONL, a last record with format BATCH_SUMMARY_FORMAT.
+    """
+    def __init__(self, file_path: str, kind: Optional[str] = None, algo_declared: Optional[str] = None):
+        self.file_path = file_path
+        self.kind = kind or batch_export_kind(file_path) or "txt"
+        self.algo_declared = algo_declared
+        self.count = 0
+        self.total_duration = 0.0
+        now = datetime.datetime.now()
+        self._date = now.strftime("%d/%m/%Y")
+        self._fh = _open_export(file_path, self.kind)
+        self._encode = json.JSONEncoder(ensure_ascii=False).encode  # built once: json.dumps(ensure_ascii=False) makes one per call
+        if self.kind == 'txt':
+            self._fh.write("# EXPORTACIÓN DE HASHES - LOTE\n")
+            self._fh.write(f"# Fecha y hora de exportación: {now.strftime('%d/%m/%Y %H:%M:%S')}\n")
+            if algo_declared:
+                self._fh.write(f"# Algoritmo seleccionado para el lote: {algo_declared}\n")
+            self._fh.write("# ------------------------------------------------------------\n\n")
+        elif self.kind == 'csv':
+            self._csv = csv.DictWriter(self._fh, fieldnames=BATCH_EXPORT_FIELDS, extrasaction='ignore')
+            self._csv.writeheader()
+        elif self.kind == 'json':
+            self._fh.write("[")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        duration = _as_seconds(row.get('duration'))
+        if duration is not None:
+            self.total_duration += duration
+        if self.kind == 'txt':
+            self._write_txt(row)
+        elif self.kind == 'csv':
+            self._csv.writerow(row)
+        elif self.kind == 'json':
+            # one object per line: indent=2 would go through the pure-Python encoder, several times slower
+            self._fh.write(("," if self.count else "") + "\n  " + self._encode(row))
+        else:
+            self._fh.write(self._encode(row) + "\n")
+        self.count += 1
+
+    def _write_txt(self, e: Dict[str, Any]) -> None:
+        filepath = e.get('file', '')
+        nombre = os.path.basename(filepath) if filepath else ''
+        extension = Path(filepath).suffix.replace(".", "").upper() if filepath else "DESCONOCIDO"
+        alg = e.get('algorithm') or self.algo_declared or ""
+        known = e.get('known', '')
+        f = self._fh
+        f.write(f"Archivo: {nombre}\n")
+        f.write(f"Ruta completa: {filepath}\n")
+        f.write(f"Tipo: {extension}\n")
+        f.write(f"Tamaño: {e.get('size', '')} bytes\n")
+        f.write(f"Hash: {e.get('hash', '')}\n")
+        if alg:
+            f.write(f"Tipo de hash: {alg}\n")
+        f.write(f"Duración: {e.get('duration', '')} segundos\n")
+        if known:
+            f.write(f"Conjunto de hashes: {known}\n")
+        f.write(f"Fecha: {self._date}\n")
+        f.write("------------------------------------------------------------\n\n")
+
+    def close(self, complete: bool = True) -> None:
+        """Write the trailer and close; complete=False leaves it out, so a failed export doesn't read as a whole one."""
+        if self._fh is None:
+            return
+        if complete and self.kind == 'txt':
+            self._fh.write(f"# Elementos: {self.count}\n")
+            self._fh.write(f"# Duración total (sumada cuando disponible): {self.total_duration:.6f} segundos\n")
+        elif complete and self.kind == 'json':
+            self._fh.write(("\n" if self.count else "") + "]")
+        elif complete and self.kind == 'jsonl':
+            self._fh.write(json.dumps({'format': BATCH_SUMMARY_FORMAT, 'items': self.count, 'total_duration': round(self.total_duration, 6),
+                                       'algorithm': self.algo_declared, 'exported': ts()}, ensure_ascii=False) + "\n")
+        self._fh.close()
+        self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close(complete=exc[0] is None)  # no ']' or summary record after an error: the JSON stays invalid, the JSONL has no count
+
+def export_batch_txt_detailed(entries: Iterable[Dict[str,str]], file_path: str, algo_declared: Optional[str] = None) -> None:
+    """
+    Exporta lote en formato TXT detallado y legible (BatchExportWriter; .gz / .xz comprimen).
+    entries = dicts con: file, size, hash, duration, algorithm (optional), known (optional)
+    algo_declared = algoritmo seleccionado para el lote (se usa como fallback)
+    """
+    with BatchExportWriter(file_path, "txt", algo_declared) as w:
+        for e in entries:
+            w.write(e)
+
+def batch_export_rows(res: Dict[str, Any], algos: List[str], known: str = "") -> Iterator[Dict[str, str]]:
+    """Export rows (one per algorithm, as the batch table shows them) for a hash_file_task result or journal record."""
+    cached = res.get('cached') or ()
+    for a in algos:
+        yield {'file': res['path'], 'size': str(res['size']), 'hash': res['digests'][a],
+               'duration': "caché" if a in cached else f"{res['timings'][a]:.3f}", 'algorithm': a, 'known': known}
+
+# --------------------------- Manifests ---------------------------
+MANIFEST_HEADER_FORMAT = "hash-generator-manifest"
+MANIFEST_FILETYPES = [("JSON Files","*.json"), ("JSON Lines","*.jsonl"), ("JSON Lines gzip","*.jsonl.gz"), ("CSV Files","*.csv"), ("TXT Files","*.txt"), ("All files","*.*")]
+INTEGRITY_MAX_OK_LINES = 20000  # verification output keeps every problem but only this many OK lines
+ERRORS_SHOWN = 10  # unreadable files listed by a manifest job's summary dialog (all of them go to the output)
+
+def manifest_kind(file_path: str) -> str:
+    """'jsonl.gz', 'jsonl', 'json', 'csv' or 'txt' from the file name."""
+    lower = file_path.lower()
+    for kind in ('jsonl.gz', 'jsonl', 'json', 'csv'):
+        if lower.endswith('.' + kind):
+            return kind
+    return 'txt'
+
+def _open_text(file_path: str, mode: str):
+    """Text handle for a manifest; gzip-compressed when the name ends in .gz."""
+    newline = '' if manifest_kind(file_path) == 'csv' else '\n'
+    if file_path.lower().endswith('.gz'):
+        import gzip
+        return gzip.open(file_path, mode + 't', encoding='utf-8', newline=newline)
+    return open(file_path, mode, encoding='utf-8', newline=newline)
+
+class ManifestWriter:
+    """
+    Write manifest entries one at a time (JSONL, JSONL.GZ, JSON, CSV or TXT by extension),
+    so nothing accumulates in memory. JSONL starts with a header record carrying
+    algorithm/base_folder and is flushed every flush_every entries or flush_seconds:
+    a manifest cut short by a crash is still readable up to the last flush.
+    """
+    def __init__(self, file_path: str, algo: str, folder: str, algos: Optional[List[str]] = None, flush_every: int = 1000, flush_seconds: float = 2.0,
+                 filters: Optional[Dict[str, Any]] = None):
+        self.file_path = file_path
+        self.kind = manifest_kind(file_path)
+        self.algos = algos or [algo]
+        self.count = 0
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._last_flush = time.monotonic()
+        self._fh = _open_text(file_path, 'w')
+        if self.kind in ('jsonl', 'jsonl.gz'):
+            header = {'format': MANIFEST_HEADER_FORMAT, 'version': 1, 'algorithm': algo, 'algorithms': self.algos,
+                      'base_folder': folder, 'created': ts()}
+            if filters:
+                header['filters'] = filters  # so verification ignores the same files when looking for extras
+            self._fh.write(json.dumps(header, ensure_ascii=False) + "\n")
+        elif self.kind == 'json':
+            head = json.dumps({'algorithm': algo, 'base_folder': folder, **({'filters': filters} if filters else {})}, ensure_ascii=False, indent=2)
+            self._fh.write(head[:-2] + ',\n  "files": [')
+        elif self.kind == 'csv':
+            fieldnames = ['path','hash','size','algorithm','mtime_ns','sample'] + (['hashes'] if len(self.algos) > 1 else [])
+            self._csv = csv.DictWriter(self._fh, fieldnames=fieldnames)
+            self._csv.writeheader()
+        else:
+            _write_manifest_txt_header(self._fh)
+
+    def write(self, it: Dict[str, Any]) -> None:
+        if self.kind in ('jsonl', 'jsonl.gz'):
+            self._fh.write(json.dumps({k: v for k, v in it.items() if v is not None}, ensure_ascii=False) + "\n")
+        elif self.kind == 'json':
+            body = json.dumps(it, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+            self._fh.write(("," if self.count else "") + "\n    " + body)
+        elif self.kind == 'csv':
+            row = {'path': it.get('path',''), 'hash': it.get('hash',''), 'size': it.get('size',0), 'algorithm': it.get('algorithm',''),
+                   'mtime_ns': it.get('mtime_ns',''), 'sample': it.get('sample','')}
+            if len(self.algos) > 1:
+                row['hashes'] = format_hashes_field(it.get('hashes') or {})
+            self._csv.writerow(row)
+        else:
+            _write_manifest_txt_entry(self._fh, {'file': it.get('path',''), 'hash': it.get('hash',''), 'algorithm': it.get('algorithm',''), 'hashes': it.get('hashes')})
+        self.count += 1
+        now = time.monotonic()
+        if self.count % self.flush_every == 0 or now - self._last_flush >= self.flush_seconds:
+            self._fh.flush()
+            self._last_flush = now
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        if self.kind == 'json':
+            self._fh.write(("\n  " if self.count else "") + "]\n}")
+        self._fh.close()
+        self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_manifest(file_path: str, algo: str, folder: str, manifest: Iterable[Dict], algos: Optional[List[str]] = None) -> None:
+    """Write manifest entries in the format given by the file extension."""
+    with ManifestWriter(file_path, algo, folder, algos) as w:
+        for it in manifest:
+            w.write(it)
+
+def manifest_entry(res: Dict[str, Any], folder: str, algos: List[str]) -> Dict[str, Any]:
+    """Manifest record for a manifest_file_task result; algos[0] is the primary algorithm."""
+    entry = {'path': os.path.relpath(res['path'], folder), 'hash': res['digests'].get(algos[0]), 'size': res['size'], 'algorithm': algos[0],
+             'mtime_ns': res.get('mtime_ns'), 'sample': res.get('sample')}
+    if len(algos) > 1:
+        entry['hashes'] = res['digests']
+    if res.get('leaves'):
+        # JSON/JSONL only: lets a later check locate corruption or verify a byte range leaf by leaf
+        entry['tree'] = {a: {'leaf_size': TREE_ALGOS[a][1], 'leaves': lv} for a, lv in res['leaves'].items()}
+    return entry
+
+def _iter_jsonl(file_path: str) -> Iterator[Dict]:
+    """
+    Records of a JSON Lines file. Only the last line may fail to parse (cut short when the writer
+    was interrupted) and is skipped; a bad line with more records after it is corruption and raises.
+    """
+    fh = _open_text(file_path, 'r')
+    torn = None  # (line number, error) of a line that didn't parse
+    try:
+        for n, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if torn is not None:
+                raise Exception(f'{file_path}: la línea {torn[0]} no es JSON válido ({torn[1]})')
+            try:
+                rec = json.loads(line)
+            except ValueError as e:
+                torn = (n, e)
+                continue
+            yield rec
+    except (EOFError, OSError, zlib.error):
+        return  # truncated gzip stream: everything before it was already yielded
+    finally:
+        fh.close()
+
+def open_manifest(manifest_file: str) -> tuple[Dict[str, Any], Iterator[Dict]]:
+    """
+    Open a manifest for streaming: (header, entries iterator). header has 'algorithm' and
+    'base_folder' when the format records them. JSONL/CSV/TXT are read incrementally;
+    plain JSON still has to be loaded whole.
+    """
+    kind = manifest_kind(manifest_file)
+    if kind in ('jsonl', 'jsonl.gz'):
+        it = _iter_jsonl(manifest_file)
+        first = next(it, None)
+        if first is None:
+            return {}, iter(())
+        if first.get('format') == MANIFEST_HEADER_FORMAT:
+            return first, it
+        import itertools
+        return {}, itertools.chain([first], it)
+    if kind == 'json':
+        with open(manifest_file, 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+        if isinstance(data, dict):
+            return {'algorithm': data.get('algorithm'), 'base_folder': data.get('base_folder'), 'filters': data.get('filters')}, iter(data.get('files', []))
+        return {}, iter(data if isinstance(data, list) else [])
+    if kind == 'csv':
+        def rows():
+            with open(manifest_file, 'r', encoding='utf-8', newline='') as fh:
+                yield from csv.DictReader(fh)
+        it = rows()
+        first = next(it, None)
+        if first is None:
+            return {}, iter(())
+        import itertools
+        return {'algorithm': first.get('algorithm')}, itertools.chain([first], it)
+    if manifest_file.lower().endswith('.txt'):
+        return {}, iter_manifest_txt(manifest_file)
+    raise Exception("Formato de manifest no soportado (usa JSON, JSONL, CSV o TXT)")
+
+def read_manifest(manifest_file: str) -> tuple[List[Dict], Optional[str], Optional[str]]:
+    """Read a whole manifest: (entries, declared algorithm, base_folder)."""
+    header, entries = open_manifest(manifest_file)
+    return list(entries), header.get('algorithm'), header.get('base_folder')
+
+def manifest_entry_path(entry: Dict) -> Optional[str]:
+    return entry.get('path') or entry.get('file') or entry.get('relative_path') or entry.get('file_path') or entry.get('0')
+
+def _as_int(v) -> Optional[int]:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+def plan_verification(files_entries: Iterable[Dict], algo: str, base: str) -> Iterator[tuple[str, str, Dict[str, str], Dict[str, Any]]]:
+    """Verification records: (relative path, absolute path, {algo: expected digest}, stat metadata)."""
+    for entry in files_entries:
+        rel = manifest_entry_path(entry)
+        expected = entry.get('hash') or entry.get('checksum')
+        entry_algo = entry.get('algorithm') or entry.get('alg')
+        use_algo = entry_algo or algo
+        if rel is None:
+            continue
+        # every digest recorded for the entry is checked from a single read
+        expected_all = {use_algo: expected} if expected else {}
+        expected_all.update(entry_hashes(entry))
+        meta = {'size': _as_int(entry.get('size')), 'mtime_ns': _as_int(entry.get('mtime_ns')),
+                'sample': entry.get('sample') or expected_all.get(FINGERPRINT_ALGO) or None}
+        tree = entry.get('tree')
+        if isinstance(tree, dict):
+            meta['tree'] = {a: t['leaves'] for a, t in tree.items()
+                            if a in TREE_ALGOS and isinstance(t, dict) and t.get('leaf_size') == TREE_ALGOS[a][1]}
+        yield rel, os.path.join(base, rel), expected_all, meta
+
+def verification_line(rel: str, status: str, detail: str = '') -> str:
+    return f'{rel} - {status}' + (f' {detail}' if detail else '')
+
+def stat_check(path: str, meta: Dict[str, Any], level: str) -> Optional[tuple[str, str]]:
+    """Tier 1, os.stat only: (status, detail) or None to pass the file on to the next tier."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return 'MISSING', ''
+    except OSError as e:
+        return 'ERROR', str(e)
+    if meta.get('size') is not None and st.st_size != meta['size']:
+        return 'SIZE_MISMATCH', f"(expected {meta['size']} bytes, got {st.st_size})"
+    if level == "quick":
+        if meta.get('mtime_ns') is not None and st.st_mtime_ns != meta['mtime_ns']:
+            return 'MTIME_CHANGED', ''
+        return 'OK', '(stat)'
+    return None
+
+def sample_check(path: str, meta: Dict[str, Any], level: str) -> Optional[tuple[str, str]]:
+    """Tier 2, sampled blocks vs the manifest's 'sample' fingerprint: (status, detail) or None to pass on."""
+    if meta.get('sample'):
+        try:
+            if sample_digest(path) != meta['sample']:
+                return 'SAMPLE_MISMATCH', ''
+        except OSError as e:
+            return 'ERROR', str(e)
+        if level == "sample":
+            return 'OK', '(muestreo)'
+    elif level == "sample":
+        return 'OK', '(stat)'
+    return None
+
+def verify_hash_task(arg: tuple, control: Optional[JobControl] = None, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> tuple[str, str]:
+    """
+    Tier 3 job task, full hash: arg = (path, {algo: expected}[, {tree algo: leaves}[, (start, end)]]) -> (status, detail).
+    With recorded leaves a tree mismatch names the corrupted byte ranges; with a byte range
+    (and leaves) only the leaves overlapping it are read.
+    """
+    path, expected_all = arg[0], arg[1]
+    trees = (arg[2] if len(arg) > 2 else None) or {}
+    byte_range = arg[3] if len(arg) > 3 else None
+    if not expected_all:
+        return 'ERROR', '(no recorded digest)'
+    try:
+        if byte_range and trees:
+            start, end = byte_range
+            bad_ranges = []
+            for a, lv in trees.items():
+                bad_ranges += tree_verify_range(path, a, lv, start, end, control=control)
+            if bad_ranges:
+                return 'MISMATCH', f'{next(iter(trees))} {format_byte_ranges(sorted(set(bad_ranges)))}'
+            return 'OK', f'(bytes {start}-{end})'
+        stats = {}
+        actual_all, _, _ = compute_hashes_file_sync(path, list(expected_all), control=control, stats=stats, progress_snapshot_cb=progress)
+    except JobCancelled:
+        raise
+    except FileNotFoundError:
+        return 'MISSING', ''
+    except OSError as e:
+        return 'ERROR', str(e)  # unreadable (EIO, EACCES, now a directory...): not verified, not corrupted
+    bad = [a for a in expected_all if actual_all.get(a) != expected_all[a]]
+    if bad:
+        a = bad[0]
+        actual_leaves = stats.get('leaves', {}).get(a)
+        if a in trees and actual_leaves:
+            return 'MISMATCH', f'{a} {format_byte_ranges(tree_bad_ranges(a, trees[a], actual_leaves))}'
+        return 'MISMATCH', f'{a} (expected {expected_all[a]}, got {actual_all.get(a)})'
+    if set(expected_all) == {FINGERPRINT_ALGO}:
+        return 'OK', '(huella de muestreo)'
+    return 'OK', ''
+
+def external_sort(lines: Iterable[str], run_lines: int = 200_000, tmpdir: Optional[str] = None) -> Iterator[str]:
+    """Sort single-line strings with bounded memory: sorted runs spilled to disk, then heapq.merge."""
+    import heapq
+    import tempfile
+    runs = []
+    try:
+        buf = []
+        for line in lines:
+            buf.append(line)
+            if len(buf) >= run_lines:
+                buf.sort()
+                run = tempfile.TemporaryFile('w+', encoding='utf-8', dir=tmpdir)
+                run.writelines(x + "\n" for x in buf)
+                run.seek(0)
+                runs.append(run)
+                buf = []
+        buf.sort()
+        if not runs:
+            yield from buf
+            return
+        yield from heapq.merge(buf, *((ln.rstrip("\n") for ln in run) for run in runs))
+    finally:
+        for run in runs:
+            run.close()
+
+def _path_key(rel: str) -> str:
+    return json.dumps(os.path.normcase(os.path.normpath(rel)), ensure_ascii=False)
+
+def find_extra_files(base: str, known: Iterable[str], skip: Iterable[str] = (), options: Optional[WalkOptions] = None) -> Iterator[str]:
+    """Relative paths under base (walked with the manifest's filters) that the manifest doesn't list (sort-merge, memory bounded by run size)."""
+    def on_disk():
+        for p, _ in walk_files(base, options, skip):
+            rel = os.path.relpath(p, base)
+            yield _path_key(rel) + "\t" + json.dumps(rel, ensure_ascii=False)
+
+    known_sorted = external_sort(_path_key(p) for p in known)
+    k = next(known_sorted, None)
+    for line in external_sort(on_disk()):
+        key, _, rel = line.partition("\t")
+        while k is not None and k < key:
+            k = next(known_sorted, None)
+        if k != key:
+            yield json.loads(rel)
+
+class VerifyJob(HashJob):
+    """
+    Tiered manifest verification, cheapest checks first so problems surface early:
+      1. os.stat for every entry: MISSING / SIZE_MISMATCH (quick level: MTIME_CHANGED, then stop)
+      2. files on disk absent from the manifest: 'extra' events
+      3. sampled blocks vs the recorded fingerprint: SAMPLE_MISMATCH (sample level stops here)
+      4. full hash on the worker pool, only for files that passed 1 and 3
+         (with byte_range, entries with recorded tree leaves only re-read the leaves in that range)
+    Entries inside archives ('bundle.zip!member') only get the archive checked for presence below
+    full level; at full level each archive is verified in one pass (verify_archive) after the files.
+    plan is consumed once as a stream; files passing a tier are spilled to a temp file rather
+    than kept in memory. Events: ('result', relative path, (status, detail)) and ('extra', None, relative path).
+    """
+    def __init__(self, plan: Iterable[tuple[str, str, Dict[str, str], Dict[str, Any]]], level: str = "full", base: Optional[str] = None,
+                 skip_extra: Iterable[str] = (), workers: int = DEFAULT_WORKERS, mode: str = "Hilos", byte_range: Optional[tuple[int, int]] = None,
+                 walk_options: Optional[WalkOptions] = None):
+        self.plan = plan
+        self.walk_options = walk_options
+        self.byte_range = byte_range
+        self.level = level
+        self.base = base
+        self.skip_extra = list(skip_extra)
+        super().__init__(verify_hash_task, self._tiers(), workers=workers, mode=mode)
+
+    def _sample_tier(self, rec) -> Optional[tuple[str, str]]:
+        # at full level, entries with tree leaves go straight to the hash tier, which names the corrupted ranges
+        if self.level == "full" and rec[3].get('tree'):
+            return None
+        return sample_check(rec[1], rec[3], self.level)
+
+    def _archive_tier(self, spill: str):
+        """Entries spilled as 'archive path<TAB>record' lines, grouped by archive with external_sort."""
+        import itertools
+        with open(spill, 'r', encoding='utf-8') as src:
+            lines = external_sort(ln.rstrip("\n") for ln in src)
+            for arc_key, group in itertools.groupby(lines, key=lambda ln: ln.partition("\t")[0]):
+                if self._stopped():
+                    return
+                archive = json.loads(arc_key)
+                recs = [json.loads(ln.partition("\t")[2]) for ln in group]  # one archive's entries at a time
+                if not os.path.isfile(archive):
+                    for rec in recs:
+                        self._emit(('result', rec[0], ('MISSING', '')))
+                    continue
+                if self.level != "full":
+                    for rec in recs:
+                        self._emit(('result', rec[0], ('OK', '(archivo presente)')))
+                    continue
+                by_name = {split_archive_path(rec[0])[1]: rec for rec in recs}
+                members = {name: (rec[2], rec[3].get('size')) for name, rec in by_name.items()}
+                arc_rel = split_archive_path(recs[0][0])[0]
+                try:
+                    for name, status, detail in verify_archive(archive, members, self.control):
+                        if name not in by_name:
+                            if self.base:
+                                self._emit(('extra', None, arc_rel + ARCHIVE_SEP + name))
+                            continue
+                        self._emit(('result', by_name.pop(name)[0], (status, detail)))
+                except JobCancelled:
+                    return
+                except Exception as e:
+                    for rec in by_name.values():
+                        self._emit(('result', rec[0], ('ERROR', str(e))))
+
+    def _tiers(self):
+        import tempfile
+        from concurrent.futures import ThreadPoolExecutor
+        tmp = tempfile.TemporaryDirectory(prefix="hashgen_verify_")
+        try:
+            survivors = os.path.join(tmp.name, "stat_ok.jsonl")
+            known = os.path.join(tmp.name, "known.txt")
+            in_archives = os.path.join(tmp.name, "archive_members.txt")
+            with open(survivors, 'w', encoding='utf-8') as out, open(known, 'w', encoding='utf-8') as kn, \
+                    open(in_archives, 'w', encoding='utf-8') as arc:
+                for rec in self.plan:
+                    if self._stopped():
+                        return
+                    rel, path, _, meta = rec
+                    kn.write(json.dumps(rel, ensure_ascii=False) + "\n")
+                    split = split_archive_path(rel)
+                    if split:
+                        kn.write(json.dumps(split[0], ensure_ascii=False) + "\n")  # the archive itself isn't an extra file
+                        arc.write(json.dumps(split_archive_path(path)[0], ensure_ascii=False) + "\t" + json.dumps(rec, ensure_ascii=False) + "\n")
+                        continue
+                    r = stat_check(path, meta, self.level)
+                    if r is None:
+                        out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                    else:
+                        self._emit(('result', rel, r))
+            if self.base and os.path.isdir(self.base):
+                with open(known, 'r', encoding='utf-8') as kn:
+                    for rel in find_extra_files(self.base, (json.loads(ln) for ln in kn), self.skip_extra, self.walk_options):
+                        self._emit(('extra', None, rel))
+            if self.level == "quick":
+                self._archive_tier(in_archives)
+                return
+            passed = os.path.join(tmp.name, "sample_ok.jsonl")
+            with open(survivors, 'r', encoding='utf-8') as src, open(passed, 'w', encoding='utf-8') as out, \
+                    ThreadPoolExecutor(max_workers=self.workers) as ex:
+                while True:
+                    if self._stopped():
+                        return
+                    recs = [json.loads(ln) for _, ln in zip(range(1024), src)]
+                    if not recs:
+                        break
+                    for rec, r in zip(recs, ex.map(self._sample_tier, recs)):
+                        if r is None:
+                            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                        else:
+                            self._emit(('result', rec[0], r))
+            if self.level != "full":
+                self._archive_tier(in_archives)
+                return
+            with open(passed, 'r', encoding='utf-8') as src:
+                for ln in src:
+                    rel, path, expected_all, meta = json.loads(ln)
+                    yield rel, (path, expected_all, meta.get('tree'), self.byte_range)
+            self._archive_tier(in_archives)  # runs alongside the last hashes still on the pool
+        finally:
+            tmp.cleanup()
+
+# --------------------------- Manifest diff ---------------------------
+MANIFEST_DIFF_STATUSES = ("MODIFIED", "MOVED", "DUPLICATED", "ADDED", "REMOVED")
+
+def _diff_escape(rel: str) -> str:
+    """rel as one field without tabs or newlines (undone by _diff_unescape)."""
+    return rel.encode('unicode_escape').decode('ascii')
+
+def _diff_unescape(field: str) -> str:
+    return field.encode('ascii').decode('unicode_escape')
+
+def _diff_algo(manifest_file: str) -> Optional[str]:
+    """Algorithm a diff compares by default: the manifest's own, or its first entry's."""
+    header, entries = open_manifest(manifest_file)
+    first = next(entries, None) or {}
+    return header.get('algorithm') or first.get('algorithm') or first.get('alg') or next(iter(entry_hashes(first)), None)
+
+def _diff_sort_side(manifest_file: str, algo: str, output: str) -> int:
+    """
+    Write one side of a diff to output as 'path key<TAB>digest<TAB>size<TAB>path' lines sorted
+    by path key (external_sort); returns the number of entries. Top-level so the two sides can
+    be read and sorted at the same time in a process pool.
+    """
+    header, entries = open_manifest(manifest_file)
+    header_algo = header.get('algorithm') or ''
+    want = algo.upper()
+    counts = {'entries': 0, 'digests': 0}
+
+    def lines():
+        for e in entries:
+            rel = manifest_entry_path(e)
+            if rel is None:
+                continue
+            digest = None
+            if (e.get('algorithm') or e.get('alg') or header_algo).upper() == want:
+                digest = e.get('hash') or e.get('checksum')
+            if not digest and e.get('hashes'):
+                digest = next((h for a, h in entry_hashes(e).items() if a.upper() == want), None)
+            size = _as_int(e.get('size'))
+            counts['entries'] += 1
+            counts['digests'] += bool(digest)
+            esc, key = _diff_escape(rel), os.path.normcase(rel)
+            yield f"{esc if key == rel else _diff_escape(key)}\t{digest.lower() if digest else ''}\t{'' if size is None else size}\t{esc}"
+
+    with open(output, 'w', encoding='utf-8') as out:
+        out.writelines(ln + "\n" for ln in external_sort(lines(), tmpdir=os.path.dirname(output)))
+    if counts['entries'] and not counts['digests']:
+        raise Exception(f'{manifest_file} no registra hashes {algo}')
+    return counts['entries']
+
+def diff_manifests(old_file: str, new_file: str, algo: Optional[str] = None,
+                   stats: Optional[Dict[str, int]] = None) -> Iterator[tuple[str, str, Dict[str, Any]]]:
+    """
+    What changed between two manifests (any format), from the recorded digests only - nothing is re-hashed.
+    Yields (status, path, info), status one of MANIFEST_DIFF_STATUSES:
+      1. both sides sorted by path (external_sort, the two at once on a process pool) and merged:
+         same path, other digest -> MODIFIED (info: old_hash, new_hash, old_size, new_size).
+         Paths on one side only are spilled by digest.
+      2. the spill sorted by digest and grouped: a removed and an added path with the same digest ->
+         MOVED (info 'from'; same file name paired first); an added path whose content the old
+         manifest already had at a path that's still there -> DUPLICATED (info 'from'); the rest
+         ADDED / REMOVED (info: hash, size).
+    Memory stays bounded by the sort runs (and one digest group), so multi-million entry manifests are fine.
+    stats, if given, gets 'old', 'new' and 'unchanged' counts.
+    """
+    import itertools
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+    algo = algo or _diff_algo(old_file)
+    if not algo:
+        raise Exception(f'{old_file} no registra hashes')
+    counts = stats if stats is not None else {}
+    counts['unchanged'] = 0
+    with tempfile.TemporaryDirectory(prefix="hg-diff-") as tmp:
+        sides = [os.path.join(tmp, "old.txt"), os.path.join(tmp, "new.txt")]
+        with ProcessPoolExecutor(max_workers=2) as ex:
+            counts['old'], counts['new'] = ex.map(_diff_sort_side, [old_file, new_file], [algo, algo], sides)
+
+        spill = os.path.join(tmp, "by_digest.txt")
+        with open(sides[0], 'r', encoding='utf-8') as old, open(sides[1], 'r', encoding='utf-8') as new, \
+                open(spill, 'w', encoding='utf-8') as out:
+            o, n = next(old, None), next(new, None)
+            while o is not None or n is not None:
+                ok, _, orec = o.partition("\t") if o is not None else (None, '', '')
+                nk, _, nrec = n.partition("\t") if n is not None else (None, '', '')
+                if nk is None or (ok is not None and ok < nk):
+                    digest, size, rel = orec.rstrip("\n").split("\t")
+                    if digest:
+                        out.write(f"{digest}\tR\t{size}\t{rel}\n")
+                    else:
+                        yield 'REMOVED', _diff_unescape(rel), {'hash': None, 'size': _as_int(size)}
+                    o = next(old, None)
+                elif ok is None or nk < ok:
+                    digest, size, rel = nrec.rstrip("\n").split("\t")
+                    if digest:
+                        out.write(f"{digest}\tA\t{size}\t{rel}\n")
+                    else:
+                        yield 'ADDED', _diff_unescape(rel), {'hash': None, 'size': _as_int(size)}
+                    n = next(new, None)
+                else:
+                    old_digest, old_size, old_rel = orec.rstrip("\n").split("\t")
+                    new_digest, new_size, rel = nrec.rstrip("\n").split("\t")
+                    if old_digest != new_digest or (not old_digest and old_size != new_size):
+                        yield 'MODIFIED', _diff_unescape(rel), {'old_hash': old_digest or None, 'new_hash': new_digest or None,
+                                                                'old_size': _as_int(old_size), 'new_size': _as_int(new_size)}
+                    else:
+                        counts['unchanged'] += 1
+                    if old_digest:
+                        # content the old manifest had at a path that's still there: an added path with it is a copy
+                        out.write(f"{old_digest}\tK\t{old_size}\t{old_rel}\n")
+                    o, n = next(old, None), next(new, None)
+
+        with open(spill, 'r', encoding='utf-8') as src:
+            lines = external_sort((ln.rstrip("\n") for ln in src), tmpdir=tmp)
+            for digest, group in itertools.groupby(lines, key=lambda ln: ln.partition("\t")[0]):
+                tagged = {'R': [], 'A': [], 'K': []}
+                for ln in group:
+                    _, tag, size, rel = ln.split("\t")
+                    tagged[tag].append((_diff_unescape(rel), _as_int(size)))
+                removed, added, kept = tagged['R'], tagged['A'], tagged['K']
+                moves = []
+                if removed and added:
+                    by_name: Dict[str, List[tuple[str, Optional[int]]]] = {}
+                    for rec in added:
+                        by_name.setdefault(os.path.basename(rec[0]), []).append(rec)
+                    unpaired = []
+                    for rec in removed:
+                        same = by_name.get(os.path.basename(rec[0]))
+                        if same:
+                            moves.append((rec, same.pop(0)))
+                        else:
+                            unpaired.append(rec)
+                    left = sorted(rec for recs in by_name.values() for rec in recs)
+                    moves += zip(unpaired, left)
+                    removed = unpaired[len(left):]
+                    moved_to = {dst for _, dst in moves}
+                    added = [rec for rec in added if rec not in moved_to]
+                for src_rec, (rel, size) in moves:
+                    yield 'MOVED', rel, {'from': src_rec[0], 'hash': digest, 'size': size}
+                origin = kept[0][0] if kept else (moves[0][1][0] if moves else None)
+                for rel, size in added:
+                    if origin is None:
+                        yield 'ADDED', rel, {'hash': digest, 'size': size}
+                    else:
+                        yield 'DUPLICATED', rel, {'from': origin, 'hash': digest, 'size': size}
+                for rel, size in removed:
+                    yield 'REMOVED', rel, {'hash': digest, 'size': size}
+
+def format_diff_line(status: str, rel: str, info: Dict[str, Any]) -> str:
+    if status == 'MODIFIED':
+        if info['old_hash'] or info['new_hash']:
+            detail = f"({info['old_hash']} -> {info['new_hash']})"
+        else:
+            detail = f"({info['old_size']} -> {info['new_size']} bytes)"
+    elif status == 'MOVED':
+        detail = f"(desde {info['from']})"
+    elif status == 'DUPLICATED':
+        detail = f"(copia de {info['from']})"
+    else:
+        detail = ''
+    return verification_line(rel, status, detail)
+
+# --------------------------- Journals ---------------------------
+def _trim_torn_line(path: str):
+    """Cut a half-written last line (crash mid-write) so appended records start on a line of their own."""
+    try:
+        with open(path, 'rb+') as fh:
+            size = fh.seek(0, os.SEEK_END)
+            pos = size
+            while pos > 0:
+                step = min(65536, pos)
+                fh.seek(pos - step)
+                nl = fh.read(step).rfind(b"\n")
+                if nl >= 0:
+                    pos = pos - step + nl + 1
+                    break
+                pos -= step
+            if pos != size:
+                fh.truncate(pos)
+    except FileNotFoundError:
+        pass
+
+class JobJournal:
+    """
+    Append-only JSONL log of a long job's finished files, so an interrupted run can resume:
+    a header line ({format, kind, ...job parameters}) then one record per file, flushed every
+    flush_seconds (a crash loses at most that much). Readers stop at a torn last line.
+    """
+    def __init__(self, path: str, header: Optional[Dict[str, Any]] = None, flush_seconds: float = 1.0):
+        """With a header a new journal is started (replacing any old one); without, records are appended."""
+        self.path = str(path)
+        self.flush_seconds = flush_seconds
+        self.count = 0
+        if header is None:
+            _trim_torn_line(self.path)
+        self._fh = open(self.path, 'w' if header is not None else 'a', encoding='utf-8', newline='\n')
+        self._last_flush = time.monotonic()
+        if header is not None:
+            self._fh.write(json.dumps({'format': JOURNAL_FORMAT, 'created': ts(), **header}, ensure_ascii=False) + "\n")
+            self._fh.flush()
+
+    def write(self, rec: Dict[str, Any]):
+        self._fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self.count += 1
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_seconds:
+            self._fh.flush()
+            self._last_flush = now
+
+    def finish(self):
+        """Mark the job as completed (nothing left to resume) and close."""
+        self.write({'finished': True})
+        self.close()
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def discard(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_journal(path: str) -> tuple[Optional[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+    """(header, records) of a journal; header is None if the file is missing or isn't a journal."""
+    if not os.path.isfile(path):
+        return None, iter(())
+    it = _iter_jsonl(str(path))
+    header = next(it, None)
+    if not isinstance(header, dict) or header.get('format') != JOURNAL_FORMAT:
+        it.close()
+        return None, iter(())
+    return header, it
+
+def journal_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    File records of a journal, only the last one per path (a file redone after it changed is logged twice),
+    ordered by JSON-quoted path. One read through external_sort: memory is bounded by its run size, not the journal.
+    """
+    def keyed():
+        _, recs = read_journal(path)
+        for i, rec in enumerate(recs):
+            if 'path' in rec:  # JSON escapes tabs and newlines: the key ends at the first tab
+                yield f"{json.dumps(rec['path'], ensure_ascii=False)}\t{i:012d}\t{json.dumps(rec, ensure_ascii=False)}"
+
+    key = last = None
+    for line in external_sort(keyed()):
+        k, _, rest = line.partition("\t")
+        if last is not None and k != key:
+            yield json.loads(last)
+        key, last = k, rest.partition("\t")[2]
+    if last is not None:
+        yield json.loads(last)
+
+def _journal_matches(header: Optional[Dict[str, Any]], params: Dict[str, Any]) -> bool:
+    return header is not None and all(header.get(k) == v for k, v in params.items())
+
+def _still_same(path: str, rec: Dict[str, Any]) -> bool:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return st.st_size == rec.get('size') and st.st_mtime_ns == rec.get('mtime_ns')
+
+def resume_manifest_journal(output: str, folder: str, algos: List[str], filters: Optional[Dict[str, Any]] = None,
+                            resume: bool = True) -> tuple[JobJournal, Dict[str, tuple[int, int]]]:
+    """
+    Journal of a manifest being built into output (kept next to it, output + JOURNAL_SUFFIX).
+    A journal left by an interrupted run over the same folder/algorithms/filters is compacted to the
+    entries whose file still has the recorded size and mtime; those are returned as
+    {relative path: (size, mtime_ns)} for walk_manifest_items to skip. Otherwise a new journal starts.
+    """
+    path = output + JOURNAL_SUFFIX
+    params = {'kind': 'manifest', 'base_folder': os.path.abspath(folder), 'algorithms': list(algos), 'filters': filters}
+    done: Dict[str, tuple[int, int]] = {}
+    header, _ = read_journal(path)
+    if not resume or not _journal_matches(header, params):
+        return JobJournal(path, params), done
+    tmp = path + ".tmp"
+    with JobJournal(tmp, params) as compacted:
+        for rec in journal_records(path):
+            if _still_same(os.path.join(folder, rec['path']), rec):
+                compacted.write(rec)
+                done[rec['path']] = (rec['size'], rec['mtime_ns'])
+    os.replace(tmp, path)
+    return JobJournal(path), done
+
+def finalize_manifest_journal(journal: JobJournal, output: str, folder: str, algos: List[str],
+                              filters: Optional[Dict[str, Any]] = None) -> int:
+    """Write the journal's entries to output in its chosen format; returns the number of entries."""
+    journal.close()
+    with ManifestWriter(output, algos[0], folder, algos, filters=filters) as w:
+        for rec in journal_records(journal.path):
+            w.write(rec)
+    return w.count
+
+def load_batch_journal(path: str, algos: Optional[List[str]] = None) -> tuple[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    (header, {path: record}) of an unfinished batch journal, keeping only records whose file still has
+    the recorded size and mtime (and, if algos is given, only when the journal used the same algorithms).
+    The journal is read once; a file logged twice keeps its last record.
+    """
+    header, recs = read_journal(path)
+    if header is None or header.get('kind') != 'batch':
+        return None, {}
+    if algos is not None and header.get('algorithms') != list(algos):
+        recs.close()
+        return header, {}
+    done: Dict[str, Dict[str, Any]] = {}
+    for rec in recs:
+        if rec.get('finished'):
+            return None, {}
+        if 'path' in rec:
+            done[rec['path']] = rec
+    return header, {p: rec for p, rec in done.items() if _still_same(p, rec)}
+
+def write_batch_file_list(path: Path, files: Iterable[tuple[str, Optional[int]]]) -> int:
+    """Save a batch's (path, size) list one record per line, for read_batch_file_list; returns how many."""
+    tmp = str(path) + ".tmp"
+    count = 0
+    with open(tmp, 'w', encoding='utf-8', newline='\n') as fh:
+        for p, size in files:
+            fh.write(json.dumps([p, size], ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(tmp, path)
+    return count
+
+def read_batch_file_list(path: Path) -> Iterator[tuple[str, Optional[int]]]:
+    for p, size in _iter_jsonl(str(path)):
+        yield p, size
+
+def batch_journal_record(value: Dict[str, Any]) -> Dict[str, Any]:
+    """What a batch journal keeps of a hash_file_task result."""
+    return {k: value[k] for k in ('path', 'size', 'mtime_ns', 'digests', 'timings')}
+
+# --------------------------- Duplicates ---------------------------
+def partial_digest(path: str, size: int, algo: str = "SHA256") -> str:
+    """
+    Cheap duplicate pre-filter: digest of the size plus the first and last DEDUPE_EDGE bytes.
+    Files of up to 2*DEDUPE_EDGE bytes are read whole, so for them this is the plain digest.
+    """
+    h = _init_hasher(algo)
+    with open(path, 'rb') as f:
+        if size <= 2 * DEDUPE_EDGE:
+            h.update(f.read())
+        else:
+            h.update(size.to_bytes(8, 'little'))
+            h.update(_pread(f, DEDUPE_EDGE, 0))
+            h.update(_pread(f, DEDUPE_EDGE, size - DEDUPE_EDGE))
+    return h.hexdigest()
+
+def _partial_or_none(item: tuple[int, str], algo: str) -> Optional[str]:
+    try:
+        return partial_digest(item[1], item[0], algo)
+    except OSError:
+        return None  # unreadable / vanished since the walk: it can't be shown to be a duplicate
+
+class DedupeJob(HashJob):
+    """
+    Duplicate finder, each stage only reads what the previous one couldn't rule out:
+      1. walk the folders and group by size (external sort, memory bounded); unique sizes are dropped,
+         as are extra hard links / overlapping folders (same device + inode)
+      2. partial digest (size + first/last DEDUPE_EDGE bytes) of the same-size files; unique ones dropped.
+         Files no bigger than 2*DEDUPE_EDGE were read whole, so their groups are final here
+      3. full digest of what's left on the worker pool (hash_file_task: digest cache, metrics, pause/cancel)
+    Events: ('group', None, {size, hash, paths}) for groups settled in stage 2, ('result', path, hash_file_task
+    value) for stage 3 files (DuplicateCollector groups them by size + digest), and ('stats', None, counters)
+    once stage 2 is over.
+    """
+    def __init__(self, folders: Iterable[str], algo: str = "SHA256", options: Optional[WalkOptions] = None,
+                 workers: int = DEFAULT_WORKERS, mode: str = "Hilos"):
+        if algo == FINGERPRINT_ALGO:
+            raise Exception(f'{FINGERPRINT_ALGO} no sirve para buscar duplicados: no lee el contenido completo')
+        self.folders = list(folders)
+        self.algo = algo
+        self.options = options
+        self.stats = {'files': 0, 'bytes': 0, 'partial_files': 0, 'partial_bytes': 0, 'full_files': 0, 'full_bytes': 0}
+        super().__init__(hash_file_task, self._stages(), workers=workers, mode=mode)
+
+    def _by_size(self) -> Iterator[tuple[int, List[str]]]:
+        def walked():
+            for folder in self.folders:
+                for p, st in walk_files(folder, self.options):
+                    if self._stopped():
+                        return
+                    if st.st_size == 0:
+                        continue  # empty files are all "equal" and reclaim nothing
+                    self.stats['files'] += 1
+                    self.stats['bytes'] += st.st_size
+                    yield f"{st.st_size:020d}\t{st.st_dev}:{st.st_ino}\t" + json.dumps(p, ensure_ascii=False)
+
+        size, members = None, {}
+        for line in external_sort(walked()):
+            s, ident, p = line.split("\t", 2)
+            if s != size:
+                if len(members) > 1:
+                    yield int(size), list(members.values())
+                size, members = s, {}
+            members.setdefault(ident, json.loads(p))
+        if len(members) > 1:
+            yield int(size), list(members.values())
+
+    def _partial_round(self, ex, groups: List[tuple[int, List[str]]]) -> Iterator[tuple[str, tuple]]:
+        items = [(size, p) for size, paths in groups for p in paths]
+        self.stats['partial_files'] += len(items)
+        self.stats['partial_bytes'] += sum(min(size, 2 * DEDUPE_EDGE) for size, _ in items)
+        by_partial: Dict[tuple[int, str], List[str]] = {}
+        for (size, p), digest in zip(items, ex.map(lambda it: _partial_or_none(it, self.algo), items)):
+            if digest is not None:
+                by_partial.setdefault((size, digest), []).append(p)
+        for (size, digest), paths in by_partial.items():
+            if len(paths) < 2:
+                continue
+            if size <= 2 * DEDUPE_EDGE:
+                self._emit(('group', None, {'size': size, 'hash': digest, 'paths': sorted(paths)}))
+                continue
+            for p in paths:
+                self.stats['full_files'] += 1
+                self.stats['full_bytes'] += size
+                yield p, (p, [self.algo], size)
+
+    def _stages(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            batch, n = [], 0
+            for size, paths in self._by_size():
+                if self._stopped():
+                    return
+                batch.append((size, paths))
+                n += len(paths)
+                if n >= DEDUPE_BATCH:
+                    yield from self._partial_round(ex, batch)
+                    batch, n = [], 0
+            yield from self._partial_round(ex, batch)
+        self._emit(('stats', None, dict(self.stats)))
+
+class DuplicateCollector:
+    """Builds the duplicate sets from DedupeJob events; stage 3 results are grouped by (size, digest)."""
+    def __init__(self, algo: str):
+        self.algo = algo
+        self.stats: Dict[str, int] = {}
+        self.errors: List[tuple[str, str]] = []
+        self._groups: List[Dict[str, Any]] = []
+        self._full: Dict[tuple[int, str], List[str]] = {}
+
+    def feed(self, kind: str, key: Any, value: Any):
+        if kind == 'group':
+            self._groups.append(value)
+        elif kind == 'result':
+            self._full.setdefault((value['size'], value['digests'][self.algo]), []).append(value['path'])
+        elif kind == 'stats':
+            self.stats = value
+        elif kind == 'error':
+            self.errors.append((key, value))
+
+    def groups(self) -> List[Dict[str, Any]]:
+        """Duplicate sets, most reclaimable bytes first: {size, hash, paths, reclaimable}."""
+        out = list(self._groups)
+        out += [{'size': size, 'hash': digest, 'paths': sorted(paths)} for (size, digest), paths in self._full.items() if len(paths) > 1]
+        for g in out:
+            g['reclaimable'] = g['size'] * (len(g['paths']) - 1)
+        return sorted(out, key=lambda g: (-g['reclaimable'], g['paths'][0]))
+
+def format_duplicates(groups: List[Dict[str, Any]], stats: Optional[Dict[str, int]] = None) -> str:
+    lines = []
+    for i, g in enumerate(groups, 1):
+        lines.append(f"[{i}] {len(g['paths'])} copias de {format_bytes(g['size'])} — recuperable {format_bytes(g['reclaimable'])} — {g['hash']}")
+        lines += [f"    {p}" for p in g['paths']]
+    lines.append(f"{len(groups)} grupos de duplicados, {format_bytes(sum(g['reclaimable'] for g in groups))} recuperables")
+    if stats:
+        lines.append(format_dedupe_stats(stats))
+    return "\n".join(lines)
+
+def format_dedupe_stats(stats: Dict[str, int]) -> str:
+    """How much each stage had to read: the point of staging is that the last numbers stay small."""
+    return (f"Recorridos: {stats['files']} archivos ({format_bytes(stats['bytes'])}); hash parcial {stats['partial_files']} "
+            f"({format_bytes(stats['partial_bytes'])}); hash completo {stats['full_files']} ({format_bytes(stats['full_bytes'])})")
+
+def write_duplicates_report(groups: List[Dict[str, Any]], file_path: str, algo: str, stats: Optional[Dict[str, int]] = None):
+    """JSON (everything), CSV (one row per file, with its group number) or TXT (format_duplicates), by extension."""
+    low = file_path.lower()
+    if low.endswith('.json'):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({'created': ts(), 'algorithm': algo, 'stats': stats or {},
+                       'reclaimable_bytes': sum(g['reclaimable'] for g in groups), 'groups': groups}, f, ensure_ascii=False, indent=2)
+    elif low.endswith('.csv'):
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            w = csv.writer(f)
+            w.writerow(["group", "size_bytes", "algorithm", "hash", "path"])
+            for i, g in enumerate(groups, 1):
+                for p in g['paths']:
+                    w.writerow([i, g['size'], algo, g['hash'], p])
+    else:
+        with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(f"# DUPLICADOS - {algo} - generado: {ts()}\n\n")
+            f.write(format_duplicates(groups, stats) + "\n")
+
+def run_job_blocking(job: HashJob, on_event: Callable[[str, Any, Any], None],
+                     on_metrics: Optional[Callable[[Optional[Dict[str, Any]]], None]] = None) -> bool:
+    """
+    Drive a HashJob from a non-GUI caller; returns True if it was cancelled (Ctrl+C cancels).
+    on_metrics gets job.metrics snapshots at most PROGRESS_HZ times per second, and None
+    before any event is handled and at the end (so a status line can be cleared first).
+    """
+    job.start()
+    shown = False
+    last = 0.0
+    try:
+        while True:
+            try:
+                kind, key, value = job.events.get(timeout=1.0 / PROGRESS_HZ if on_metrics else None)
+            except queue.Empty:
+                kind = None
+            if on_metrics and kind is not None and shown:
+                on_metrics(None)
+                shown = False
+            if kind == 'done':
+                return value
+            if kind is not None:
+                on_event(kind, key, value)
+            now = time.monotonic()
+            if on_metrics and now - last >= 1.0 / PROGRESS_HZ:
+                on_metrics(job.metrics.snapshot())
+                shown, last = True, now
+    except KeyboardInterrupt:
+        job.control.cancel()
+        while job.events.get()[0] != 'done':
+            pass
+        return True
+
+# --------------------------- Hash sets ---------------------------
+def digest_size(algo: str) -> int:
+    """Length in bytes of algo's digests."""
+    return algorithm_info(algo).digest_size
+
+def _is_manifest_file(path: str) -> bool:
+    """JSON/JSONL manifests, or a CSV/TXT whose first line is the one this tool writes."""
+    kind = manifest_kind(path)
+    if kind in ('json', 'jsonl', 'jsonl.gz'):
+        return True
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as fh:
+            first = fh.readline()
+    except OSError:
+        return False
+    if kind == 'csv':
+        return {'path', 'hash'} <= {c.strip() for c in first.split(',')}
+    return path.lower().endswith('.txt') and first.startswith("# MANIFEST")
+
+def iter_digest_source(path: str, algo: str, stats: Optional[Dict[str, int]] = None) -> Iterator[str]:
+    """
+    Lowercase hex algo digests listed by path: a manifest of this tool (its entries' digests of algo)
+    or any digest list - sha256sum / BSD-style output, NSRL-style CSV, one digest per line - where the
+    first token of the right width on each line is taken. Manifest values that aren't hex of algo's
+    width are skipped and counted in stats['invalid'].
+    """
+    hex_len = digest_size(algo) * 2
+    if _is_manifest_file(path):
+        header, entries = open_manifest(path)
+        want = algo.upper()
+        for e in entries:
+            digests = {(e.get('algorithm') or e.get('alg') or header.get('algorithm') or '').upper(): e.get('hash') or e.get('checksum')}
+            digests.update({a.upper(): h for a, h in entry_hashes(e).items()})
+            h = str(digests.get(want) or '').strip().lower()
+            if not h:
+                continue
+            if len(h) != hex_len or h.strip('0123456789abcdef'):
+                if stats is not None:
+                    stats['invalid'] = stats.get('invalid', 0) + 1
+                continue
+            yield h
+        return
+    import re
+    token = re.compile(r'(?<![0-9A-Fa-f])[0-9A-Fa-f]{%d}(?![0-9A-Fa-f])' % hex_len)
+    with _open_text(path, 'r') as fh:
+        for line in fh:
+            m = token.search(line)
+            if m:
+                yield m.group(0).lower()
+
+def _bloom_positions(d: bytes, bits: int, probes: int) -> Iterator[int]:
+    """Double hashing over the digest itself (already uniform), or over a BLAKE2b of it when it's shorter than 16 bytes."""
+    if len(d) < 16:
+        d = hashlib.blake2b(d, digest_size=16).digest()
+    h1 = int.from_bytes(d[:8], 'little')
+    h2 = int.from_bytes(d[8:16], 'little') | 1
+    return ((h1 + i * h2) % bits for i in range(probes))
+
+def build_hashset(sources: Iterable[str], output: str, algo: str, label: str = "", bloom: bool = False,
+                  log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Merge the algo digests of sources (manifests or digest lists) into a hash-set index: a
+    HASHSET_HEADER_SIZE header (magic + JSON), the distinct digests sorted as raw fixed-width
+    bytes, and optionally a Bloom filter. Digests go through external_sort, so memory stays
+    bounded however many there are. Returns the header; its 'invalid' counts the manifest values
+    skipped for not being algo digests.
+    """
+    sources = list(sources)
+    width = digest_size(algo)
+    log = log or (lambda msg: None)
+    stats = {'invalid': 0}
+
+    def digests():
+        for src in sources:
+            log(f"leyendo {src}")
+            yield from iter_digest_source(src, algo, stats)
+
+    tmp = output + ".tmp"
+    count, prev = 0, None
+    try:
+        with open(tmp, 'wb') as out:
+            out.write(b"\0" * HASHSET_HEADER_SIZE)
+            for h in external_sort(digests()):
+                if h != prev:
+                    out.write(bytes.fromhex(h))
+                    count += 1
+                    prev = h
+            bloom_bits = (max(64, count * HASHSET_BLOOM_BITS) + 7) // 8 * 8 if bloom else 0
+            if bloom_bits:
+                log(f"filtro Bloom de {bloom_bits // 8} bytes")
+                bits = bytearray(bloom_bits // 8)
+                out.flush()
+                with open(tmp, 'rb') as src:
+                    src.seek(HASHSET_HEADER_SIZE)
+                    while True:
+                        block = src.read(width * 65536)
+                        if not block:
+                            break
+                        for i in range(0, len(block), width):
+                            for p in _bloom_positions(block[i:i + width], bloom_bits, HASHSET_BLOOM_PROBES):
+                                bits[p >> 3] |= 1 << (p & 7)
+                out.write(bits)
+            header = {'format': HASHSET_FORMAT, 'version': 1, 'algorithm': algo, 'digest_size': width, 'count': count,
+                      'label': label or os.path.splitext(os.path.basename(output))[0], 'bloom_bits': bloom_bits,
+                      'bloom_probes': HASHSET_BLOOM_PROBES if bloom_bits else 0, 'created': ts(), 'sources': len(sources),
+                      'invalid': stats['invalid']}
+            head = HASHSET_MAGIC + json.dumps(header, ensure_ascii=False).encode('utf-8') + b"\n"
+            if len(head) > HASHSET_HEADER_SIZE:
+                raise Exception(f'Cabecera del índice demasiado larga ({len(head)} bytes, máximo {HASHSET_HEADER_SIZE}): acorta la etiqueta')
+            out.seek(0)
+            out.write(head.ljust(HASHSET_HEADER_SIZE, b" "))
+    except BaseException:
+        try:
+            os.remove(tmp)  # no half-built index left behind
+        except OSError:
+            pass
+        raise
+    os.replace(tmp, output)
+    return header
+
+class HashSetIndex:
+    """
+    A hash-set index opened for lookups. The file is mmap'ed: opening reads one header whatever
+    the size, and the digests stay in the OS page cache instead of Python objects. 'hexdigest in
+    index' tries the Bloom filter (if the index has one), then binary-searches the sorted digests.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = open(path, 'rb')
+        try:
+            head = self._fh.read(HASHSET_HEADER_SIZE)
+            if not head.startswith(HASHSET_MAGIC):
+                raise Exception(f'No es un índice de hashes: {path}')
+            self.header = json.loads(head[len(HASHSET_MAGIC):].decode('utf-8'))
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._fh.close()
+            raise
+        self.algorithm = self.header['algorithm']
+        self.label = self.header.get('label') or os.path.basename(path)
+        self.width = self.header['digest_size']
+        self.count = self.header['count']
+        self.bloom_bits = self.header.get('bloom_bits') or 0
+        self._bloom_at = HASHSET_HEADER_SIZE + self.count * self.width
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, hexdigest: str) -> bool:
+        try:
+            d = bytes.fromhex(hexdigest)
+        except (TypeError, ValueError):
+            return False
+        if len(d) != self.width:
+            return False
+        mm = self._mm
+        if self.bloom_bits:
+            for p in _bloom_positions(d, self.bloom_bits, self.header['bloom_probes']):
+                if not mm[self._bloom_at + (p >> 3)] & (1 << (p & 7)):
+                    return False
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            off = HASHSET_HEADER_SIZE + mid * self.width
+            cur = mm[off:off + self.width]
+            if cur < d:
+                lo = mid + 1
+            elif cur > d:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def close(self):
+        self._mm.close()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def hashset_status(indexes: Iterable[HashSetIndex], digests: Dict[str, str]) -> str:
+    """'KNOWN (labels)' if a file's digest of some index's algorithm is in that index, else 'UNKNOWN'."""
+    hits = [ix.label for ix in indexes if digests.get(ix.algorithm) and digests[ix.algorithm] in ix]
+    return f"KNOWN ({', '.join(hits)})" if hits else "UNKNOWN"
+
+# --------------------------- Benchmark ---------------------------
+BENCHMARK_PROFILES = {
+    # bytes per in-memory run, total bytes of the "few huge" files, how many of them, how many tiny files
+    'quick': {'mem_bytes': 16 * MB, 'huge_bytes': 128 * MB, 'huge_files': 2, 'tiny_files': 300},
+    'full': {'mem_bytes': 128 * MB, 'huge_bytes': 1024 * MB, 'huge_files': 4, 'tiny_files': 3000},
+}
+BENCHMARK_CHUNK_SIZES = [64 * 1024, 256 * 1024, 1 * MB, 4 * MB, 16 * MB]
+BENCHMARK_TINY_SIZE = 4 * 1024
+BENCHMARK_CHUNK_TOLERANCE = 0.05  # recommend the smallest chunk within 5% of the fastest
+BENCHMARK_FIELDS = ["section", "name", "param", "mb_s", "files_s", "seconds", "size_bytes"]
+
+def _bench_row(section: str, name: str, param: Any, nbytes: int, seconds: float, files: int = 0) -> Dict[str, Any]:
+    return {'section': section, 'name': name, 'param': param, 'size_bytes': nbytes, 'seconds': seconds,
+            'mb_s': nbytes / MB / seconds if seconds else 0.0, 'files_s': files / seconds if files and seconds else None}
+
+def _bench_files(folder: str, count: int, size: int) -> List[str]:
+    os.makedirs(folder, exist_ok=True)
+    block = os.urandom(min(size, 1 * MB))
+    paths = []
+    for i in range(count):
+        p = os.path.join(folder, f"{i:06d}.bin")
+        with open(p, 'wb') as f:
+            left = size
+            while left > 0:
+                f.write(block[:left])
+                left -= len(block[:left])
+            f.flush()
+            os.fsync(f.fileno())
+        paths.append(p)
+    return paths
+
+def _bench_job(paths: List[str], workers: int, mode: str) -> float:
+    job = HashJob(hash_file_task, ((i, (p, ["SHA256"])) for i, p in enumerate(paths)), workers=workers, mode=mode)
+    start = time.perf_counter()
+    run_job_blocking(job, lambda kind, key, value: None)
+    return time.perf_counter() - start
+
+def run_benchmark(profile: str = "quick", tmpdir: Optional[str] = None, algos: Optional[List[str]] = None,
+                  log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Throughput of this machine, as a dict with the environment and a list of result rows:
+      algorithm   each hasher over an in-memory buffer (no I/O)
+      chunk       SHA256 of a temp file read with each of BENCHMARK_CHUNK_SIZES (cold cache when possible)
+      io_backend  read / readinto / mmap on the same file
+      workers     many tiny files vs few huge ones, per worker count and execution mode
+    'recommended_chunk' is the smallest chunk size within BENCHMARK_CHUNK_TOLERANCE of the fastest.
+    The digest cache is disabled while it runs; temp files go to tmpdir (default: system temp).
+    """
+    import platform
+    import tempfile
+    conf = BENCHMARK_PROFILES[profile]
+    log = log or (lambda msg: None)
+    rows = []
+    cache_enabled = ENGINE_SETTINGS['cache']
+    ENGINE_SETTINGS['cache'] = False
+    try:
+        buf = os.urandom(conf['mem_bytes'])
+        view = memoryview(buf)
+        for a in [a for a in algos or SUPPORTED_ALGOS if a != FINGERPRINT_ALGO]:  # constant cost, nothing to measure
+            log(f"algoritmo {a}")
+            h = _init_hasher(a)
+            chunk = ENGINE_SETTINGS['chunk_size']
+            start = time.perf_counter()
+            for off in range(0, len(buf), chunk):
+                h.update(view[off:off + chunk])
+            h.hexdigest()
+            rows.append(_bench_row('algorithm', a, chunk, len(buf), time.perf_counter() - start))
+        view.release()
+        del buf
+
+        with tempfile.TemporaryDirectory(prefix="hashgen_bench_", dir=tmpdir) as tmp:
+            log("creando archivos temporales")
+            huge = _bench_files(os.path.join(tmp, "huge"), conf['huge_files'], conf['huge_bytes'] // conf['huge_files'])
+            tiny = _bench_files(os.path.join(tmp, "tiny"), conf['tiny_files'], BENCHMARK_TINY_SIZE)
+            for size in BENCHMARK_CHUNK_SIZES:
+                log(f"bloque {size // 1024} KB")
+                r = benchmark_io_backends(huge[0], backends=["readinto"], repeat=2, chunk_size=size, cold=True)[0]
+                rows.append(_bench_row('chunk', "readinto", size, r['size_bytes'], r['seconds']))
+            log("métodos de lectura")
+            for r in benchmark_io_backends(huge[0], repeat=2, cold=True):
+                rows.append(_bench_row('io_backend', r['backend'], ENGINE_SETTINGS['chunk_size'], r['size_bytes'], r['seconds']))
+            counts = sorted({n for n in (1, 2, 4, DEFAULT_WORKERS, (os.cpu_count() or 1) * 2) if n <= max(2, (os.cpu_count() or 1) * 2)})
+            for label, paths, nbytes in (("tiny", tiny, len(tiny) * BENCHMARK_TINY_SIZE), ("huge", huge, conf['huge_bytes'])):
+                for mode in EXEC_MODES:
+                    for n in counts:
+                        log(f"{label}: {n} trabajadores, {mode}")
+                        for p in paths:
+                            _drop_file_cache(p)
+                        rows.append(_bench_row('workers', f"{label}/{mode}", n, nbytes, _bench_job(paths, n, mode), len(paths)))
+    finally:
+        ENGINE_SETTINGS['cache'] = cache_enabled
+
+    chunk_rows = [r for r in rows if r['section'] == 'chunk']
+    best = max(r['mb_s'] for r in chunk_rows)
+    recommended = min(r['param'] for r in chunk_rows if r['mb_s'] >= best * (1 - BENCHMARK_CHUNK_TOLERANCE))
+    return {'created': ts(), 'profile': profile, 'platform': platform.platform(), 'python': platform.python_version(),
+            'cpu_count': os.cpu_count(), 'chunk_size': ENGINE_SETTINGS['chunk_size'], 'recommended_chunk': recommended,
+            'results': rows}
+
+def write_benchmark(result: Dict[str, Any], file_path: str):
+    """JSON keeps everything (and can be used as a --baseline later); CSV writes only the result rows."""
+    if file_path.lower().endswith('.csv'):
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            w = csv.DictWriter(f, fieldnames=BENCHMARK_FIELDS, extrasaction='ignore')
+            w.writeheader()
+            w.writerows(result['results'])
+    else:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+def compare_benchmark(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.10) -> List[Dict[str, Any]]:
+    """Rows that got more than `tolerance` slower than the same (section, name, param) row of a saved baseline."""
+    old = {(r['section'], r['name'], r['param']): r for r in baseline.get('results', [])}
+    out = []
+    for r in result['results']:
+        b = old.get((r['section'], r['name'], r['param']))
+        if b and b['mb_s'] and r['mb_s'] < b['mb_s'] * (1 - tolerance):
+            out.append({**r, 'baseline_mb_s': b['mb_s'], 'change': r['mb_s'] / b['mb_s'] - 1})
+    return out
+
+def format_benchmark(result: Dict[str, Any]) -> str:
+    lines = [f"{result['platform']} — Python {result['python']} — {result['cpu_count']} CPU"]
+    titles = {'algorithm': "Algoritmos (memoria)", 'chunk': "Tamaño de bloque", 'io_backend': "Método de lectura", 'workers': "Trabajadores"}
+    for section, title in titles.items():
+        lines.append("")
+        lines.append(title + ":")
+        for r in result['results']:
+            if r['section'] != section:
+                continue
+            param = f"{r['param'] // 1024} KB" if section in ('algorithm', 'chunk', 'io_backend') else f"{r['param']} trabajadores"
+            extra = f"  {r['files_s']:.0f} archivos/s" if r.get('files_s') else ""
+            lines.append(f"  {r['name']:<22} {param:>16}  {r['mb_s']:10.1f} MB/s{extra}")
+    lines.append("")
+    lines.append(f"Bloque actual: {result['chunk_size'] // 1024} KB — recomendado: {result['recommended_chunk'] // 1024} KB")
+    return "\n".join(lines)
+
+# --------------------------- Audit log ---------------------------
+def _rotated_path(path: Path, n: int) -> Path:
+    return path.with_name(f"{path.stem}.{n}{path.suffix}")
+
+class AuditSink:
+    """
+    Audit log writer running on its own thread. append() only queues the row (blocking if
+    AUDIT_QUEUE_MAX rows are pending); the thread writes them in batches every
+    AUDIT_FLUSH_ROWS rows or AUDIT_FLUSH_SECONDS. csv/jsonl files are rotated past
+    AUDIT_MAX_BYTES; the sqlite backend keeps everything, indexed by path.
+    """
+    def __init__(self, backend: str = "csv"):
+        if backend not in AUDIT_BACKENDS:
+            raise Exception(f"Registro de auditoría no soportado: {backend}")
+        self.backend = backend
+        self.path = {'csv': AUDIT_CSV, 'jsonl': AUDIT_JSONL, 'sqlite': AUDIT_DB}[backend]
+        self._queue: "queue.Queue" = queue.Queue(maxsize=AUDIT_QUEUE_MAX)
+        self._conn = None
+        if backend == 'sqlite':
+            self._conn = _open_audit_db(check_same_thread=False)
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, row: tuple):
+        self._queue.put(row)
+
+    def flush(self):
+        """Block until every row queued so far is on disk."""
+        if self._thread.is_alive():
+            ev = threading.Event()
+            self._queue.put(ev)
+            ev.wait()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _run(self):
+        # queue items: a row tuple, an Event (flush marker) or None (stop)
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + AUDIT_FLUSH_SECONDS
+            while len(items) < AUDIT_FLUSH_ROWS and isinstance(items[-1], tuple):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            rows = [it for it in items if isinstance(it, tuple)]
+            if rows:
+                self._write(rows)
+            for it in items:
+                if isinstance(it, threading.Event):
+                    it.set()
+            if items[-1] is None:
+                return
+
+    def _write(self, rows: List[tuple]):
+        try:
+            if self.backend == 'sqlite':
+                self._conn.executemany("INSERT INTO audit VALUES (?,?,?,?,?,?,?)", rows)
+                self._conn.commit()
+                return
+            self._rotate()
+            new = not self.path.exists()
+            with open(self.path, 'a', encoding='utf-8', newline='') as f:
+                if self.backend == 'csv':
+                    w = csv.writer(f)
+                    if new:
+                        w.writerow(AUDIT_FIELDS)
+                    w.writerows(r[:5] + ('' if r[5] is None else f'{r[5]:.6f}', r[6]) for r in rows)
+                else:
+                    f.writelines(json.dumps(dict(zip(AUDIT_FIELDS, r)), ensure_ascii=False) + "\n" for r in rows)
+        except Exception as e:
+            # a full disk or a locked file must not kill the writer (or block append() forever)
+            report_background_error(f"Registro de auditoría {self.path}: no se pudieron escribir {len(rows)} entradas: {e}")
+
+    def _rotate(self):
+        try:
+            if self.path.stat().st_size < AUDIT_MAX_BYTES:
+                return
+        except FileNotFoundError:
+            return
+        for n in range(AUDIT_KEEP - 1, 0, -1):
+            if _rotated_path(self.path, n).exists():
+                os.replace(_rotated_path(self.path, n), _rotated_path(self.path, n + 1))
+        os.replace(self.path, _rotated_path(self.path, 1))
+
+def _open_audit_db(check_same_thread: bool = True):
+    import sqlite3
+    conn = sqlite3.connect(str(AUDIT_DB), timeout=30, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS audit (
+        timestamp TEXT, algorithm TEXT, path_or_text TEXT, type TEXT,
+        size_bytes INTEGER, duration REAL, hash TEXT)""")
+    conn.execute("CREATE INDEX IF NOT EXISTS audit_path ON audit(path_or_text)")
+    conn.commit()
+    return conn
+
+_audit_sink: Optional[AuditSink] = None
+_audit_lock = threading.Lock()
+
+def get_audit_sink() -> AuditSink:
+    """Shared AuditSink for ENGINE_SETTINGS['audit_backend'] (reopened if the backend changed)."""
+    global _audit_sink
+    with _audit_lock:
+        backend = ENGINE_SETTINGS['audit_backend']
+        if _audit_sink is not None and _audit_sink.backend != backend:
+            _audit_sink.close()
+            _audit_sink = None
+        if _audit_sink is None:
+            _audit_sink = AuditSink(backend)
+        return _audit_sink
+
+def close_audit_sink():
+    """Write out pending rows and stop the writer thread (registered with atexit)."""
+    global _audit_sink
+    with _audit_lock:
+        if _audit_sink is not None:
+            _audit_sink.close()
+            _audit_sink = None
+
+atexit.register(close_audit_sink)
+
+def append_audit(algo, path_or_text, type_, size_bytes, duration, hexdigest):
+    # normalised here, on the caller's thread: the writer only gets ints, floats, None and strings
+    get_audit_sink().append((ts(), str(algo), str(path_or_text).replace('\n',' '), str(type_), _as_int(size_bytes),
+                             _as_seconds(duration), str(hexdigest or '')))
+
+def audit_history(path_or_text: str) -> List[Dict[str, Any]]:
+    """Every audit entry recorded for path_or_text, oldest first (rotated csv/jsonl files included)."""
+    backend = ENGINE_SETTINGS['audit_backend']
+    if _audit_sink is not None:
+        _audit_sink.flush()
+    keys = {path_or_text, os.path.abspath(path_or_text)}
+    if backend == 'sqlite':
+        if not AUDIT_DB.exists():
+            return []
+        conn = _open_audit_db()
+        try:
+            marks = ",".join("?" * len(keys))
+            cur = conn.execute(f"SELECT * FROM audit WHERE path_or_text IN ({marks}) ORDER BY rowid", tuple(keys))
+            return [dict(zip(AUDIT_FIELDS, r)) for r in cur]
+        finally:
+            conn.close()
+    base = AUDIT_CSV if backend == 'csv' else AUDIT_JSONL
+    out = []
+    for p in [_rotated_path(base, n) for n in range(AUDIT_KEEP, 0, -1)] + [base]:
+        if not p.exists():
+            continue
+        if backend == 'jsonl':
+            out.extend(r for r in _iter_jsonl(str(p)) if r.get('path_or_text') in keys)
+            continue
+        with open(p, 'r', encoding='utf-8', newline='') as f:
+            out.extend(dict(r) for r in csv.DictReader(f) if r.get('path_or_text') in keys)
+    return out
+
+# --------------------------- Monitor ---------------------------
+class InotifyWatcher:
+    """
+    Recursive inotify watch of a tree (Linux; libc through ctypes, nothing to install).
+    wait(timeout) -> relative paths touched since the last call (a directory that went away ends
+    in os.sep), or None when the kernel queue overflowed and the caller has to stat the whole tree again.
+    """
+    IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x2, 0x4, 0x8, 0x40, 0x80
+    IN_CREATE, IN_DELETE, IN_Q_OVERFLOW, IN_IGNORED, IN_ONLYDIR, IN_ISDIR = 0x100, 0x200, 0x4000, 0x8000, 0x1000000, 0x40000000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith('linux')
+
+    def __init__(self, root: str, options: Optional[WalkOptions] = None):
+        import ctypes
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        self.root = root
+        self.options = options or WalkOptions()
+        self.dirs: Dict[int, str] = {}  # watch descriptor -> directory path
+        try:
+            self._add_tree(root)
+        except Exception:
+            self.close()
+            raise
+
+    def _add_tree(self, top: str):
+        """Watch top and the directories under it, pruning excluded ones like walk_files does."""
+        for folder, dirs, _ in os.walk(top, followlinks=self.options.symlinks == "follow"):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder), self.MASK | self.IN_ONLYDIR)
+            if wd < 0:
+                err = self._ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise Exception('Límite de inotify alcanzado (sube fs.inotify.max_user_watches o usa sondeo)')
+                dirs[:] = []  # vanished or unreadable
+                continue
+            self.dirs[wd] = folder
+            rel = os.path.relpath(folder, self.root).replace(os.sep, '/')
+            rel = "" if rel == "." else rel + "/"
+            dirs[:] = [d for d in dirs if not self.options.excluded(rel + d, d)]
+
+    def _parse(self, buf: bytes, changed: set) -> bool:
+        import struct
+        pos = 0
+        while pos + 16 <= len(buf):
+            wd, mask, _, n = struct.unpack_from('iIII', buf, pos)
+            name = buf[pos + 16:pos + 16 + n].rstrip(b'\0')
+            pos += 16 + n
+            if mask & self.IN_Q_OVERFLOW:
+                return False
+            if mask & self.IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            folder = self.dirs.get(wd)
+            if folder is None or not name:
+                continue
+            path = os.path.join(folder, os.fsdecode(name))
+            rel = os.path.relpath(path, self.root)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._add_tree(path)  # files created in it before the watch existed are found by walking it
+                elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    rel += os.sep
+            changed.add(rel)
+        return True
+
+    def wait(self, timeout: float) -> Optional[set]:
+        """Block up to timeout for a first event, then gather until MONITOR_SETTLE seconds pass without one."""
+        import select
+        changed = set()
+        ready = select.select([self.fd], [], [], timeout)[0]
+        give_up = time.monotonic() + MONITOR_BATCH_SECONDS  # a file written non-stop must not hold the others back
+        while ready:
+            try:
+                buf = os.read(self.fd, 65536)
+            except BlockingIOError:
+                buf = b''
+            if not self._parse(buf, changed):
+                return None
+            if time.monotonic() >= give_up:
+                break
+            ready = select.select([self.fd], [], [], MONITOR_SETTLE)[0]
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollWatcher:
+    """
+    Fallback without notifications: wait() returns None (stat the whole tree) every interval seconds,
+    or less often when a pass is slow, so stat passes over a big tree take at most MONITOR_POLL_DUTY of the time.
+    """
+    def __init__(self, interval: float = MONITOR_INTERVAL):
+        self.interval = self.period = interval
+        self._next = time.monotonic() + interval
+
+    def wait(self, timeout: float) -> Optional[set]:
+        time.sleep(max(0.0, min(timeout, self._next - time.monotonic())))
+        if time.monotonic() < self._next:
+            return set()
+        self._next = time.monotonic() + self.period
+        return None
+
+    def pass_took(self, seconds: float):
+        self.period = max(self.interval, seconds / MONITOR_POLL_DUTY)
+        self._next = time.monotonic() + self.period
+
+    def close(self):
+        pass
+
+def _entry_digests(entry: Dict[str, Any]) -> Dict[str, str]:
+    out = {entry.get('algorithm'): entry.get('hash')}
+    out.update(entry_hashes(entry))
+    return out
+
+class MonitorJob(HashJob):
+    """
+    Keep a manifest's tree under watch and the manifest up to date, until cancelled:
+      1. a stat snapshot (inode, size, mtime_ns) of every file, taken once; files whose size or
+         mtime no longer match their entry are re-hashed straight away
+      2. inotify (Linux) names the touched paths; otherwise (or with poll) the tree is stat'ed
+         again every interval seconds (longer for slow trees, see PollWatcher). Only files whose stat
+         changed are re-hashed, on the pool, so the steady-state cost follows the changes, not the size of the tree
+      3. a re-hashed file with new digests is MODIFIED; new files are ADDED, vanished ones DELETED.
+         Each change is an audit row (type = the change), a ('change', relative path,
+         {change, size, hash, previous}) event and a record in the sidecar journal manifest + MONITOR_SUFFIX
+    The manifest file itself is only rewritten when the monitor stops, merging the journal into it
+    (a journal left by a monitor that didn't get to do that is picked up by the next one).
+    In between only (size, mtime_ns, digests) per entry is kept in memory. A manifest that records
+    no sizes and mtimes (TXT) is refused: every file would have to be re-hashed to start.
+    A manifest with archive members ('bundle.zip!member') keeps them per archive: a changed archive
+    is re-hashed member by member. ('status', None, text) events say what the monitor is doing.
+    """
+    def __init__(self, manifest_file: str, base: Optional[str] = None, algo: Optional[str] = None, interval: float = MONITOR_INTERVAL,
+                 poll: bool = False, workers: int = DEFAULT_WORKERS):
+        """base and algo are only used when the manifest doesn't declare its base folder / algorithm."""
+        self.manifest_file = manifest_file
+        self.base_arg = base
+        self.algo_arg = algo
+        self.interval = interval
+        self.poll = poll
+        self.algos: List[str] = []
+        self.entries: Dict[str, tuple[Optional[int], Optional[int], tuple]] = {}  # relative path -> (size, mtime_ns, digests in algos order)
+        self.archives: Dict[str, set] = {}  # archive relative path -> member entries
+        self.snap: Dict[str, tuple[int, int, int]] = {}  # relative path -> (inode, size, mtime_ns) last seen
+        self.journal: Optional[JobJournal] = None
+        super().__init__(manifest_file_task, (), workers=workers)
+
+    # -- manifest state --
+    def _load(self):
+        header, entries = open_manifest(self.manifest_file)
+        self.header = header
+        self.base = header.get('base_folder') or self.base_arg or os.path.dirname(os.path.abspath(self.manifest_file))
+        if not os.path.isdir(self.base):
+            raise Exception(f'Carpeta base no válida: {self.base}')
+        self.options = WalkOptions.from_dict(header.get('filters'))
+        self.algos = list(header.get('algorithms') or ([header['algorithm']] if header.get('algorithm') else []))
+        files = no_stat = 0
+        for entry in entries:
+            rel = manifest_entry_path(entry)
+            if rel is None:
+                continue
+            if not self.algos:
+                self.algos = [entry.get('algorithm') or entry.get('alg') or self.algo_arg or SUPPORTED_ALGOS[0]]
+            if split_archive_path(rel) is None:
+                files += 1
+                if _as_int(entry.get('size')) is None or _as_int(entry.get('mtime_ns')) is None:
+                    no_stat += 1
+            self._set_entry(rel, entry)
+        if files and no_stat == files:
+            raise Exception(f'{self.manifest_file} no guarda tamaño ni fecha de modificación de los archivos (¿TXT?): vigilarlo obligaría '
+                            'a recalcular todos al empezar. Crea el manifest en JSONL, JSON o CSV.')
+        if no_stat:
+            self._emit(('status', None, f"{no_stat} entradas sin tamaño o fecha: se recalcularán al empezar"))
+        self.algos = self.algos or [self.algo_arg or SUPPORTED_ALGOS[0]]
+        journal_path = self.manifest_file + MONITOR_SUFFIX
+        self._skip = {os.path.normcase(os.path.abspath(p)) for p in (self.manifest_file, journal_path, self._tmp_path())}
+        self._skip_dir = os.path.normcase(os.path.abspath(LOGS_DIR)) + os.sep  # the audit log would report itself forever
+        header_j, _ = read_journal(journal_path)
+        if _journal_matches(header_j, self._journal_params()):
+            # changes of a monitor that didn't get to merge them: applied, and kept for this one's merge
+            for rec in journal_records(journal_path):
+                if rec.get('deleted'):
+                    self._drop_entry(rec['path'])
+                else:
+                    self._set_entry(rec['path'], rec)
+            self.journal = JobJournal(journal_path, flush_seconds=0)
+        else:
+            self.journal = JobJournal(journal_path, self._journal_params(), flush_seconds=0)
+
+    def _journal_params(self) -> Dict[str, Any]:
+        return {'kind': 'monitor', 'manifest': os.path.abspath(self.manifest_file)}
+
+    def _tmp_path(self) -> str:
+        head, name = os.path.split(self.manifest_file)
+        return os.path.join(head, '.tmp-' + name)  # same extension, so ManifestWriter picks the same format
+
+    def _state(self, entry: Dict[str, Any]) -> tuple[Optional[int], Optional[int], tuple]:
+        digests = _entry_digests(entry)
+        return _as_int(entry.get('size')), _as_int(entry.get('mtime_ns')), tuple(digests.get(a) for a in self.algos)
+
+    def _set_entry(self, rel: str, entry: Dict[str, Any]):
+        self.entries[rel] = self._state(entry)
+        split = split_archive_path(rel)
+        if split:
+            self.archives.setdefault(split[0], set()).add(rel)
+
+    def _drop_entry(self, rel: str):
+        self.entries.pop(rel, None)
+        split = split_archive_path(rel)
+        if split and split[0] in self.archives:
+            self.archives[split[0]].discard(rel)
+            if not self.archives[split[0]]:
+                del self.archives[split[0]]
+
+    def _merge(self):
+        """Rewrite the manifest (atomically) with the journaled changes folded in, then drop the journal."""
+        self.journal.close()
+        changes = {rec['path']: rec for rec in journal_records(self.journal.path)}
+        if not changes:
+            self.journal.discard()
+            return
+        self._emit(('status', None, f"Guardando {len(changes)} cambios en el manifest..."))
+        tmp = self._tmp_path()
+        _, entries = open_manifest(self.manifest_file)
+        with ManifestWriter(tmp, self.algos[0], self.header.get('base_folder') or self.base, self.algos, filters=self.header.get('filters')) as w:
+            for entry in entries:
+                rel = manifest_entry_path(entry)
+                if rel is None:
+                    continue
+                rec = changes.pop(rel, None)
+                if rec is None:
+                    entry = dict(entry, path=rel)
+                    if isinstance(entry.get('hashes'), str):
+                        entry['hashes'] = entry_hashes(entry)  # CSV 'MD5:..;CRC32:..' column
+                    w.write(entry)
+                elif not rec.get('deleted'):
+                    w.write(rec)
+            for rec in changes.values():
+                if not rec.get('deleted'):
+                    w.write(rec)
+        os.replace(tmp, self.manifest_file)
+        self.journal.discard()
+
+    # -- changes --
+    def _tracked(self) -> Iterator[str]:
+        """Relative paths of the files the manifest covers (an archive once, not per member)."""
+        yield from (rel for rel in self.entries if split_archive_path(rel) is None)
+        yield from self.archives
+
+    def _wanted(self, rel: str, st: os.stat_result) -> bool:
+        path = os.path.normcase(os.path.abspath(os.path.join(self.base, rel)))
+        if path in self._skip or path.startswith(self._skip_dir) or not stat.S_ISREG(st.st_mode):
+            return False
+        parts = rel.replace(os.sep, '/').split('/')
+        if any(self.options.excluded('/'.join(parts[:i + 1]), parts[i]) for i in range(len(parts) - 1)):
+            return False
+        return self.options.wants_file('/'.join(parts), parts[-1], st.st_size)
+
+    def _rescan(self):
+        """Stat pass over the whole tree (start, polling, inotify overflow): the files whose stat moved get updated."""
+        seen, todo = set(), []
+        for path, st in walk_files(self.base, self.options):
+            if self._stopped():
+                return
+            rel = os.path.relpath(path, self.base)
+            if not self._wanted(rel, st):
+                continue
+            seen.add(rel)
+            if not self._unchanged(rel, st):
+                todo.append((rel, st))
+        todo += [(rel, None) for rel in self._tracked() if rel not in seen]
+        self._update(todo)
+
+    def _unchanged(self, rel: str, st: os.stat_result) -> bool:
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if rel in self.snap:
+            return self.snap[rel] == key
+        e = self.entries.get(rel)
+        if e is not None and e[0] == st.st_size and e[1] == st.st_mtime_ns:
+            self.snap[rel] = key  # first sight, still as recorded: no need to hash it
+            return True
+        return False
+
+    def _touched(self, rels: Iterable[str]):
+        """inotify paths -> (relative path, stat or None if gone) of the files to look at."""
+        todo = []
+        for rel in rels:
+            path = os.path.join(self.base, rel)
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            if rel.endswith(os.sep):
+                st = None
+            if st is not None and stat.S_ISDIR(st.st_mode):
+                for p, fst in walk_files(path, self.options):  # a directory created or moved in
+                    r = os.path.relpath(p, self.base)
+                    if self._wanted(r, fst) and not self._unchanged(r, fst):
+                        todo.append((r, fst))
+            elif rel.endswith(os.sep):
+                todo += [(r, None) for r in self._tracked() if r.startswith(rel)]  # a directory removed or moved out
+            elif st is None or not self._wanted(rel, st):
+                if rel in self.entries or rel in self.archives:
+                    todo.append((rel, None))
+            elif not self._unchanged(rel, st):
+                todo.append((rel, st))
+        self._update(todo)
+
+    def _hash(self, rel: str, st: os.stat_result):
+        path = os.path.join(self.base, rel)
+        arg = (path, self.algos, st.st_size, rel in self.archives or (bool(self.archives) and is_archive_name(rel)))
+        self.metrics.add(rel, st.st_size)
+        try:
+            return manifest_file_task(arg, self.control)
+        except (JobCancelled, FileNotFoundError):
+            raise
+        except Exception as e:
+            self._emit(('error', rel, str(e)))
+            return None
+        finally:
+            self.metrics.file_done(rel)
+
+    def _update(self, todo: List[tuple[str, Optional[os.stat_result]]]):
+        todo = list({rel: st for rel, st in todo}.items())
+        if not todo:
+            return
+        changed = [(rel, st) for rel, st in todo if st is not None]
+        futures = {rel: self._pool.submit(self._hash, rel, st) for rel, st in changed}
+        for rel, st in todo:
+            if st is None:
+                self._apply(rel, None, [])
+                continue
+            try:
+                res = futures[rel].result()
+            except FileNotFoundError:
+                self._apply(rel, None, [])  # deleted while queued
+                continue
+            if res is None:
+                continue
+            results = res if isinstance(res, MultiResult) else [res]
+            self._apply(rel, (st.st_ino, st.st_size, st.st_mtime_ns), results)
+
+    def _apply(self, rel: str, key: Optional[tuple[int, int, int]], results: List[Dict[str, Any]]):
+        """Fold the fresh results for rel (nothing if it's gone) into the state; report what changed."""
+        old = set(self.archives.get(rel, ())) | ({rel} if rel in self.entries else set())
+        if key is None:
+            self.snap.pop(rel, None)
+        else:
+            self.snap[rel] = key
+        for res in results:
+            entry = manifest_entry(res, self.base, self.algos)
+            prev = self.entries.get(entry['path'])
+            old.discard(entry['path'])
+            if prev is None:
+                self._change('ADDED', entry['path'], entry, None, res)
+            elif prev[2] != self._state(entry)[2]:
+                self._change('MODIFIED', entry['path'], entry, prev, res)
+            else:
+                self._set_entry(entry['path'], entry)  # only touched: keep the new size/mtime so the next start doesn't re-hash it
+                self.journal.write(entry)
+        for r in old:
+            self._change('DELETED', r, None, self.entries[r], None)
+
+    def _change(self, kind: str, rel: str, entry: Optional[Dict[str, Any]], prev: Optional[tuple], res: Optional[Dict[str, Any]]):
+        if entry is None:
+            self._drop_entry(rel)
+            self.journal.write({'path': rel, 'deleted': True})
+            size, digests = prev[0], dict(zip(self.algos, prev[2]))
+        else:
+            self._set_entry(rel, entry)
+            self.journal.write(entry)
+            size, digests = entry.get('size'), _entry_digests(entry)
+        for a in self.algos:
+            append_audit(a, os.path.join(self.base, rel), kind, size, (res or {}).get('timings', {}).get(a, 0.0), digests.get(a))
+        self._emit(('change', rel, {'change': kind, 'size': size, 'hash': entry and entry.get('hash'),
+                                    'previous': prev and prev[2][0]}))
+
+    # -- loop --
+    def _dispatch(self):
+        from concurrent.futures import ThreadPoolExecutor
+        watcher = None
+        try:
+            self._emit(('status', None, "Cargando manifest..."))
+            self._load()
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="monitor") as self._pool:
+                how = f"sondeo cada {self.interval:g} s"
+                if not self.poll and InotifyWatcher.available():
+                    try:
+                        watcher, how = InotifyWatcher(self.base, self.options), "inotify"
+                    except Exception as e:
+                        self._emit(('status', None, f"inotify no disponible ({e}); se usa sondeo"))
+                watcher = watcher or PollWatcher(self.interval)
+                # the watch is set up before the first pass, so nothing changing meanwhile goes unseen
+                self._emit(('status', None, f"Comprobando {len(self.entries)} entradas..."))
+                self._rescan()
+                self._emit(('status', None, f"Vigilando {self.base} ({how}, {len(self.entries)} entradas)"))
+                while True:
+                    self.control.checkpoint()
+                    touched = watcher.wait(0.5)
+                    if touched is None:
+                        t0 = time.monotonic()
+                        self._rescan()
+                        if isinstance(watcher, PollWatcher):
+                            period = watcher.period
+                            watcher.pass_took(time.monotonic() - t0)
+                            if round(watcher.period) != round(period):
+                                self._emit(('status', None, f"Vigilando {self.base} (sondeo cada {watcher.period:.0f} s: "
+                                                            f"una pasada tarda {time.monotonic() - t0:.1f} s, {len(self.entries)} entradas)"))
+                    elif touched:
+                        self._touched(sorted(touched))
+        except JobCancelled:
+            pass
+        except Exception as e:
+            self._emit(('error', None, str(e)))
+        finally:
+            if watcher is not None:
+                watcher.close()
+            if self.journal is not None:
+                try:
+                    self._merge()
+                except Exception as e:
+                    self.journal.close()  # kept: merged by the next monitor
+                    self._emit(('error', None, str(e)))
+            self._emit(('done', None, self.control.cancelled))
+
+# --------------------------- Batch model ---------------------------
+class BatchEntry:
+    """One file of the batch table; __slots__ keeps 100k+ of them cheap."""
+    __slots__ = ('path', 'size', 'status', 'digests', 'timings', 'cached', 'known')
+
+    def __init__(self, path: str, size: Optional[int] = None):
+        self.path = path
+        self.size = size
+        self.status = "Pendiente"  # progress text / "ERROR:..." / "CANCELADO"; None once digests are in
+        self.digests: Optional[Dict[str, str]] = None
+        self.timings: Optional[Dict[str, float]] = None
+        self.cached: tuple = ()
+        self.known = ""  # hashset_status() when hash-set indexes are loaded
+
+class BatchModel:
+    """
+    Data behind the batch table: one BatchEntry per file, shown as one row per algorithm
+    (row i = entry i // len(algos), algorithm i % len(algos)). The view renders only the rows
+    it can show, so the model is the only thing that grows with the batch.
+    """
+    def __init__(self):
+        self.entries: List[BatchEntry] = []
+        self.algos: List[str] = []
+
+    def reset(self, files: Iterable[tuple[str, Optional[int]]], algos: List[str]):
+        self.entries = [BatchEntry(p, s) for p, s in files]
+        self.algos = list(algos)
+
+    def clear(self):
+        self.entries, self.algos = [], []
+
+    def __len__(self) -> int:
+        return len(self.entries) * len(self.algos)
+
+    def row(self, i: int) -> tuple[str, str, str, str, str, str]:
+        """(file, size, hash, duration, algorithm, known) as displayed."""
+        e = self.entries[i // len(self.algos)]
+        a = self.algos[i % len(self.algos)]
+        size = "" if e.size is None else str(e.size)
+        if e.digests is None:
+            return e.path, size, e.status, "-", a, ""
+        return e.path, size, e.digests[a], "caché" if a in e.cached else f"{e.timings[a]:.3f}", a, e.known
+
+    def export_rows(self) -> Iterator[Dict[str, str]]:
+        """Rows for BatchExportWriter, read straight from the model one at a time."""
+        for i in range(len(self)):
+            yield dict(zip(BATCH_EXPORT_FIELDS, self.row(i)))
+
+def read_path_list(list_file: str) -> List[str]:
+    """Paths of a text file list, one per line (blank lines ignored)."""
+    with open(list_file, 'r', encoding='utf-8') as fh:
+        return [ln.strip() for ln in fh if ln.strip()]
+
+# --------------------------- Main App (CustomTkinter) ---------------------------
+class HashManagerApp:
+    """All tabs of the window. create_app() combines it with ctk.CTk once the GUI libs are loaded."""
+    def __init__(self):
+        super().__init__()
+        self.title("Hash Generator v3.0 | Smith Lozano")
+        self.geometry("1000x700")
+        # default appearance and color theme
+        ctk.set_appearance_mode("Light")
+        ctk.set_default_color_theme("blue")
+
+        # state
+        self.root_tk = self  # use CTk as root for update() calls
+        self.batch_job: Optional[HashJob] = None
+        self.batch_model = BatchModel()
+        self.batch_hashsets: List[HashSetIndex] = []  # known-hash indexes every batch result is looked up in
+        self.batch_files: List[tuple[str, Optional[int]]] = []  # (path, size if already known) waiting in the list
+        self.batch_top = 0  # first model row shown
+        self.batch_view_rows = BATCH_VIEW_ROWS
+        self._batch_render_pending = False
+        self.integrity_job: Optional[HashJob] = None
+        self.dedupe_job: Optional[HashJob] = None
+        self.compare_job: Optional[HashJob] = None
+        self.journals: List[JobJournal] = []  # open resume journals, closed (flushed) if the window is closed mid-job
+        self.dedupe_result: Optional[tuple[str, List[Dict[str, Any]], Dict[str, int]]] = None
+        self.benchmark_result: Optional[Dict[str, Any]] = None
+        self.benchmark_thread: Optional[threading.Thread] = None
+        self.diff_thread: Optional[threading.Thread] = None
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # Tabview container (CTkTabview)
+        self.tabview = ctk.CTkTabview(self, width=980, height=640)
+        self.tabview.pack(fill="both", expand=True, padx=12, pady=12)
+
+        # Add tabs (names) and get frames via tab()
+        tabs = ["Hash Individual", "Hash en Lote", "Comparador", "Verificación de Integridad", "Duplicados", "Benchmark", "Configuración"]
+        for t in tabs:
+            self.tabview.add(t)
+
+        # fetch frames
+        self.frame_single = self.tabview.tab("Hash Individual")
+        self.frame_batch = self.tabview.tab("Hash en Lote")
+        self.frame_compare = self.tabview.tab("Comparador")
+        self.frame_integrity = self.tabview.tab("Verificación de Integridad")
+        self.frame_dedupe = self.tabview.tab("Duplicados")
+        self.frame_benchmark = self.tabview.tab("Benchmark")
+        self.frame_config = self.tabview.tab("Configuración")
+
+        # Build content in each tab
+        self._build_single_tab()
+        self._build_batch_tab()
+        self._build_compare_tab()
+        self._build_integrity_tab()
+        self._build_dedupe_tab()
+        self._build_benchmark_tab()
+        self._build_config_tab()
+        self.after(500, self._offer_resume)
+        self._errors_shown: set = set()
+        self.after(1000, self._show_background_errors)
+
+    def _show_background_errors(self):
+        """Warn about digest cache / audit log failures, each distinct message once."""
+        errors = [e for e in dict.fromkeys(pending_background_errors()) if e not in self._errors_shown]
+        if errors:
+            self._errors_shown.update(errors)
+            messagebox.showwarning("Aviso", "\n".join(errors))
+        self.after(1000, self._show_background_errors)
+
+    # ------------------ Tab: Single ------------------
+    def _build_single_tab(self):
+        parent = self.frame_single
+
+        row = ctk.CTkFrame(parent)
+        row.pack(fill="x", padx=12, pady=8)
+        self.single_path_var = tk.StringVar()
+        self.single_entry = ctk.CTkEntry(row, textvariable=self.single_path_var)
+        self.single_entry.pack(side="left", fill="x", expand=True, padx=(0,8))
+        btn_browse = ctk.CTkButton(row, text="Seleccionar archivo", command=self.single_browse)
+        btn_browse.pack(side="left")
+
+        action_row = ctk.CTkFrame(parent)
+        action_row.pack(fill="x", padx=12, pady=(4,8))
+        self.single_algo_var = tk.StringVar(value=SUPPORTED_ALGOS[0])
+        self.single_algo = ctk.CTkOptionMenu(action_row, values=SUPPORTED_ALGOS, variable=self.single_algo_var)
+        self.single_algo.pack(side="left", padx=(0,8))
+        # additional algorithms computed in the same read pass
+        self.single_extra_entry = ctk.CTkEntry(action_row, width=140, placeholder_text="Extra: MD5,CRC32")
+        self.single_extra_entry.pack(side="left", padx=(0,8))
+        self.single_progress = ctk.CTkProgressBar(action_row)
+        self.single_progress.set(0.0)
+        self.single_progress.pack(side="left", fill="x", expand=True, padx=8)
+        btn_hash = ctk.CTkButton(action_row, text="Calcular Hash", command=self.single_hash)
+        btn_hash.pack(side="left", padx=(8,4))
+        btn_copy = ctk.CTkButton(action_row, text="Copiar", command=self.single_copy)
+        btn_copy.pack(side="left")
+
+        out_frame = ctk.CTkFrame(parent)
+        out_frame.pack(fill="both", expand=False, padx=12, pady=(4,12))
+        ctk.CTkLabel(out_frame, text="Resultado:").pack(anchor="w")
+        self.single_out_var = tk.StringVar()
+        self.single_out = ctk.CTkEntry(out_frame, textvariable=self.single_out_var, state="readonly")
+        self.single_out.pack(fill="x", pady=(4,0))
+        self.single_extra_out_var = tk.StringVar()
+        ctk.CTkLabel(out_frame, textvariable=self.single_extra_out_var, anchor="w", justify="left").pack(fill="x", pady=(4,0))
+
+    def single_browse(self):
+        f = filedialog.askopenfilename(title="Seleccionar archivo")
+        if f:
+            self.single_path_var.set(f)
+
+    def single_hash(self):
+        path = self.single_path_var.get().strip()
+        if not path or not os.path.isfile(path):
+            messagebox.showwarning("Error", "Selecciona un archivo válido")
+            return
+        algo = self.single_algo_var.get()
+        self.single_progress.set(0.0)
+        self.single_extra_out_var.set("")
+        try:
+            algos = [algo] + parse_algo_list(self.single_extra_entry.get())
+            def on_progress(snap):
+                self.single_progress.set(snap['pct'] / 100.0)
+                self.single_extra_out_var.set(format_file_progress(snap))
+            digests, timings, _ = compute_hashes_file_sync(path, algos, tk_root=self.root_tk, progress_snapshot_cb=on_progress)
+            self.single_out_var.set(digests[algo])
+            self.single_extra_out_var.set("\n".join(f"{a}: {digests[a]}  ({timings[a]:.3f} s)" for a in digests if a != algo))
+            size = os.path.getsize(path)
+            for a, d in digests.items():
+                self._append_audit(algo=a, path_or_text=path, type_='file', size_bytes=size, duration=timings[a], hexdigest=d)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+
+    def single_copy(self):
+        v = self.single_out_var.get().strip()
+        if v:
+            try:
+                self.clipboard_clear()
+                self.clipboard_append(v)
+                messagebox.showinfo("Copiado", "Hash copiado al portapapeles")
+            except Exception:
+                messagebox.showerror("Error", "No fue posible copiar al portapapeles")
+
+    # ------------------ Tab: Batch ------------------
+    def _build_batch_tab(self):
+        parent = self.frame_batch
+
+        top = ctk.CTkFrame(parent)
+        top.pack(fill="x", padx=12, pady=8)
+        btn_add = ctk.CTkButton(top, text="Agregar archivos", command=self.batch_add)
+        btn_add.pack(side="left", padx=(0,8))
+        ctk.CTkButton(top, text="Agregar carpeta", command=self.batch_add_folder).pack(side="left", padx=(0,8))
+        ctk.CTkButton(top, text="Importar lista", command=self.batch_import_list).pack(side="left", padx=(0,8))
+        btn_clear = ctk.CTkButton(top, text="Limpiar", command=self.batch_clear)
+        btn_clear.pack(side="left", padx=(0,8))
+        self.batch_algo_var = tk.StringVar(value=SUPPORTED_ALGOS[0])
+        batch_algo_menu = ctk.CTkOptionMenu(top, values=SUPPORTED_ALGOS, variable=self.batch_algo_var)
+        batch_algo_menu.pack(side="left", padx=(8,8))
+        self.batch_extra_entry = ctk.CTkEntry(top, width=140, placeholder_text="Extra: MD5,CRC32")
+        self.batch_extra_entry.pack(side="left", padx=(0,8))
+        self.batch_archives_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(top, text="Miembros de zip/tar", variable=self.batch_archives_var).pack(side="left", padx=(0,8))
+        self.batch_hashset_btn = ctk.CTkButton(top, text="Conjuntos de hashes", command=self.batch_load_hashsets)
+        self.batch_hashset_btn.pack(side="left", padx=(0,8))
+        btn_run = ctk.CTkButton(top, text="Calcular Lote", command=self.batch_run)
+        btn_run.pack(side="left", padx=(8,0))
+        self.batch_pause_btn = ctk.CTkButton(top, text="Pausar", width=80, command=lambda: self._toggle_pause(self.batch_job, self.batch_pause_btn))
+        self.batch_pause_btn.pack(side="left", padx=(8,0))
+        btn_cancel = ctk.CTkButton(top, text="Cancelar", width=80, command=lambda: self._cancel_job(self.batch_job))
+        btn_cancel.pack(side="left", padx=(8,0))
+
+        self.batch_progress, self.batch_metrics_var = self._build_job_progress(parent)
+
+        mid = ctk.CTkFrame(parent)
+        mid.pack(fill="both", expand=True, padx=12, pady=(4,12))
+        left = ctk.CTkFrame(mid)
+        left.pack(side="left", fill="y", padx=(0,8))
+        ctk.CTkLabel(left, text="Archivos:").pack(anchor="w")
+        self.batch_listbox = tk.Listbox(left, selectmode=tk.EXTENDED, width=40)
+        self.batch_listbox.pack(fill="y", expand=True, pady=(4,0))
+
+        # virtual table: the Treeview only ever holds one screenful of rows, filled from self.batch_model
+        right = ctk.CTkFrame(mid)
+        right.pack(side="left", fill="both", expand=True)
+        columns = ("file", "size", "hash", "duration", "algorithm", "known")
+        self.batch_tree = ttk.Treeview(right, columns=columns, show="headings")
+        for col, w in (("file", 380), ("size", 80), ("hash", 320), ("duration", 80), ("algorithm", 80), ("known", 120)):
+            self.batch_tree.heading(col, text=col.capitalize())
+            self.batch_tree.column(col, width=w, anchor="w")
+        self.batch_tree.pack(side="left", fill="both", expand=True)
+        self.batch_vsb = ttk.Scrollbar(right, orient="vertical", command=self._batch_yview)
+        self.batch_vsb.pack(side="right", fill="y")
+        self.batch_tree.bind("<Configure>", self._batch_resize)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.batch_tree.bind(seq, self._batch_wheel)
+        self._batch_render()
+
+    def _batch_render(self):
+        """Show model rows [batch_top, batch_top + batch_view_rows) in the (at most one screen of) Treeview items."""
+        self._batch_render_pending = False
+        total = len(self.batch_model)
+        self.batch_top = max(0, min(self.batch_top, total - self.batch_view_rows))
+        shown = min(self.batch_view_rows, total - self.batch_top)
+        iids = self.batch_tree.get_children()
+        if len(iids) > shown:
+            self.batch_tree.delete(*iids[shown:])
+        for k in range(shown):
+            values = self.batch_model.row(self.batch_top + k)
+            if k < len(iids):
+                self.batch_tree.item(iids[k], values=values)
+            else:
+                self.batch_tree.insert("", "end", values=values)
+        if total:
+            self.batch_vsb.set(self.batch_top / total, (self.batch_top + shown) / total)
+        else:
+            self.batch_vsb.set(0.0, 1.0)
+
+    def _batch_schedule_render(self):
+        """Coalesce model changes into at most PROGRESS_HZ renders per second."""
+        if not self._batch_render_pending:
+            self._batch_render_pending = True
+            self.after(1000 // PROGRESS_HZ, self._batch_render)
+
+    def _batch_yview(self, *args):
+        if args[0] == 'moveto':
+            self.batch_top = int(float(args[1]) * len(self.batch_model))
+        elif args[0] == 'scroll':
+            self.batch_top += int(args[1]) * (self.batch_view_rows if args[2] == 'pages' else 1)
+        self._batch_render()
+
+    def _batch_wheel(self, event):
+        up = event.num == 4 or getattr(event, 'delta', 0) > 0
+        self._batch_yview('scroll', -3 if up else 3, 'units')
+        return "break"
+
+    def _batch_resize(self, event):
+        try:
+            rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            rowheight = 20
+        rows = max(1, event.height // rowheight - 1)  # minus the heading
+        if rows != self.batch_view_rows:
+            self.batch_view_rows = rows
+            self._batch_render()
+
+    def _batch_extend(self, files: List[tuple[str, Optional[int]]]):
+        if files:
+            self.batch_files.extend(files)
+            self.batch_listbox.insert(tk.END, *(p for p, _ in files))
+
+    def _batch_import(self, produce: Callable[[], Iterable[tuple[str, Optional[int]]]], on_done: Optional[Callable[[], None]] = None):
+        """Run produce() (a folder walk, a list file) on a thread; its (path, size) items reach the list in chunks, then on_done() runs."""
+        chunks: "queue.Queue[tuple[str, Any]]" = queue.Queue()
+
+        def work():
+            try:
+                buf = []
+                for item in produce():
+                    buf.append(item)
+                    if len(buf) >= BATCH_IMPORT_CHUNK:
+                        chunks.put(('files', buf))
+                        buf = []
+                chunks.put(('files', buf))
+                chunks.put(('done', None))
+            except Exception as e:
+                chunks.put(('error', str(e)))
+
+        def poll():
+            while True:
+                try:
+                    kind, value = chunks.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'files':
+                    self._batch_extend(value)
+                    self.batch_metrics_var.set(f"Importando... {len(self.batch_files)} archivos en la lista")
+                elif kind == 'error':
+                    self.batch_metrics_var.set("")
+                    messagebox.showerror("Error", value)
+                    return
+                else:
+                    self.batch_metrics_var.set(f"{len(self.batch_files)} archivos en la lista")
+                    if on_done:
+                        on_done()
+                    return
+            self.after(100, poll)
+
+        threading.Thread(target=work, name="batch-import", daemon=True).start()
+        self.after(100, poll)
+
+    def batch_add(self):
+        files = filedialog.askopenfilenames(title="Seleccionar archivos")
+        self._batch_extend([(f, _file_size(f)) for f in files])
+
+    def batch_add_folder(self):
+        d = filedialog.askdirectory(title="Seleccionar carpeta")
+        if d:
+            self._batch_import(lambda: ((p, st.st_size) for p, st in walk_files(d)))
+
+    def batch_import_list(self):
+        f = filedialog.askopenfilename(title="Importar lista de archivos (una ruta por línea)", filetypes=[("Text Files", "*.txt"), ("All files", "*.*")])
+        if f:
+            self._batch_import(lambda: ((p, None) for p in read_path_list(f)))
+
+    def batch_load_hashsets(self):
+        files = filedialog.askopenfilenames(title="Índices de hashes conocidos", filetypes=[("Hash sets", "*.hashset"), ("All files", "*.*")])
+        if not files:
+            if self.batch_hashsets and messagebox.askyesno("Conjuntos de hashes", "¿Quitar los índices cargados?"):
+                for ix in self.batch_hashsets:
+                    ix.close()
+                self.batch_hashsets = []
+                self.batch_hashset_btn.configure(text="Conjuntos de hashes")
+            return
+        try:
+            indexes = [HashSetIndex(f) for f in files]
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        for ix in self.batch_hashsets:
+            ix.close()
+        self.batch_hashsets = indexes
+        self.batch_hashset_btn.configure(text=f"Conjuntos de hashes ({len(indexes)})")
+        messagebox.showinfo("Conjuntos de hashes", "\n".join(f"{ix.label}: {len(ix)} hashes {ix.algorithm}" for ix in indexes))
+
+    def batch_clear(self):
+        self.batch_files = []
+        self.batch_listbox.delete(0, tk.END)
+        self.batch_model.clear()
+        self._batch_render()
+
+    def batch_run(self):
+        if self.batch_job is not None and self.batch_job.running:
+            messagebox.showwarning("En curso", "Ya hay un lote en proceso")
+            return
+        algo = self.batch_algo_var.get()
+        if not self.batch_files:
+            messagebox.showwarning("Lista vacía", "Agrega archivos antes")
+            return
+        try:
+            algos = [algo] + [a for a in parse_algo_list(self.batch_extra_entry.get()) if a != algo]
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        indexes = list(self.batch_hashsets)
+        algos += [ix.algorithm for ix in indexes if ix.algorithm not in algos]
+        # one row per algorithm, all fed from a single read of the file
+        self.batch_model.reset(self.batch_files, algos)
+        self.batch_top = 0
+        entries = self.batch_model.entries
+        # every result is journaled; files an interrupted run already did (and unchanged since) are taken from it
+        try:
+            _, done = load_batch_journal(str(BATCH_JOURNAL), algos)
+            # the file list goes to its own file: the journal header stays one short line however big the batch
+            count = write_batch_file_list(BATCH_FILE_LIST, ((e.path, e.size) for e in entries))
+            journal = JobJournal(str(BATCH_JOURNAL), {'kind': 'batch', 'algorithms': algos, 'files': count})
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.journals.append(journal)
+        pending = set()
+        for i, e in enumerate(entries):
+            rec = done.get(e.path)
+            if rec is None:
+                pending.add(i)
+                continue
+            journal.write(rec)
+            e.size, e.digests, e.timings = rec['size'], rec['digests'], rec['timings']
+            if indexes:
+                e.known = hashset_status(indexes, e.digests)
+        self._batch_render()
+
+        def on_event(kind, key, value):
+            if key is None:
+                if kind == 'error':
+                    messagebox.showerror("Error", value)
+                return
+            e = entries[key]
+            if kind == 'progress':
+                e.status = format_file_progress(value)
+            elif kind == 'result':
+                pending.discard(key)
+                journal.write(batch_journal_record(value))
+                if value['path'] != e.path:
+                    # a member of the archive e: one more row per member at the end of the table
+                    e.status = "Ver miembros (archivo!miembro)"
+                    e = BatchEntry(value['path'])
+                    entries.append(e)
+                e.size, e.digests, e.timings, e.cached = value['size'], value['digests'], value['timings'], tuple(value['cached'])
+                if indexes:
+                    e.known = hashset_status(indexes, e.digests)
+                for a in algos:
+                    self._append_audit(a, e.path, 'file', e.size, e.timings[a], e.digests[a])
+            elif kind == 'error':
+                pending.discard(key)
+                e.status = "ERROR:"+value
+            self._batch_schedule_render()
+
+        def on_done(cancelled):
+            self.batch_pause_btn.configure(text="Pausar")
+            self.journals.remove(journal)
+            if cancelled:
+                journal.close()  # kept: the next run (or the next start) resumes from it
+                for key in pending:
+                    entries[key].status = "CANCELADO"
+            else:
+                journal.finish()
+                with contextlib.suppress(OSError):
+                    os.remove(BATCH_FILE_LIST)
+            self._batch_render()
+
+        todo = sorted(pending)
+        archives = self.batch_archives_var.get()
+        job = HashJob(hash_file_task, ((i, (entries[i].path, algos, entries[i].size, archives)) for i in todo),
+                      workers=self._job_workers(), mode=self._job_mode(algos))
+        if all(entries[i].size is not None for i in todo):
+            job.metrics.expect(len(todo), sum(entries[i].size for i in todo))
+        self.batch_job = self._start_job(job, on_event, on_done, self._job_metrics_updater(self.batch_progress, self.batch_metrics_var))
+
+    # ------------------ Tab: Compare ------------------
+    def _build_compare_tab(self):
+        parent = self.frame_compare
+
+        row = ctk.CTkFrame(parent)
+        row.pack(fill="x", padx=12, pady=8)
+        self.cmp_a_var = tk.StringVar()
+        self.cmp_b_var = tk.StringVar()
+        entry_a = ctk.CTkEntry(row, textvariable=self.cmp_a_var)
+        entry_a.pack(side="left", fill="x", expand=True, padx=(0,8))
+        btn_a = ctk.CTkButton(row, text="Seleccionar A (archivo)", command=lambda: self._select_file(self.cmp_a_var))
+        btn_a.pack(side="left", padx=(0,8))
+        entry_b = ctk.CTkEntry(row, textvariable=self.cmp_b_var)
+        entry_b.pack(side="left", fill="x", expand=True, padx=(8,8))
+        btn_b = ctk.CTkButton(row, text="Seleccionar B (archivo)", command=lambda: self._select_file(self.cmp_b_var))
+        btn_b.pack(side="left")
+
+        hint = ctk.CTkLabel(parent, text="Nota: puedes pegar un hash en el campo B para compararlo con A.")
+        hint.pack(anchor="w", padx=12)
+
+        algo_row = ctk.CTkFrame(parent)
+        algo_row.pack(fill="x", padx=12, pady=(8,4))
+        self.cmp_algo_var = tk.StringVar(value=SUPPORTED_ALGOS[0])
+        self.cmp_algo = ctk.CTkOptionMenu(algo_row, values=SUPPORTED_ALGOS, variable=self.cmp_algo_var)
+        self.cmp_algo.pack(side="left", padx=(0,8))
+        self.cmp_method_var = tk.StringVar(value=list(COMPARE_METHOD_LABELS)[0])
+        ctk.CTkOptionMenu(algo_row, values=list(COMPARE_METHOD_LABELS), variable=self.cmp_method_var, width=220).pack(side="left", padx=(0,8))
+        self.cmp_count_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(algo_row, text="Contar todos los bytes distintos", variable=self.cmp_count_var).pack(side="left", padx=(0,8))
+        btn_cmp = ctk.CTkButton(algo_row, text="Comparar", command=self.compare_files)
+        btn_cmp.pack(side="left")
+        ctk.CTkButton(algo_row, text="Cancelar", width=80, command=lambda: self._cancel_job(self.compare_job)).pack(side="left", padx=(8,0))
+
+        self.cmp_progress, self.cmp_metrics_var = self._build_job_progress(parent)
+        self.cmp_result_var = tk.StringVar(value="")
+        self.cmp_result_lbl = ctk.CTkLabel(parent, textvariable=self.cmp_result_var, wraplength=900, anchor="w", justify="left")
+        self.cmp_result_lbl.pack(fill="x", padx=12, pady=(8,4))
+
+    def _select_file(self, var: tk.StringVar):
+        f = filedialog.askopenfilename(title="Seleccionar archivo")
+        if f:
+            var.set(f)
+
+    def compare_files(self):
+        if self.compare_job is not None and self.compare_job.running:
+            messagebox.showwarning("En curso", "Ya hay una comparación en proceso")
+            return
+        a = self.cmp_a_var.get().strip(); b = self.cmp_b_var.get().strip()
+        if not a:
+            messagebox.showwarning("Error", "Campo A vacío")
+            return
+        algo = self.cmp_algo_var.get()
+        if not os.path.isfile(a):
+            messagebox.showwarning("Error", "Campo A debe ser un archivo válido")
+            return
+
+        if os.path.isfile(b):
+            # sizes first, then a byte-by-byte or two-thread hash comparison off the UI thread
+            job = HashJob(compare_task, [(0, (a, b, algo, COMPARE_METHOD_LABELS[self.cmp_method_var.get()], self.cmp_count_var.get()))], workers=1)
+
+            def on_result(res):
+                self.cmp_result_var.set(format_compare_result(res, algo) + f" — {res['duration']:.2f}s")
+        elif b and all(c in '0123456789abcdefABCDEF' for c in b) and len(b) >= 8:
+            job = HashJob(hash_file_task, [(0, (a, [algo]))], workers=1)
+            hb = b.lower()
+
+            def on_result(res):
+                ha = res['digests'][algo]
+                if ha == hb:
+                    self.cmp_result_var.set(f'COINCIDENCIA — A hash: {ha} — B (raw hash) matches')
+                else:
+                    self.cmp_result_var.set(f'DISTINTO — A: {ha} — B (raw hash): {hb}')
+        else:
+            messagebox.showwarning("Error", "Campo B debe ser un archivo válido o un hash hexadecimal")
+            return
+
+        def on_event(kind, key, value):
+            if kind == 'progress':
+                self.cmp_progress.set(value['pct'] / 100.0)
+                self.cmp_metrics_var.set(format_file_progress(value))
+            elif kind == 'result':
+                on_result(value)
+            elif kind == 'error':
+                self.cmp_result_var.set(f'ERROR: {value}')
+
+        def on_done(cancelled):
+            if cancelled:
+                self.cmp_result_var.set("Cancelado")
+
+        self.cmp_result_var.set("Comparando...")
+        self.cmp_progress.set(0.0)
+        self.compare_job = self._start_job(job, on_event, on_done)
+
+    # ------------------ Tab: Integrity ------------------
+    def _build_integrity_tab(self):
+        parent = self.frame_integrity
+
+        row1 = ctk.CTkFrame(parent)
+        row1.pack(fill="x", padx=12, pady=8)
+        self.manifest_path_var = tk.StringVar()
+        manifest_entry = ctk.CTkEntry(row1, textvariable=self.manifest_path_var)
+        manifest_entry.pack(side="left", fill="x", expand=True, padx=(0,8))
+        btn_manifest = ctk.CTkButton(row1, text="Cargar manifest", command=self.load_manifest)
+        btn_manifest.pack(side="left")
+
+        row2 = ctk.CTkFrame(parent)
+        row2.pack(fill="x", padx=12, pady=(4,8))
+        self.folder_path_var = tk.StringVar()
+        folder_entry = ctk.CTkEntry(row2, textvariable=self.folder_path_var)
+        folder_entry.pack(side="left", fill="x", expand=True, padx=(0,8))
+        btn_folder = ctk.CTkButton(row2, text="Seleccionar carpeta", command=self.select_folder)
+        btn_folder.pack(side="left")
+
+        algo_row = ctk.CTkFrame(parent)
+        algo_row.pack(fill="x", padx=12, pady=(4,8))
+        self.integrity_algo_var = tk.StringVar(value=SUPPORTED_ALGOS[0])
+        integrity_algo_menu = ctk.CTkOptionMenu(algo_row, values=SUPPORTED_ALGOS, variable=self.integrity_algo_var)
+        integrity_algo_menu.pack(side="left", padx=(0,8))
+        self.integrity_extra_entry = ctk.CTkEntry(algo_row, width=140, placeholder_text="Extra: MD5,CRC32")
+        self.integrity_extra_entry.pack(side="left", padx=(0,8))
+        self.verify_level_var = tk.StringVar(value=list(VERIFY_LEVEL_LABELS)[0])
+        ctk.CTkOptionMenu(algo_row, values=list(VERIFY_LEVEL_LABELS), variable=self.verify_level_var, width=150).pack(side="left", padx=(0,8))
+        btn_verify = ctk.CTkButton(algo_row, text="Verificar contra manifest", command=self.verify_manifest)
+        btn_verify.pack(side="left", padx=(0,8))
+        btn_create = ctk.CTkButton(algo_row, text="Crear manifest desde carpeta", command=self.create_manifest_from_folder)
+        btn_create.pack(side="left")
+        ctk.CTkButton(algo_row, text="Vigilar", width=80, command=self.monitor_manifest).pack(side="left", padx=(8,0))
+        ctk.CTkButton(algo_row, text="Diferencias", width=100, command=self.diff_manifest).pack(side="left", padx=(8,0))
+        self.integrity_pause_btn = ctk.CTkButton(algo_row, text="Pausar", width=80, command=lambda: self._toggle_pause(self.integrity_job, self.integrity_pause_btn))
+        self.integrity_pause_btn.pack(side="left", padx=(8,0))
+        btn_cancel = ctk.CTkButton(algo_row, text="Cancelar", width=80, command=lambda: self._cancel_job(self.integrity_job))
+        btn_cancel.pack(side="left", padx=(8,0))
+
+        # walker filters used when creating a manifest (stored in it, so verification skips the same files)
+        filter_row = ctk.CTkFrame(parent)
+        filter_row.pack(fill="x", padx=12, pady=(0,8))
+        self.walk_include_entry = ctk.CTkEntry(filter_row, width=160, placeholder_text="Incluir: *.iso,*.img")
+        self.walk_include_entry.pack(side="left", padx=(0,8))
+        self.walk_exclude_entry = ctk.CTkEntry(filter_row, width=200, placeholder_text="Excluir: .git,*.tmp,re:^cache/")
+        self.walk_exclude_entry.pack(side="left", padx=(0,8))
+        self.walk_min_entry = ctk.CTkEntry(filter_row, width=90, placeholder_text="Mín: 1K")
+        self.walk_min_entry.pack(side="left", padx=(0,8))
+        self.walk_max_entry = ctk.CTkEntry(filter_row, width=90, placeholder_text="Máx: 4G")
+        self.walk_max_entry.pack(side="left", padx=(0,8))
+        self.walk_symlinks_var = tk.StringVar(value=SYMLINK_POLICIES[0])
+        ctk.CTkOptionMenu(filter_row, values=SYMLINK_POLICIES, variable=self.walk_symlinks_var, width=90).pack(side="left", padx=(0,8))
+        self.walk_same_fs_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(filter_row, text="Mismo sistema de archivos", variable=self.walk_same_fs_var).pack(side="left", padx=(0,8))
+        self.walk_archives_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(filter_row, text="Miembros de zip/tar", variable=self.walk_archives_var).pack(side="left")
+
+        self.integrity_status_var = tk.StringVar(value="")
+        ctk.CTkLabel(parent, textvariable=self.integrity_status_var, anchor="w").pack(fill="x", padx=12)
+        self.integrity_progress, self.integrity_metrics_var = self._build_job_progress(parent)
+
+        self.integrity_out = tk.Text(parent, height=18)
+        self.integrity_out.pack(fill="both", expand=True, padx=12, pady=(8,12))
+
+    def _walk_options(self) -> WalkOptions:
+        def patterns(entry):
+            return [p.strip() for p in entry.get().split(',') if p.strip()]
+        return WalkOptions(patterns(self.walk_include_entry), patterns(self.walk_exclude_entry),
+                           self.walk_min_entry.get(), self.walk_max_entry.get(),
+                           self.walk_symlinks_var.get(), self.walk_same_fs_var.get())
+
+    def load_manifest(self):
+        f = filedialog.askopenfilename(title="Cargar manifest (JSON, JSONL, CSV o TXT)", filetypes=[("Manifest", "*.json *.jsonl *.gz *.csv *.txt")] + MANIFEST_FILETYPES)
+        if f:
+            self.manifest_path_var.set(f)
+
+    def select_folder(self):
+        d = filedialog.askdirectory(title="Seleccionar carpeta")
+        if d:
+            self.folder_path_var.set(d)
+
+    def _integrity_busy(self) -> bool:
+        if self.integrity_job is not None and self.integrity_job.running:
+            messagebox.showwarning("En curso", "Ya hay una verificación o manifest en proceso")
+            return True
+        return False
+
+    def create_manifest_from_folder(self):
+        if self._integrity_busy():
+            return
+        folder = self.folder_path_var.get().strip()
+        if not folder or not os.path.isdir(folder):
+            messagebox.showwarning("Error", "Selecciona una carpeta válida")
+            return
+        algo = self.integrity_algo_var.get()
+        try:
+            algos = [algo] + [a for a in parse_algo_list(self.integrity_extra_entry.get()) if a != algo]
+            options = self._walk_options()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        default_name = f"manifest_{safe_timestamp()}"
+        f = filedialog.asksaveasfilename(title="Guardar manifest", initialfile=f"{default_name}.json", defaultextension=".json",
+                                         filetypes=MANIFEST_FILETYPES)
+        if not f:
+            return
+        resume = os.path.exists(f + JOURNAL_SUFFIX) and messagebox.askyesno(
+            "Reanudar", "Hay un journal de una ejecución interrumpida de este manifest.\n¿Reanudar (sin recalcular los archivos sin cambios)?")
+        self._run_manifest_job(folder, f, algos, options, resume, self.walk_archives_var.get())
+
+    def _run_manifest_job(self, folder: str, f: str, algos: List[str], options: WalkOptions, resume: bool, archives: bool = False):
+        filters = None if options.is_default() else options.to_dict()
+        try:
+            # finished entries go to a journal as they are hashed (a crash or closing the window loses
+            # at most a second of work); the manifest is written from it in the chosen format at the end
+            journal, done = resume_manifest_journal(f, folder, algos, filters, resume)
+            self.journals.append(journal)
+            with open(PENDING_MANIFEST, 'w', encoding='utf-8') as fh:
+                json.dump({'folder': folder, 'output': f, 'algorithms': algos, 'filters': options.to_dict(), 'archives': archives}, fh, ensure_ascii=False)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        from_cache = [0]
+        failed: List[str] = []  # files that couldn't be read: not in the journal, so the manifest isn't complete
+        self.integrity_out.delete("1.0", tk.END)
+
+        def status_text(count):
+            return f"Procesados: {count} (desde caché: {from_cache[0]}, reanudados: {len(done)}, errores: {len(failed)})"
+
+        def on_event(kind, key, value):
+            if kind == 'result':
+                journal.write(manifest_entry(value, folder, algos))
+                if len(value['cached']) == len(algos):
+                    from_cache[0] += 1
+                self.integrity_status_var.set(status_text(journal.count))
+            elif kind == 'error' and key is None:
+                messagebox.showerror("Error", value)
+            elif kind == 'error':
+                failed.append(value)
+                self.integrity_out.insert(tk.END, f"ERROR: {value}\n")
+                self.integrity_status_var.set(status_text(journal.count))
+
+        def on_done(cancelled):
+            self.integrity_pause_btn.configure(text="Pausar")
+            self.journals.remove(journal)
+            try:
+                count = finalize_manifest_journal(journal, f, folder, algos, filters)
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+                return
+            if cancelled:
+                self.integrity_status_var.set(f"Cancelado ({count} archivos procesados)")
+                messagebox.showinfo("Manifest parcial", f"Manifest parcial guardado en {f} ({count} archivos).\nSe puede reanudar creando el mismo manifest otra vez.")
+                return
+            with contextlib.suppress(OSError):
+                os.remove(PENDING_MANIFEST)
+            self.integrity_status_var.set(status_text(count))
+            if failed:
+                # the journal is kept, so creating the same manifest again only retries the failed files
+                shown = "\n".join(failed[:ERRORS_SHOWN]) + (f"\n(+{len(failed) - ERRORS_SHOWN} más)" if len(failed) > ERRORS_SHOWN else "")
+                messagebox.showwarning("Manifest incompleto", f"Manifest guardado en {f} sin {len(failed)} archivos que no se pudieron leer:\n{shown}\n\n"
+                                       "Creando el mismo manifest otra vez se reintentan solo esos archivos.")
+                return
+            journal.discard()
+            messagebox.showinfo("Manifest creado", f"Manifest guardado en {f}")
+
+        self.integrity_status_var.set(f"Procesando... ({len(done)} archivos reanudados del journal)" if done else "Procesando...")
+        job = HashJob(manifest_file_task, walk_manifest_items(folder, algos, options, skip=[f, journal.path], done=done, archives=archives),
+                      workers=self._job_workers(), mode=self._job_mode(algos))
+        self.integrity_job = self._start_job(job, on_event, on_done, self._job_metrics_updater(self.integrity_progress, self.integrity_metrics_var))
+
+    def _offer_resume(self):
+        """At startup: offer to resume a manifest or batch that was interrupted (crash, window closed)."""
+        try:
+            with open(PENDING_MANIFEST, 'r', encoding='utf-8') as fh:
+                pending = json.load(fh)
+        except (OSError, ValueError):
+            pending = None
+        if pending and os.path.exists(pending['output'] + JOURNAL_SUFFIX) and os.path.isdir(pending['folder']):
+            if messagebox.askyesno("Reanudar manifest", f"La creación del manifest {pending['output']}\n(carpeta {pending['folder']}) no terminó. ¿Reanudarla?"):
+                self.tabview.set("Verificación de Integridad")
+                self.folder_path_var.set(pending['folder'])
+                self._run_manifest_job(pending['folder'], pending['output'], pending['algorithms'], WalkOptions.from_dict(pending['filters']), True,
+                                       pending.get('archives', False))
+            else:
+                for path in (pending['output'] + JOURNAL_SUFFIX, PENDING_MANIFEST):
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+        header, done = load_batch_journal(str(BATCH_JOURNAL))
+        if header and header.get('files') and BATCH_FILE_LIST.exists():
+            if messagebox.askyesno("Reanudar lote", f"Hay un lote interrumpido ({len(done)} de {header['files']} archivos calculados). ¿Restaurarlo?"):
+                self.tabview.set("Hash en Lote")
+                self.batch_clear()
+                self.batch_algo_var.set(header['algorithms'][0])
+                self.batch_extra_entry.delete(0, tk.END)
+                self.batch_extra_entry.insert(0, ",".join(header['algorithms'][1:]))
+                self._batch_import(lambda: read_batch_file_list(BATCH_FILE_LIST), on_done=self.batch_run)
+            else:
+                for path in (BATCH_JOURNAL, BATCH_FILE_LIST):
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+
+    def verify_manifest(self):
+        if self._integrity_busy():
+            return
+        manifest_file = self.manifest_path_var.get().strip(); folder = self.folder_path_var.get().strip()
+        if not manifest_file or not os.path.exists(manifest_file):
+            messagebox.showwarning("Error", "Carga un manifest válido")
+            return
+
+        try:
+            header, files_entries = open_manifest(manifest_file)
+        except Exception as e:
+            messagebox.showwarning("Error", str(e))
+            return
+
+        algo = header.get('algorithm') or self.integrity_algo_var.get()
+        base = header.get('base_folder') or folder or os.path.dirname(manifest_file)
+        plan = plan_verification(files_entries, algo, base)
+
+        level = VERIFY_LEVEL_LABELS[self.verify_level_var.get()]
+        done = [0]
+        issues = [0]
+        self.integrity_out.delete("1.0", tk.END)
+
+        def report(line, ok=False):
+            # problems are always listed; OK lines only up to a limit so huge trees don't flood the widget
+            if not ok or done[0] <= INTEGRITY_MAX_OK_LINES:
+                self.integrity_out.insert(tk.END, line + "\n")
+
+        def on_event(kind, key, value):
+            if kind == 'result':
+                status, detail = value
+                done[0] += 1
+                if status != 'OK':
+                    issues[0] += 1
+                report(verification_line(key, status, detail), ok=status == 'OK')
+                self.integrity_status_var.set(f"Verificados: {done[0]} — discrepancias: {issues[0]}")
+            elif kind == 'extra':
+                issues[0] += 1
+                report(verification_line(value, 'EXTRA'))
+            elif kind == 'error' and key is None:
+                messagebox.showerror("Error", value)
+            elif kind == 'error':
+                done[0] += 1
+                issues[0] += 1
+                report(verification_line(key, 'ERROR', value))
+                self.integrity_status_var.set(f"Verificados: {done[0]} — discrepancias: {issues[0]}")
+
+        def on_done(cancelled):
+            self.integrity_pause_btn.configure(text="Pausar")
+            if cancelled:
+                self.integrity_status_var.set(f"Cancelado ({done[0]} verificados)")
+                messagebox.showinfo("Verificación cancelada", f"Encontradas {issues[0]} discrepancias en {done[0]} archivos verificados")
+            else:
+                self.integrity_status_var.set(f"Verificados: {done[0]} — discrepancias: {issues[0]}")
+                messagebox.showinfo("Verificación finalizada", f"Encontradas {issues[0]} discrepancias")
+
+        self.integrity_status_var.set("Verificando...")
+        job = VerifyJob(plan, level=level, base=base, skip_extra=[manifest_file], workers=self._job_workers(), mode=self._job_mode([algo]),
+                        walk_options=WalkOptions.from_dict(header.get('filters')))
+        self.integrity_job = self._start_job(job, on_event, on_done, self._job_metrics_updater(self.integrity_progress, self.integrity_metrics_var))
+
+    def monitor_manifest(self):
+        """Watch the manifest's folder until "Cancelar": changes are listed, audited and written to the manifest."""
+        if self._integrity_busy():
+            return
+        manifest_file = self.manifest_path_var.get().strip()
+        if not manifest_file or not os.path.exists(manifest_file):
+            messagebox.showwarning("Error", "Carga un manifest válido")
+            return
+        counts = {'MODIFIED': 0, 'ADDED': 0, 'DELETED': 0}
+        self.integrity_out.delete("1.0", tk.END)
+
+        def on_event(kind, key, value):
+            if kind == 'change':
+                counts[value['change']] += 1
+                self.integrity_out.insert(tk.END, f"{ts()}  {value['change']:<8} {key}\n")
+                self.integrity_out.see(tk.END)
+            elif kind == 'status':
+                self.integrity_status_var.set(value)
+            elif kind == 'error':
+                if key is None:
+                    messagebox.showerror("Error", value)
+                else:
+                    self.integrity_out.insert(tk.END, f"{ts()}  ERROR    {key}: {value}\n")
+
+        def on_done(cancelled):
+            self.integrity_pause_btn.configure(text="Pausar")
+            self.integrity_status_var.set("Vigilancia detenida — modificados: {MODIFIED}, nuevos: {ADDED}, eliminados: {DELETED}".format(**counts))
+
+        job = MonitorJob(manifest_file, base=self.folder_path_var.get().strip() or None, algo=self.integrity_algo_var.get(),
+                         workers=self._job_workers())
+        self.integrity_job = self._start_job(job, on_event, on_done, self._job_metrics_updater(self.integrity_progress, self.integrity_metrics_var))
+
+    def diff_manifest(self):
+        """List what changed between an earlier manifest and the loaded one, from their digests (nothing is re-hashed)."""
+        if self.diff_thread is not None and self.diff_thread.is_alive():
+            messagebox.showwarning("En curso", "Ya se están comparando manifests")
+            return
+        new_file = self.manifest_path_var.get().strip()
+        if not new_file or not os.path.exists(new_file):
+            messagebox.showwarning("Error", "Carga un manifest válido")
+            return
+        old_file = filedialog.askopenfilename(title="Manifest anterior para comparar", filetypes=[("Manifest", "*.jsonl *.gz *.json *.csv *.txt"), ("All files", "*.*")])
+        if not old_file:
+            return
+        messages: "queue.Queue[tuple[str, Any]]" = queue.Queue()
+        counts = {status: 0 for status in MANIFEST_DIFF_STATUSES}
+        stats = {}
+
+        def work():
+            try:
+                for change in diff_manifests(old_file, new_file, stats=stats):
+                    messages.put(('change', change))
+                messages.put(('done', None))
+            except Exception as e:
+                messages.put(('error', str(e)))
+
+        def poll():
+            lines = []
+            while True:
+                try:
+                    kind, value = messages.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'change':
+                    counts[value[0]] += 1
+                    lines.append(format_diff_line(*value))
+                    continue
+                if lines:
+                    self.integrity_out.insert(tk.END, "\n".join(lines) + "\n")
+                if kind == 'error':
+                    self.integrity_status_var.set("")
+                    messagebox.showerror("Error", value)
+                else:
+                    self.integrity_status_var.set(f"{stats['old']} -> {stats['new']} archivos; sin cambios: {stats['unchanged']}; "
+                                                  + ", ".join(f"{s.lower()}: {c}" for s, c in counts.items()))
+                return
+            if lines:
+                self.integrity_out.insert(tk.END, "\n".join(lines) + "\n")
+            self.after(200, poll)
+
+        self.integrity_out.delete("1.0", tk.END)
+        self.integrity_status_var.set(f"Comparando {os.path.basename(old_file)} con {os.path.basename(new_file)}...")
+        self.diff_thread = threading.Thread(target=work, name="manifest-diff", daemon=True)
+        self.diff_thread.start()
+        self.after(200, poll)
+
+    # ------------------ Tab: Duplicates ------------------
+    def _build_dedupe_tab(self):
+        parent = self.frame_dedupe
+
+        top = ctk.CTkFrame(parent)
+        top.pack(fill="x", padx=12, pady=8)
+        ctk.CTkButton(top, text="Agregar carpeta", command=self.dedupe_add).pack(side="left", padx=(0,8))
+        ctk.CTkButton(top, text="Limpiar", command=self.dedupe_clear).pack(side="left", padx=(0,8))
+        self.dedupe_algo_var = tk.StringVar(value=SUPPORTED_ALGOS[0])
+        ctk.CTkOptionMenu(top, values=SUPPORTED_ALGOS, variable=self.dedupe_algo_var).pack(side="left", padx=(8,8))
+        self.dedupe_exclude_entry = ctk.CTkEntry(top, width=180, placeholder_text="Excluir: .git,*.tmp")
+        self.dedupe_exclude_entry.pack(side="left", padx=(0,8))
+        self.dedupe_min_entry = ctk.CTkEntry(top, width=90, placeholder_text="Mín: 1K")
+        self.dedupe_min_entry.pack(side="left", padx=(0,8))
+        ctk.CTkButton(top, text="Buscar duplicados", command=self.dedupe_run).pack(side="left", padx=(8,0))
+        self.dedupe_pause_btn = ctk.CTkButton(top, text="Pausar", width=80, command=lambda: self._toggle_pause(self.dedupe_job, self.dedupe_pause_btn))
+        self.dedupe_pause_btn.pack(side="left", padx=(8,0))
+        ctk.CTkButton(top, text="Cancelar", width=80, command=lambda: self._cancel_job(self.dedupe_job)).pack(side="left", padx=(8,0))
+        ctk.CTkButton(top, text="Exportar informe", command=self.dedupe_export).pack(side="left", padx=(8,0))
+
+        self.dedupe_status_var = tk.StringVar(value="")
+        ctk.CTkLabel(parent, textvariable=self.dedupe_status_var, anchor="w").pack(fill="x", padx=12)
+        self.dedupe_progress, self.dedupe_metrics_var = self._build_job_progress(parent)
+
+        mid = ctk.CTkFrame(parent)
+        mid.pack(fill="both", expand=True, padx=12, pady=(4,12))
+        left = ctk.CTkFrame(mid)
+        left.pack(side="left", fill="y", padx=(0,8))
+        ctk.CTkLabel(left, text="Carpetas:").pack(anchor="w")
+        self.dedupe_listbox = tk.Listbox(left, selectmode=tk.EXTENDED, width=40)
+        self.dedupe_listbox.pack(fill="y", expand=True, pady=(4,0))
+
+        right = ctk.CTkFrame(mid)
+        right.pack(side="left", fill="both", expand=True)
+        # one parent row per duplicate set, its files as children
+        self.dedupe_tree = ttk.Treeview(right, columns=("size", "reclaimable", "hash"))
+        self.dedupe_tree.heading("#0", text="Archivo")
+        self.dedupe_tree.column("#0", width=420, anchor="w")
+        for col, text, w in (("size", "Tamaño", 90), ("reclaimable", "Recuperable", 100), ("hash", "Hash", 320)):
+            self.dedupe_tree.heading(col, text=text)
+            self.dedupe_tree.column(col, width=w, anchor="w")
+        self.dedupe_tree.pack(side="left", fill="both", expand=True)
+        vsb = ttk.Scrollbar(right, orient="vertical", command=self.dedupe_tree.yview)
+        vsb.pack(side="right", fill="y")
+        self.dedupe_tree.configure(yscrollcommand=vsb.set)
+
+    def dedupe_add(self):
+        d = filedialog.askdirectory(title="Seleccionar carpeta")
+        if d:
+            self.dedupe_listbox.insert(tk.END, d)
+
+    def dedupe_clear(self):
+        self.dedupe_listbox.delete(0, tk.END)
+        self.dedupe_tree.delete(*self.dedupe_tree.get_children())
+        self.dedupe_result = None
+        self.dedupe_status_var.set("")
+
+    def dedupe_run(self):
+        if self.dedupe_job is not None and self.dedupe_job.running:
+            messagebox.showwarning("En curso", "Ya hay una búsqueda en proceso")
+            return
+        folders = list(self.dedupe_listbox.get(0, tk.END))
+        if not folders:
+            messagebox.showwarning("Lista vacía", "Agrega carpetas antes")
+            return
+        algo = self.dedupe_algo_var.get()
+        try:
+            options = WalkOptions(exclude=[p.strip() for p in self.dedupe_exclude_entry.get().split(',') if p.strip()],
+                                  min_size=self.dedupe_min_entry.get())
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.dedupe_tree.delete(*self.dedupe_tree.get_children())
+        self.dedupe_result = None
+        self.dedupe_status_var.set("Agrupando por tamaño y hash parcial...")
+        collector = DuplicateCollector(algo)
+
+        def on_event(kind, key, value):
+            collector.feed(kind, key, value)
+            if kind == 'stats':
+                self.dedupe_status_var.set(f"{value['files']} archivos; {value['full_files']} candidatos para el hash completo")
+
+        def on_done(cancelled):
+            self.dedupe_pause_btn.configure(text="Pausar")
+            if cancelled:
+                self.dedupe_status_var.set("Cancelado")
+                return
+            groups = collector.groups()
+            for i, g in enumerate(groups, 1):
+                node = self.dedupe_tree.insert("", "end", text=f"[{i}] {len(g['paths'])} copias", open=True,
+                                               values=(format_bytes(g['size']), format_bytes(g['reclaimable']), g['hash']))
+                for p in g['paths']:
+                    self.dedupe_tree.insert(node, "end", text=p, values=(format_bytes(g['size']), "", ""))
+            self.dedupe_result = (algo, groups, collector.stats)
+            self.dedupe_status_var.set(format_dedupe_stats(collector.stats) if collector.stats else "")
+            self.dedupe_metrics_var.set(f"{len(groups)} grupos de duplicados, {format_bytes(sum(g['reclaimable'] for g in groups))} recuperables"
+                                        + (f" — {len(collector.errors)} errores" if collector.errors else ""))
+
+        job = DedupeJob(folders, algo, options, workers=self._job_workers(), mode=self._job_mode([algo]))
+        self.dedupe_job = self._start_job(job, on_event, on_done, self._job_metrics_updater(self.dedupe_progress, self.dedupe_metrics_var))
+
+    def dedupe_export(self):
+        if not self.dedupe_result:
+            messagebox.showwarning("Sin resultados", "Busca duplicados antes")
+            return
+        f = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json"), ("CSV", "*.csv"), ("TXT", "*.txt")])
+        if not f:
+            return
+        algo, groups, stats = self.dedupe_result
+        try:
+            write_duplicates_report(groups, f, algo, stats)
+            messagebox.showinfo("Exportado", f"Informe guardado en {f}")
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+
+    # ------------------ Tab: Benchmark ------------------
+    def _build_benchmark_tab(self):
+        parent = self.frame_benchmark
+
+        row = ctk.CTkFrame(parent)
+        row.pack(fill="x", padx=12, pady=8)
+        self.benchmark_profile_var = tk.StringVar(value="quick")
+        ctk.CTkOptionMenu(row, values=list(BENCHMARK_PROFILES), variable=self.benchmark_profile_var, width=100).pack(side="left", padx=(0,8))
+        ctk.CTkButton(row, text="Ejecutar benchmark", command=self.benchmark_run).pack(side="left", padx=(0,8))
+        ctk.CTkButton(row, text="Exportar resultados", command=self.benchmark_export).pack(side="left", padx=(0,8))
+        ctk.CTkButton(row, text="Usar bloque recomendado", command=self.benchmark_save_chunk).pack(side="left")
+
+        self.benchmark_status_var = tk.StringVar(value=f"Bloque de lectura actual: {ENGINE_SETTINGS['chunk_size'] // 1024} KB")
+        ctk.CTkLabel(parent, textvariable=self.benchmark_status_var, anchor="w").pack(fill="x", padx=12)
+        self.benchmark_out = tk.Text(parent, height=20)
+        self.benchmark_out.pack(fill="both", expand=True, padx=12, pady=(8,12))
+
+    def benchmark_run(self):
+        if self.benchmark_thread is not None and self.benchmark_thread.is_alive():
+            messagebox.showwarning("En curso", "El benchmark ya se está ejecutando")
+            return
+        if not messagebox.askyesno("Benchmark", "Se escribirán archivos temporales y se usará la CPU y el disco durante un rato. ¿Continuar?"):
+            return
+        messages: "queue.Queue[tuple[str, Any]]" = queue.Queue()
+        profile = self.benchmark_profile_var.get()
+
+        def work():
+            try:
+                messages.put(('done', run_benchmark(profile, log=lambda msg: messages.put(('log', msg)))))
+            except Exception as e:
+                messages.put(('error', str(e)))
+
+        def poll():
+            while True:
+                try:
+                    kind, value = messages.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'log':
+                    self.benchmark_status_var.set(f"Midiendo: {value}")
+                elif kind == 'error':
+                    self.benchmark_status_var.set("")
+                    messagebox.showerror("Error", value)
+                    return
+                else:
+                    self.benchmark_result = value
+                    self.benchmark_out.delete("1.0", tk.END)
+                    self.benchmark_out.insert(tk.END, format_benchmark(value))
+                    self.benchmark_status_var.set(f"Terminado. Bloque recomendado: {value['recommended_chunk'] // 1024} KB")
+                    return
+            self.after(200, poll)
+
+        self.benchmark_out.delete("1.0", tk.END)
+        self.benchmark_thread = threading.Thread(target=work, name="benchmark", daemon=True)
+        self.benchmark_thread.start()
+        self.after(200, poll)
+
+    def benchmark_export(self):
+        if self.benchmark_result is None:
+            messagebox.showwarning("Vacío", "Ejecuta el benchmark primero")
+            return
+        f = filedialog.asksaveasfilename(title="Guardar resultados", initialfile=f"benchmark_{safe_timestamp()}.json", defaultextension=".json",
+                                         filetypes=[("JSON Files","*.json"), ("CSV Files","*.csv")])
+        if f:
+            try:
+                write_benchmark(self.benchmark_result, f)
+                messagebox.showinfo("Exportado", f"Resultados guardados en {f}")
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+
+    def benchmark_save_chunk(self):
+        if self.benchmark_result is None:
+            messagebox.showwarning("Vacío", "Ejecuta el benchmark primero")
+            return
+        size = self.benchmark_result['recommended_chunk']
+        try:
+            save_engine_setting('chunk_size', size)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.benchmark_status_var.set(f"Bloque de lectura actual: {size // 1024} KB (guardado)")
+
+    # ------------------ Tab: Config ------------------
+    def _build_config_tab(self):
+        parent = self.frame_config
+
+        ctk.CTkLabel(parent, text="Apariencia:").pack(anchor="w", padx=12, pady=(12,2))
+        # Only Light / Dark options as requested
+        self.appearance_var = tk.StringVar(value="Light")
+        appearance_options = ["Light", "Dark"]
+        self.appearance_menu = ctk.CTkOptionMenu(parent, values=appearance_options, variable=self.appearance_var, command=self._on_change_appearance)
+        self.appearance_menu.pack(anchor="w", padx=12)
+
+        ctk.CTkLabel(parent, text="Exportación avanzada: formato por defecto al exportar lote").pack(anchor="w", padx=12, pady=(8,2))
+        self.export_format_var = tk.StringVar(value="TXT")
+        rb_frame = ctk.CTkFrame(parent)
+        rb_frame.pack(anchor="w", padx=12, pady=(4,8))
+        for opt in ("TXT","CSV","JSON","JSONL"):
+            rb = ctk.CTkRadioButton(rb_frame, text=opt, variable=self.export_format_var, value=opt)
+            rb.pack(side="left", padx=6)
+
+        btn_export_now = ctk.CTkButton(parent, text="Exportar tabla de lote ahora", command=self.export_batch_table)
+        btn_export_now.pack(padx=12, pady=(8,12))
+
+        ctk.CTkLabel(parent, text="Trabajadores en paralelo (lote / manifest / verificación):").pack(anchor="w", padx=12, pady=(8,2))
+        self.workers_var = tk.StringVar(value=str(DEFAULT_WORKERS))
+        worker_options = [str(n) for n in (1, 2, 4, 8, 16, 32) if n <= max(2, (os.cpu_count() or 1) * 2)]
+        if self.workers_var.get() not in worker_options:
+            worker_options.append(self.workers_var.get())
+        ctk.CTkOptionMenu(parent, values=worker_options, variable=self.workers_var).pack(anchor="w", padx=12)
+        ctk.CTkLabel(parent, text="Modo de ejecución (Auto: procesos si el algoritmo no libera el GIL, p. ej. Whirlpool; Procesos: muchos archivos pequeños):").pack(anchor="w", padx=12, pady=(8,2))
+        self.exec_mode_var = tk.StringVar(value=EXEC_MODE_AUTO)
+        ctk.CTkOptionMenu(parent, values=[EXEC_MODE_AUTO] + EXEC_MODES, variable=self.exec_mode_var).pack(anchor="w", padx=12)
+        ctk.CTkLabel(parent, text="Lectura de archivos (auto: readahead en red, mmap para archivos grandes, readinto para el resto):").pack(anchor="w", padx=12, pady=(8,2))
+        io_row = ctk.CTkFrame(parent)
+        io_row.pack(anchor="w", fill="x", padx=12)
+        self.io_backend_var = tk.StringVar(value=ENGINE_SETTINGS['io_backend'])
+        ctk.CTkOptionMenu(io_row, values=IO_BACKENDS, variable=self.io_backend_var,
+                          command=lambda v: ENGINE_SETTINGS.update(io_backend=v)).pack(side="left", padx=(0,8))
+        ctk.CTkLabel(io_row, text="Búferes de lectura anticipada:").pack(side="left", padx=(0,4))
+        self.readahead_depth_var = tk.StringVar(value=str(ENGINE_SETTINGS['readahead_depth']))
+        ctk.CTkOptionMenu(io_row, values=["2", "4", "8", "16"], variable=self.readahead_depth_var, width=70,
+                          command=lambda v: save_engine_setting('readahead_depth', int(v))).pack(side="left")
+
+        cache_row = ctk.CTkFrame(parent)
+        cache_row.pack(anchor="w", fill="x", padx=12, pady=(12,4))
+        self.cache_enabled_var = tk.BooleanVar(value=ENGINE_SETTINGS['cache'])
+        ctk.CTkCheckBox(cache_row, text="Caché de hashes (omitir archivos sin cambios)", variable=self.cache_enabled_var,
+                        command=lambda: ENGINE_SETTINGS.update(cache=self.cache_enabled_var.get())).pack(side="left", padx=(0,8))
+        self.cache_force_var = tk.BooleanVar(value=not ENGINE_SETTINGS['cache_trust'])
+        ctk.CTkCheckBox(cache_row, text="Forzar recálculo", variable=self.cache_force_var,
+                        command=lambda: ENGINE_SETTINGS.update(cache_trust=not self.cache_force_var.get())).pack(side="left", padx=(0,8))
+        ctk.CTkButton(cache_row, text="Estadísticas", width=100, command=self._show_cache_stats).pack(side="left", padx=(0,8))
+        ctk.CTkButton(cache_row, text="Vaciar caché", width=100, command=self._clear_cache).pack(side="left")
+
+        ctk.CTkLabel(parent, text="Registro de auditoría (sqlite/jsonl: consulta rápida del historial):").pack(anchor="w", padx=12, pady=(8,2))
+        audit_row = ctk.CTkFrame(parent)
+        audit_row.pack(anchor="w", fill="x", padx=12, pady=(0,4))
+        self.audit_backend_var = tk.StringVar(value=ENGINE_SETTINGS['audit_backend'])
+        ctk.CTkOptionMenu(audit_row, values=AUDIT_BACKENDS, variable=self.audit_backend_var,
+                          command=lambda v: ENGINE_SETTINGS.update(audit_backend=v)).pack(side="left", padx=(0,8))
+        ctk.CTkButton(audit_row, text="Historial de un archivo", command=self._show_audit_history).pack(side="left")
+
+    def _show_cache_stats(self):
+        cache = get_digest_cache()
+        if cache is None:
+            messagebox.showinfo("Caché", "La caché de hashes está desactivada")
+            return
+        st = cache.stats()
+        messagebox.showinfo("Caché", f"Aciertos: {st['hits']}\nFallos: {st['misses']}\nEntradas: {st['entries']}\nArchivo: {cache.db_path}")
+
+    def _show_audit_history(self):
+        f = filedialog.askopenfilename(title="Historial de hashes de un archivo")
+        if not f:
+            return
+        rows = audit_history(f)
+        if not rows:
+            messagebox.showinfo("Historial", "No hay entradas en el registro para este archivo")
+            return
+        lines = [f"{r['timestamp']}  {r['algorithm']}  {r['hash']}" for r in rows[-AUDIT_HISTORY_SHOWN:]]
+        messagebox.showinfo("Historial", f"{len(rows)} entradas (últimas {len(lines)}):\n\n" + "\n".join(lines))
+
+    def _clear_cache(self):
+        cache = get_digest_cache()
+        if cache is not None and messagebox.askyesno("Caché", "¿Vaciar la caché de hashes?"):
+            cache.clear()
+
+    def _on_change_appearance(self, value: str):
+        """Apply appearance mode: Light / Dark"""
+        try:
+            if value == "Light":
+                ctk.set_appearance_mode("Light")
+            else:
+                ctk.set_appearance_mode("Dark")
+        except Exception as e:
+            # fallback
+            try:
+                ctk.set_appearance_mode(value)
+            except Exception:
+                print("Error aplicando apariencia:", e)
+
+    # ------------------ Utilities ------------------
+    def _job_mode(self, algos: Iterable[str]) -> str:
+        return pick_exec_mode(self.exec_mode_var.get(), algos)
+
+    def _job_workers(self) -> int:
+        try:
+            return max(1, int(self.workers_var.get()))
+        except Exception:
+            return DEFAULT_WORKERS
+
+    def _start_job(self, job: HashJob, on_event: Callable[[str, Any, Any], None], on_done: Callable[[bool], None],
+                   on_metrics: Optional[Callable[[Dict[str, Any]], None]] = None) -> HashJob:
+        job.start()
+        self.after(50, lambda: self._drain_job(job, on_event, on_done, on_metrics, 0.0))
+        return job
+
+    def _drain_job(self, job: HashJob, on_event: Callable[[str, Any, Any], None], on_done: Callable[[bool], None],
+                   on_metrics: Optional[Callable[[Dict[str, Any]], None]] = None, last_metrics: float = 0.0):
+        """Apply queued job events on the Tk thread, at most ~20 ms per tick, until 'done' arrives."""
+        deadline = time.perf_counter() + 0.02
+        while time.perf_counter() < deadline:
+            try:
+                kind, key, value = job.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'done':
+                if on_metrics:
+                    on_metrics(job.metrics.snapshot())
+                on_done(value)
+                return
+            on_event(kind, key, value)
+        now = time.perf_counter()
+        if on_metrics and now - last_metrics >= 1.0 / PROGRESS_HZ:
+            on_metrics(job.metrics.snapshot())
+            last_metrics = now
+        self.after(50, lambda: self._drain_job(job, on_event, on_done, on_metrics, last_metrics))
+
+    def _build_job_progress(self, parent):
+        """Job-wide progress bar plus a bytes / MB/s / ETA line under it."""
+        bar = ctk.CTkProgressBar(parent)
+        bar.set(0.0)
+        bar.pack(fill="x", padx=12, pady=(4,0))
+        var = tk.StringVar(value="")
+        ctk.CTkLabel(parent, textvariable=var, anchor="w").pack(fill="x", padx=12)
+        return bar, var
+
+    def _job_metrics_updater(self, bar, var) -> Callable[[Dict[str, Any]], None]:
+        def update(snap):
+            bar.set(snap['pct'] / 100.0)
+            var.set(format_job_metrics(snap))
+        return update
+
+    def _toggle_pause(self, job: Optional[HashJob], button):
+        if job is None or not job.running:
+            return
+        if job.control.paused:
+            job.control.resume()
+            button.configure(text="Pausar")
+        else:
+            job.control.pause()
+            button.configure(text="Reanudar")
+
+    def _cancel_job(self, job: Optional[HashJob]):
+        if job is not None:
+            job.control.cancel()
+
+    def _on_close(self):
+        for job in (self.batch_job, self.integrity_job, self.dedupe_job, self.compare_job):
+            self._cancel_job(job)
+        for journal in self.journals:
+            journal.close()
+        close_audit_sink()
+        close_digest_cache()
+        self.destroy()
+
+    def _append_audit(self, algo, path_or_text, type_, size_bytes, duration, hexdigest):
+        append_audit(algo, path_or_text, type_, size_bytes, duration, hexdigest)
+
+    def export_batch_table(self):
+        if not len(self.batch_model):
+            messagebox.showwarning("Vacío", "No hay datos en la tabla de lote")
+            return
+
+        fmt = self.export_format_var.get()
+        default_name = f"batch_export_{safe_timestamp()}"
+
+        f = filedialog.asksaveasfilename(title="Guardar export", initialfile=f"{default_name}.{fmt.lower()}",
+                                         defaultextension=f".{fmt.lower()}",
+                                         filetypes=[("TXT Files","*.txt"),("CSV Files","*.csv"),("JSON Files","*.json"),("JSON Lines","*.jsonl"),
+                                                    ("Comprimido (gzip / xz)","*.gz *.xz"),("All files","*.*")])
+        if not f:
+            return
+        try:
+            # rows go straight from the model to the (optionally .gz / .xz) file, one at a time
+            with BatchExportWriter(f, batch_export_kind(f) or fmt.lower(), algo_declared=self.batch_algo_var.get()) as w:
+                for row in self.batch_model.export_rows():
+                    w.write(row)
+            messagebox.showinfo("Exportado", f"Exportado a {f} ({w.count} filas)")
+        except Exception as e:
+            messagebox.showerror("Error exportando", str(e))
+
+def create_app() -> HashManagerApp:
+    """Import the GUI stack and build the window (the CLI never calls this)."""
+    _load_gui()
+    ensure_plugins()  # the menus list every algorithm
+
+    class HashManagerWindow(HashManagerApp, ctk.CTk):
+        """HashManagerApp on a CTk root window: ctk only exists once _load_gui() has run."""
+    return HashManagerWindow()
+
+# --------------------------- CLI ---------------------------
+# Exit codes: 0 = OK / everything matches, 1 = differences found, 2 = error or bad usage
+EXIT_OK, EXIT_DIFF, EXIT_ERROR = 0, 1, 2
+CLI_MODES = {'auto': EXEC_MODE_AUTO, 'threads': "Hilos", 'processes': "Procesos"}
+
+def _cli_algos(args) -> List[str]:
+    algo = parse_algo_list(args.algorithm)[0]
+    return [algo] + [a for a in parse_algo_list(args.algos or '') if a != algo]
+
+def _cli_mode(args, algos: Iterable[str]) -> str:
+    return pick_exec_mode(CLI_MODES[args.mode], algos)
+
+def _cli_apply_engine_args(args):
+    ENGINE_SETTINGS['audit_backend'] = args.audit
+    if 'io' not in vars(args):
+        return  # commands that don't read files (history, benchmark, hashset build, manifest diff)
+    ENGINE_SETTINGS['io_backend'] = args.io
+    if args.readahead_depth:
+        ENGINE_SETTINGS['readahead_depth'] = args.readahead_depth
+    if args.chunk_size:
+        ENGINE_SETTINGS['chunk_size'] = max(4096, parse_size(args.chunk_size))
+    if args.no_cache:
+        ENGINE_SETTINGS['cache'] = False
+    if args.force:
+        ENGINE_SETTINGS['cache_trust'] = False
+
+def _cli_status_line(fmt: Callable[[Dict[str, Any]], str]) -> Optional[Callable[[Optional[Dict[str, Any]]], None]]:
+    """Progress on one self-rewriting stderr line (None clears it); only when stderr is a terminal."""
+    if not sys.stderr.isatty():
+        return None
+
+    def show(snap):
+        sys.stderr.write("\r\033[K" + (fmt(snap) if snap else ""))
+        sys.stderr.flush()
+    return show
+
+def _cli_emit(args, path: str, size: int, digests: Dict[str, str], timings: Dict[str, float], io_wait: Optional[float] = None,
+              known: Optional[str] = None):
+    if args.format == 'jsonl':
+        rec = {'path': path, 'size': size, 'digests': digests, 'timings': timings}
+        if io_wait is not None:
+            rec['io_wait'] = io_wait
+        if known is not None:
+            rec['hashset'] = known
+        line = json.dumps(rec, ensure_ascii=False)
+    elif len(digests) == 1:
+        line = f"{next(iter(digests.values()))}  {path}"
+    else:
+        line = "\n".join(f"{a} ({path}) = {d}" for a, d in digests.items())
+    if known is not None and args.format != 'jsonl':
+        line += f"  [{known}]"
+    print(line, flush=True)
+
+def _cli_open_hashsets(paths: List[str]) -> List[HashSetIndex]:
+    indexes = []
+    try:
+        for path in paths:
+            indexes.append(HashSetIndex(path))
+    except Exception:
+        for ix in indexes:
+            ix.close()
+        raise
+    return indexes
+
+def cli_hash(args) -> int:
+    algos = _cli_algos(args)
+    rc = EXIT_OK
+    status = _cli_status_line(format_file_progress)
+    for path in args.files:
+        stats = {}
+        try:
+            digests, timings, _ = compute_hashes_file_sync(path, algos, stats=stats, progress_snapshot_cb=status)
+            size = stats['stat'].st_size
+        except Exception as e:
+            print(f"ERROR {path}: {e}", file=sys.stderr)
+            rc = EXIT_ERROR
+            continue
+        finally:
+            if status:
+                status(None)
+        _cli_emit(args, path, size, digests, timings, stats.get('io_wait'))
+        for a, d in digests.items():
+            append_audit(a, path, 'file', size, timings[a], d)
+    return rc
+
+def cli_batch(args) -> int:
+    algos = _cli_algos(args)
+    paths = list(args.files) + (read_path_list(args.from_list) if args.from_list else [])
+    if not paths:
+        print("ERROR: no hay archivos (usa argumentos o --from-list)", file=sys.stderr)
+        return EXIT_ERROR
+    indexes = _cli_open_hashsets(args.hashset)
+    algos += [ix.algorithm for ix in indexes if ix.algorithm not in algos]
+    export = BatchExportWriter(args.output, algo_declared=algos[0]) if args.output else None
+
+    def exported(res, known):
+        if export:
+            for row in batch_export_rows(res, algos, known or ""):
+                export.write(row)
+    failed = [0]
+    journal = None
+    if args.journal:
+        # files already done by an interrupted run with the same algorithms (and unchanged since) are not hashed again
+        _, done = load_batch_journal(args.journal, algos)
+        journal = JobJournal(args.journal, {'kind': 'batch', 'algorithms': algos})
+        for rec in done.values():
+            journal.write(rec)
+            known = hashset_status(indexes, rec['digests']) if indexes else None
+            _cli_emit(args, rec['path'], rec['size'], rec['digests'], rec['timings'], known=known)
+            exported(rec, known)
+        if done:
+            print(f"Reanudando: {len(done)} archivos ya calculados en {args.journal}", file=sys.stderr)
+            paths = [p for p in paths if p not in done]
+
+    def on_event(kind, key, value):
+        if kind == 'result':
+            known = hashset_status(indexes, value['digests']) if indexes else None
+            _cli_emit(args, value['path'], value['size'], value['digests'], value['timings'], value.get('io_wait'), known=known)
+            exported(value, known)
+            if journal:
+                journal.write(batch_journal_record(value))
+            for a, d in value['digests'].items():
+                append_audit(a, value['path'], 'file', value['size'], value['timings'][a], d)
+        elif kind == 'error':
+            failed[0] += 1
+            print(f"ERROR {paths[key] if key is not None else ''}: {value}", file=sys.stderr)
+
+    job = HashJob(hash_file_task, ((i, (p, algos, None, args.archives)) for i, p in enumerate(paths)), workers=args.workers, mode=_cli_mode(args, algos))
+    status = _cli_status_line(format_job_metrics)
+    if status:
+        job.metrics.expect(len(paths), sum(_file_size(p) for p in paths))
+    try:
+        cancelled = run_job_blocking(job, on_event, status)
+    finally:
+        if journal:
+            journal.close()
+        for ix in indexes:
+            ix.close()
+        if export:
+            export.close()
+            print(f"Exportado a {args.output} ({export.count} filas)", file=sys.stderr)
+    if journal and not cancelled:
+        journal.discard()
+    return EXIT_ERROR if failed[0] or cancelled else EXIT_OK
+
+def _cli_walk_options(args) -> WalkOptions:
+    return WalkOptions(args.include, args.exclude, args.min_size, args.max_size, args.symlinks, args.one_file_system)
+
+def cli_hashset_build(args) -> int:
+    algo = parse_algo_list(args.algorithm)[0]
+    for src in args.sources:
+        if not os.path.isfile(src):
+            print(f"ERROR: no existe: {src}", file=sys.stderr)
+            return EXIT_ERROR
+
+    def log(msg):
+        print(f"... {msg}", file=sys.stderr, flush=True)
+    header = build_hashset(args.sources, args.output, algo, label=args.label, bloom=args.bloom, log=log)
+    print(f"Índice guardado en {args.output} ({header['count']} hashes {algo} distintos)", file=sys.stderr)
+    if header['invalid']:
+        print(f"AVISO: {header['invalid']} valores de los manifests no son hashes {algo} válidos y se han omitido", file=sys.stderr)
+    return EXIT_OK if header['count'] else EXIT_DIFF
+
+def cli_hashset_scan(args) -> int:
+    indexes = _cli_open_hashsets(args.index)
+    algos = []
+    for ix in indexes:
+        if ix.algorithm not in algos:
+            algos.append(ix.algorithm)
+    options = _cli_walk_options(args)
+    counts = {'KNOWN': 0, 'UNKNOWN': 0}
+    failed = [0]
+
+    def items():
+        for path in args.paths:
+            if os.path.isdir(path):
+                for f, st in prefetch(walk_files(path, options, skip=args.index)):
+                    yield f, (f, algos, st.st_size)
+            else:
+                yield path, (path, algos)
+
+    def on_event(kind, key, value):
+        if kind == 'result':
+            known = hashset_status(indexes, value['digests'])
+            counts[known.split()[0]] += 1
+            if args.format == 'jsonl':
+                print(json.dumps({'path': value['path'], 'size': value['size'], 'digests': value['digests'], 'hashset': known}, ensure_ascii=False), flush=True)
+            elif not args.unknown or known == 'UNKNOWN':
+                print(f"{known}  {value['path']}", flush=True)
+        elif kind == 'error':
+            failed[0] += 1
+            print(f"ERROR {key}: {value}", file=sys.stderr)
+
+    job = HashJob(hash_file_task, items(), workers=args.workers, mode=_cli_mode(args, algos))
+    try:
+        cancelled = run_job_blocking(job, on_event, _cli_status_line(format_job_metrics))
+    finally:
+        for ix in indexes:
+            ix.close()
+    print(f"Conocidos: {counts['KNOWN']}  Desconocidos: {counts['UNKNOWN']}", file=sys.stderr)
+    if failed[0] or cancelled:
+        return EXIT_ERROR
+    return EXIT_DIFF if counts['UNKNOWN'] else EXIT_OK
+
+def cli_manifest_create(args) -> int:
+    algos = _cli_algos(args)
+    folder = args.folder
+    if not os.path.isdir(folder):
+        print(f"ERROR: carpeta no válida: {folder}", file=sys.stderr)
+        return EXIT_ERROR
+
+    options = _cli_walk_options(args)
+    filters = None if options.is_default() else options.to_dict()
+    failed = [0]
+    # finished entries go to a journal first; the manifest itself is written from it at the end
+    journal, done = resume_manifest_journal(args.output, folder, algos, filters, resume=args.resume)
+    if done:
+        print(f"Reanudando: {len(done)} archivos ya calculados en {journal.path}", file=sys.stderr)
+
+    def on_event(kind, key, value):
+        if kind == 'result':
+            entry = manifest_entry(value, folder, algos)
+            journal.write(entry)
+            print(f"{entry['hash']}  {entry['path']}", flush=True)
+        elif kind == 'error':
+            failed[0] += 1
+            print(f"ERROR: {value}", file=sys.stderr)
+
+    job = HashJob(manifest_file_task, walk_manifest_items(folder, algos, options, skip=[args.output, journal.path], done=done, archives=args.archives),
+                  workers=args.workers, mode=_cli_mode(args, algos))
+    try:
+        cancelled = run_job_blocking(job, on_event, _cli_status_line(format_job_metrics))
+    finally:
+        count = finalize_manifest_journal(journal, args.output, folder, algos, filters)
+    if cancelled:
+        print(f"Cancelado: manifest parcial en {args.output} ({count} archivos); se reanuda con el mismo comando", file=sys.stderr)
+        return EXIT_ERROR
+    if failed[0]:
+        # the journal is kept, so running the same command again only retries the files that failed
+        print(f"Manifest incompleto en {args.output} ({count} archivos, {failed[0]} no se pudieron leer); "
+              "se reintentan con el mismo comando", file=sys.stderr)
+        return EXIT_ERROR
+    journal.discard()
+    print(f"Manifest guardado en {args.output} ({count} archivos)", file=sys.stderr)
+    return EXIT_OK
+
+def cli_manifest_verify(args) -> int:
+    try:
+        header, files_entries = open_manifest(args.manifest)
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    algo = header.get('algorithm') or parse_algo_list(args.algorithm)[0]
+    base = header.get('base_folder') or args.folder or os.path.dirname(args.manifest)
+    plan = plan_verification(files_entries, algo, base)
+    issues = [0]
+    failed = [0]
+
+    def on_event(kind, key, value):
+        if kind == 'result':
+            status, detail = value
+            if status == 'ERROR':
+                failed[0] += 1  # couldn't be read: unverified, not a discrepancy
+            elif status != 'OK':
+                issues[0] += 1
+            print(verification_line(key, status, detail), flush=True)
+        elif kind == 'extra':
+            issues[0] += 1
+            print(verification_line(value, 'EXTRA'), flush=True)
+        elif kind == 'error':
+            failed[0] += 1
+            print(f"ERROR {key or ''}: {value}", file=sys.stderr)
+
+    skip_extra = [args.manifest] if args.extra else None
+    job = VerifyJob(plan, level=args.level, base=base if args.extra else None, skip_extra=skip_extra or (),
+                    workers=args.workers, mode=_cli_mode(args, [algo]), byte_range=args.range,
+                    walk_options=WalkOptions.from_dict(header.get('filters')))
+    cancelled = run_job_blocking(job, on_event, _cli_status_line(format_job_metrics))
+    print(f"Encontradas {issues[0]} discrepancias" + (f"; {failed[0]} archivos sin verificar por errores" if failed[0] else ""), file=sys.stderr)
+    if cancelled or failed[0]:
+        return EXIT_ERROR
+    return EXIT_DIFF if issues[0] else EXIT_OK
+
+def cli_manifest_watch(args) -> int:
+    errors = [0]
+
+    def on_event(kind, key, value):
+        if kind == 'change':
+            print(f"{value['change']:<8} {key}" + (f"  {value['hash']}" if value['hash'] else ""), flush=True)
+        elif kind == 'status':
+            print(value, file=sys.stderr)
+        elif kind == 'error':
+            if key is None:
+                errors[0] += 1
+            print(f"ERROR {key or ''}: {value}", file=sys.stderr)
+
+    job = MonitorJob(args.manifest, base=args.folder, algo=parse_algo_list(args.algorithm)[0], interval=args.interval,
+                     poll=args.poll, workers=args.workers)
+    run_job_blocking(job, on_event)  # runs until Ctrl+C
+    if errors[0]:
+        return EXIT_ERROR
+    print(f"Monitor detenido; {args.manifest} actualizado", file=sys.stderr)
+    return EXIT_OK
+
+def cli_manifest_diff(args) -> int:
+    counts = {status: 0 for status in MANIFEST_DIFF_STATUSES}
+    stats = {}
+    algo = parse_algo_list(args.algorithm)[0] if args.algorithm else None
+    for status, rel, info in diff_manifests(args.old, args.new, algo, stats):
+        counts[status] += 1
+        if args.only and status not in args.only:
+            continue
+        if args.format == 'jsonl':
+            print(json.dumps({'status': status, 'path': rel, **info}, ensure_ascii=False), flush=True)
+        else:
+            print(format_diff_line(status, rel, info), flush=True)
+    print(f"{stats['old']} -> {stats['new']} archivos; sin cambios: {stats['unchanged']}; "
+          + ", ".join(f"{s.lower()}: {c}" for s, c in counts.items()), file=sys.stderr)
+    return EXIT_DIFF if any(counts.values()) else EXIT_OK
+
+def cli_dedupe(args) -> int:
+    algo = _cli_algos(args)[0]
+    for folder in args.folders:
+        if not os.path.isdir(folder):
+            print(f"ERROR: carpeta no válida: {folder}", file=sys.stderr)
+            return EXIT_ERROR
+    collector = DuplicateCollector(algo)
+
+    def on_event(kind, key, value):
+        collector.feed(kind, key, value)
+        if kind == 'error':
+            print(f"ERROR {key}: {value}", file=sys.stderr)
+
+    job = DedupeJob(args.folders, algo, _cli_walk_options(args), workers=args.workers, mode=_cli_mode(args, [algo]))
+    cancelled = run_job_blocking(job, on_event, _cli_status_line(format_job_metrics))
+    if cancelled:
+        return EXIT_ERROR
+    groups = collector.groups()
+    if args.format == 'jsonl':
+        for g in groups:
+            print(json.dumps({'algorithm': algo, **g}, ensure_ascii=False))
+    else:
+        print(format_duplicates(groups, collector.stats))
+    if args.output:
+        write_duplicates_report(groups, args.output, algo, collector.stats)
+        print(f"Informe guardado en {args.output}", file=sys.stderr)
+    if collector.errors:
+        return EXIT_ERROR
+    return EXIT_DIFF if groups else EXIT_OK
+
+def cli_compare(args) -> int:
+    algo = parse_algo_list(args.algorithm)[0]
+    a, b = args.a, args.b
+    try:
+        if os.path.isfile(b):
+            status = _cli_status_line(format_file_progress)
+            try:
+                res = compare_files_engine(a, b, algo, args.method, args.count, progress_cb=status)
+            finally:
+                if status:
+                    status(None)
+            print(format_compare_result(res, algo))
+            return EXIT_OK if res['equal'] else EXIT_DIFF
+        elif b and all(c in '0123456789abcdefABCDEF' for c in b) and len(b) >= 8:
+            ha, _ = compute_hash_file_sync(a, algo)
+            hb = b.lower()
+        else:
+            print("ERROR: B debe ser un archivo válido o un hash hexadecimal", file=sys.stderr)
+            return EXIT_ERROR
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    if ha == hb:
+        print(f"COINCIDENCIA {algo} {ha}")
+        return EXIT_OK
+    print(f"DISTINTO {algo} A={ha} B={hb}")
+    return EXIT_DIFF
+
+def cli_algorithms(args) -> int:
+    ensure_plugins()
+    for info in ALGORITHMS.values():
+        notes = ["criptográfico" if info.cryptographic else "no criptográfico",
+                 "hilos" if info.releases_gil else "procesos (retiene el GIL)"]
+        if not info.available():
+            notes.append(f"no disponible: falta {info.requires}")
+        print(f"{info.name:<18} {info.digest_size * 8:>4} bits  " + ", ".join(notes))
+    return EXIT_OK
+
+def cli_history(args) -> int:
+    rows = audit_history(args.path)
+    for r in rows:
+        print(f"{r['timestamp']}  {r['algorithm']}  {r['hash']}  {r['path_or_text']}")
+    return EXIT_OK if rows else EXIT_DIFF
+
+def cli_benchmark(args) -> int:
+    def log(msg):
+        print(f"... {msg}", file=sys.stderr, flush=True)
+    result = run_benchmark(args.profile, tmpdir=args.dir, algos=parse_algo_list(args.algos) if args.algos else None, log=log)
+    print(format_benchmark(result))
+    if args.output:
+        write_benchmark(result, args.output)
+        print(f"Resultados guardados en {args.output}", file=sys.stderr)
+    if args.save_chunk:
+        save_engine_setting('chunk_size', result['recommended_chunk'])
+        print(f"Tamaño de bloque guardado: {result['recommended_chunk'] // 1024} KB ({SETTINGS_FILE})", file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as fh:
+            slower = compare_benchmark(result, json.load(fh), args.tolerance)
+        for r in slower:
+            print(f"MÁS LENTO {r['section']} {r['name']} {r['param']}: {r['mb_s']:.1f} MB/s (antes {r['baseline_mb_s']:.1f}, {r['change']:+.0%})")
+        return EXIT_DIFF if slower else EXIT_OK
+    return EXIT_OK
+
+def _cli_byte_range(text: str) -> tuple[int, int]:
+    import argparse
+    start, sep, end = text.partition(':')
+    try:
+        start, end = int(start or 0), int(end)
+    except ValueError:
+        raise argparse.ArgumentTypeError("usa INICIO:FIN en bytes, ej. 0:1073741824")
+    if not sep or end <= start or start < 0:
+        raise argparse.ArgumentTypeError("usa INICIO:FIN en bytes, ej. 0:1073741824")
+    return start, end
+
+def build_cli_parser(command: Optional[str] = None):
+    """
+    The CLI parser. Given the command about to run (argv[0]), only that one is built (argparse costs
+    about a millisecond per parser at startup); the others only appear in the usage line.
+    """
+    import argparse
+
+    # shared option groups (argparse parents), built only for the commands that use them
+    @functools.cache
+    def audit():
+        p = argparse.ArgumentParser(add_help=False)
+        p.add_argument('--audit', choices=AUDIT_BACKENDS, default=ENGINE_SETTINGS['audit_backend'], help="registro de auditoría")
+        return p
+
+    @functools.cache
+    def common():
+        p = argparse.ArgumentParser(add_help=False, parents=[audit()])
+        p.add_argument('-a', '--algorithm', default="SHA256", help="algoritmo principal (por defecto SHA256)")
+        p.add_argument('--algos', default='', help="algoritmos adicionales en la misma lectura, ej. MD5,CRC32")
+        p.add_argument('--io', choices=IO_BACKENDS, default="auto", help="método de lectura (readahead: hilo lector con búferes, para discos de red)")
+        p.add_argument('--readahead-depth', type=int, help=f"búferes leídos por adelantado con --io readahead (por defecto {ENGINE_SETTINGS['readahead_depth']})")
+        p.add_argument('--chunk-size', help=f"tamaño de bloque/búfer de lectura, ej. 1M (por defecto {ENGINE_SETTINGS['chunk_size'] // 1024}K)")
+        p.add_argument('--no-cache', action='store_true', help="no usar la caché de hashes")
+        p.add_argument('--force', action='store_true', help="recalcular aunque haya entrada en caché")
+        return p
+
+    @functools.cache
+    def jobs():
+        p = argparse.ArgumentParser(add_help=False)
+        p.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f"trabajadores en paralelo (por defecto {DEFAULT_WORKERS})")
+        p.add_argument('--mode', choices=list(CLI_MODES), default='auto', help="hilos o procesos (auto: procesos si algún algoritmo no libera el GIL)")
+        return p
+
+    @functools.cache
+    def fmt():
+        p = argparse.ArgumentParser(add_help=False)
+        p.add_argument('--format', choices=['text', 'jsonl'], default='text', help="salida de texto o JSON Lines")
+        return p
+
+    @functools.cache
+    def walk():
+        p = argparse.ArgumentParser(add_help=False)
+        p.add_argument('--include', action='append', default=[], help="solo archivos que coincidan (glob o re:regex; repetible)")
+        p.add_argument('--exclude', action='append', default=[], help="omitir archivos/carpetas que coincidan, ej. .git (repetible)")
+        p.add_argument('--min-size', help="tamaño mínimo, ej. 1K")
+        p.add_argument('--max-size', help="tamaño máximo, ej. 4G")
+        p.add_argument('--symlinks', choices=SYMLINK_POLICIES, default="files", help="files: enlaces a archivos; skip: ignorar enlaces; follow: también carpetas enlazadas")
+        p.add_argument('--one-file-system', action='store_true', help="no cruzar a otros sistemas de archivos")
+        return p
+
+    parser = argparse.ArgumentParser(prog="Hash_Generator_v3.0.py", description="Hash Generator v3.0 - modo línea de comandos (sin argumentos abre la interfaz gráfica)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    names = []
+
+    def add(name, help, *parents):
+        names.append(name)
+        if command is not None and name != command:
+            return None
+        return sub.add_parser(name, parents=[make() for make in parents], help=help)
+
+    p = add('hash', "hash de uno o varios archivos", common, fmt)
+    if p:
+        p.add_argument('files', nargs='+')
+        p.set_defaults(func=cli_hash)
+    p = add('batch', "lote en paralelo", common, jobs, fmt)
+    if p:
+        p.add_argument('files', nargs='*')
+        p.add_argument('--from-list', help="archivo de texto con una ruta por línea")
+        p.add_argument('--journal', help="registrar cada resultado en este archivo; si existe de una ejecución interrumpida, se reanuda")
+        p.add_argument('--archives', action='store_true', help="hashear cada miembro de los zip/tar (ruta archivo.zip!miembro) en lugar del archivo")
+        p.add_argument('--hashset', action='append', default=[], help="índice de hashes: marcar cada archivo KNOWN/UNKNOWN (repetible)")
+        p.add_argument('-o', '--output', help="exportar también a un archivo (.txt, .csv, .json, .jsonl; + .gz o .xz para comprimir)")
+        p.set_defaults(func=cli_batch)
+    p = add('manifest', "crear o verificar manifests")
+    if p:
+        msub = p.add_subparsers(dest='manifest_command', required=True)
+        m = msub.add_parser('create', parents=[common(), jobs(), walk()], help="crear manifest desde carpeta")
+        m.add_argument('folder')
+        m.add_argument('-o', '--output', required=True, help="archivo de salida (.jsonl, .jsonl.gz, .json, .csv o .txt)")
+        m.add_argument('--no-resume', dest='resume', action='store_false', help="empezar de cero aunque haya un journal de una ejecución interrumpida")
+        m.add_argument('--archives', action='store_true', help="registrar los miembros de los zip/tar (archivo.zip!miembro) sin extraerlos")
+        m.set_defaults(func=cli_manifest_create)
+        m = msub.add_parser('verify', parents=[common(), jobs()], help="verificar carpeta contra manifest")
+        m.add_argument('manifest')
+        m.add_argument('--folder', help="carpeta base si el manifest no la declara")
+        m.add_argument('--level', choices=VERIFY_LEVELS, default="full", help="full: stat + muestreo + hash completo; sample: stat + muestreo; quick: stat + mtime")
+        m.add_argument('--no-extra', dest='extra', action='store_false', help="no buscar archivos que no estén en el manifest")
+        m.add_argument('--range', type=_cli_byte_range, help="INICIO:FIN - con hashes de árbol (SHA256-TREE-64M), leer solo ese rango de bytes")
+        m.set_defaults(func=cli_manifest_verify)
+        m = msub.add_parser('watch', parents=[common()], help="vigilar la carpeta de un manifest y mantenerlo al día (Ctrl+C para terminar)")
+        m.add_argument('manifest')
+        m.add_argument('--folder', help="carpeta base si el manifest no la declara")
+        m.add_argument('--interval', type=float, default=MONITOR_INTERVAL, help=f"segundos entre pasadas de sondeo (por defecto {MONITOR_INTERVAL:g})")
+        m.add_argument('--poll', action='store_true', help="sondear con stat aunque haya inotify")
+        m.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f"archivos recalculados en paralelo (por defecto {DEFAULT_WORKERS})")
+        m.set_defaults(func=cli_manifest_watch)
+        m = msub.add_parser('diff', parents=[audit(), fmt()], help="diferencias entre dos manifests, sin recalcular hashes")
+        m.add_argument('old', help="manifest anterior")
+        m.add_argument('new', help="manifest nuevo")
+        m.add_argument('-a', '--algorithm', help="algoritmo a comparar (por defecto el del manifest anterior)")
+        m.add_argument('--only', action='append', choices=MANIFEST_DIFF_STATUSES, help="listar solo este tipo de cambio (repetible)")
+        m.set_defaults(func=cli_manifest_diff)
+    p = add('hashset', "índices de hashes conocidos (consulta rápida contra millones de hashes)")
+    if p:
+        hsub = p.add_subparsers(dest='hashset_command', required=True)
+        h = hsub.add_parser('build', parents=[audit()], help="crear un índice desde manifests o listas de hashes")
+        h.add_argument('sources', nargs='+', help="manifests (.jsonl, .json, .csv, .txt) o listas de hashes (sha256sum, CSV, uno por línea)")
+        h.add_argument('-a', '--algorithm', default="SHA256", help="algoritmo de los hashes a indexar (por defecto SHA256)")
+        h.add_argument('-o', '--output', required=True, help="archivo del índice, ej. conocidos.hashset")
+        h.add_argument('--label', default='', help="nombre del conjunto en los resultados (por defecto el del archivo)")
+        h.add_argument('--bloom', action='store_true', help="añadir un filtro Bloom: descarta casi todos los desconocidos sin búsqueda binaria")
+        h.set_defaults(func=cli_hashset_build)
+        h = hsub.add_parser('scan', parents=[common(), jobs(), fmt(), walk()], help="marcar archivos o carpetas como KNOWN/UNKNOWN contra índices")
+        h.add_argument('paths', nargs='+')
+        h.add_argument('-i', '--index', action='append', required=True, help="índice de hashes (repetible)")
+        h.add_argument('--unknown', action='store_true', help="listar solo los desconocidos")
+        h.set_defaults(func=cli_hashset_scan)
+    p = add('compare', "comparar archivo A con archivo o hash B", common)
+    if p:
+        p.add_argument('a')
+        p.add_argument('b')
+        p.add_argument('--method', choices=COMPARE_METHODS, default="bytes",
+                       help="bytes: comparar en paralelo y parar en la primera diferencia; hash: calcular ambos hashes a la vez; sample: solo la huella rápida de muestreo")
+        p.add_argument('--count', action='store_true', help="con --method bytes, leer hasta el final y contar todos los bytes distintos")
+        p.set_defaults(func=cli_compare)
+    p = add('dedupe', "buscar archivos duplicados en una o varias carpetas", common, jobs, fmt, walk)
+    if p:
+        p.add_argument('folders', nargs='+')
+        p.add_argument('-o', '--output', help="guardar informe (.json, .csv o .txt)")
+        p.set_defaults(func=cli_dedupe)
+    p = add('benchmark', "medir algoritmos, tamaños de bloque, lectura y trabajadores", audit)
+    if p:
+        p.add_argument('--profile', choices=list(BENCHMARK_PROFILES), default='quick', help="quick (~200 MB de disco) o full (~1 GB)")
+        p.add_argument('--algos', default='', help="solo estos algoritmos en la prueba en memoria")
+        p.add_argument('--dir', help="carpeta para los archivos temporales (el disco que se quiere medir)")
+        p.add_argument('-o', '--output', help="guardar resultados (.json o .csv)")
+        p.add_argument('--save-chunk', action='store_true', help="guardar el tamaño de bloque recomendado para las próximas ejecuciones")
+        p.add_argument('--baseline', help="JSON de una ejecución anterior: lista lo que sea más lento (código 1)")
+        p.add_argument('--tolerance', type=float, default=0.10, help="margen para --baseline (0.10 = 10%%)")
+        p.set_defaults(func=cli_benchmark)
+    p = add('algorithms', f"algoritmos registrados (incluidos plugins de {PLUGINS_DIR})", audit)
+    if p:
+        p.set_defaults(func=cli_algorithms)
+    p = add('history', "hashes registrados de un archivo a lo largo del tiempo", audit)
+    if p:
+        p.add_argument('path')
+        p.set_defaults(func=cli_history)
+    if command is not None:
+        if command not in names:
+            return build_cli_parser()  # not a command name (a typo, -h): the full parser reports it
+        sub.metavar = "{" + ",".join(names) + "}"
+    return parser
+
+def cli_main(argv: List[str]) -> int:
+    args = build_cli_parser(argv[0] if argv else None).parse_args(argv)
+    try:
+        _cli_apply_engine_args(args)
+        return args.func(args)
+    except KeyboardInterrupt:
+        return EXIT_ERROR
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        close_digest_cache()
+        close_audit_sink()  # so a failure writing the last audit rows is reported too
+        for err in pending_background_errors():
+            print(f"AVISO: {err}", file=sys.stderr)
+
+# --------------------------- Run ---------------------------
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        sys.exit(cli_main(argv))
+    app = create_app()
+    app.mainloop()
@@ -0,0 +1,55 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="session")
+def hg(tmp_path_factory):
+    """The hash_generator module (what Hash_Generator_v3.0.py launches).
+
+    It keeps its logs/ (settings, audit log, digest cache, journals) relative to the working
+    directory, created on import, so the whole session runs from a scratch directory.
+    """
+    os.chdir(tmp_path_factory.mktemp("cwd"))
+    sys.path.insert(0, str(ROOT))
+    return importlib.import_module("hash_generator")
+
+
+@pytest.fixture(autouse=True)
+def engine_settings(hg):
+    """Every test starts from the default engine settings, with the digest cache off."""
+    saved = dict(hg.ENGINE_SETTINGS)
+    hg.ENGINE_SETTINGS['cache'] = False
+    yield hg.ENGINE_SETTINGS
+    hg.ENGINE_SETTINGS.clear()
+    hg.ENGINE_SETTINGS.update(saved)
+
+
+@pytest.fixture(autouse=True)
+def logs_dir(hg, tmp_path, monkeypatch):
+    """Everything kept under logs/ (audit log, digest cache, journals, settings) goes to tmp_path/logs instead."""
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    hg.close_audit_sink()
+    hg.close_digest_cache()
+    for name, value in list(vars(hg).items()):
+        if isinstance(value, Path) and value.parts[:1] == ("logs",):
+            monkeypatch.setattr(hg, name, logs.joinpath(*value.parts[1:]))
+    yield logs
+    hg.close_audit_sink()
+    hg.close_digest_cache()
+
+
+@pytest.fixture
+def make_file(tmp_path):
+    def make(rel, data=b""):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return str(path)
+    return make
@@ -0,0 +1,70 @@
+import hashlib
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+MEMBERS = {"a.txt": b"alpha", "dir/big.bin": os.urandom(700_000), "empty": b""}
+
+
+@pytest.fixture(params=["bundle.zip", "bundle.tar.gz"])
+def archive(request, tmp_path):
+    path = tmp_path / request.param
+    if request.param.endswith(".zip"):
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in MEMBERS.items():
+                zf.writestr(name, data)
+    else:
+        with tarfile.open(path, "w:gz") as tf:
+            for name, data in MEMBERS.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tf.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+def _sample(hg, tmp_path, data):
+    path = tmp_path / "extracted"
+    path.write_bytes(data)
+    return hg.sample_digest(str(path))
+
+
+@pytest.mark.parametrize("size", [0, 10, 64 * 1024, 8 * 64 * 1024 + 1, 3_000_001])
+@pytest.mark.parametrize("chunk", [1000, 64 * 1024, 1 << 20])
+def test_sample_hasher_matches_sample_digest(hg, tmp_path, size, chunk):
+    data = os.urandom(size)
+    h = hg.SampleHasher(size)
+    for i in range(0, size, chunk):
+        h.update(data[i:i + chunk])
+    assert h.hexdigest() == _sample(hg, tmp_path, data)
+
+
+def test_members_are_hashed_with_the_fingerprint(hg, archive, tmp_path):
+    res = hg.hash_archive_task((archive, ["SHA256", hg.FINGERPRINT_ALGO]))
+    got = {r['path'].rpartition(hg.ARCHIVE_SEP)[2]: r for r in res}
+    assert sorted(got) == sorted(MEMBERS)
+    for name, data in MEMBERS.items():
+        assert got[name]['size'] == len(data)
+        assert got[name]['digests']["SHA256"] == hashlib.sha256(data).hexdigest()
+        assert got[name]['digests'][hg.FINGERPRINT_ALGO] == _sample(hg, tmp_path, data)
+
+
+def test_verify_archive(hg, archive):
+    expected = {name: ({"MD5": hashlib.md5(data).hexdigest()}, len(data)) for name, data in MEMBERS.items()}
+    expected["gone.txt"] = ({"MD5": "00" * 16}, None)
+    expected["a.txt"] = ({"MD5": hashlib.md5(b"other").hexdigest()}, None)
+    del expected["empty"]
+    status = {name: s for name, s, _ in hg.verify_archive(archive, expected)}
+    assert status == {"a.txt": "MISMATCH", "dir/big.bin": "OK", "empty": "EXTRA", "gone.txt": "MISSING"}
+
+
+def test_cli_fingerprint_of_archive_members(hg, archive, tmp_path, capsys):
+    assert hg.cli_main(["batch", archive, "--archives", "-a", hg.FINGERPRINT_ALGO, "--mode", "threads"]) == hg.EXIT_OK
+    assert _sample(hg, tmp_path, MEMBERS["dir/big.bin"]) in capsys.readouterr().out
+
+    manifest = str(tmp_path / "m.jsonl")
+    folder = os.path.dirname(archive)
+    assert hg.cli_main(["manifest", "create", folder, "-o", manifest, "--archives", "-a", hg.FINGERPRINT_ALGO, "--mode", "threads"]) == hg.EXIT_OK
+    assert hg.cli_main(["manifest", "verify", manifest, "--mode", "threads", "--no-extra"]) == hg.EXIT_OK
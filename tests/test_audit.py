@@ -0,0 +1,52 @@
+import csv
+import json
+
+import pytest
+
+
+@pytest.fixture
+def audit_files(hg, tmp_path, monkeypatch):
+    """Audit backends writing under tmp_path; the shared sink is closed before and after."""
+    hg.close_audit_sink()
+    monkeypatch.setattr(hg, "AUDIT_CSV", tmp_path / "audit.csv")
+    monkeypatch.setattr(hg, "AUDIT_JSONL", tmp_path / "audit.jsonl")
+    yield tmp_path
+    hg.close_audit_sink()
+
+
+@pytest.mark.parametrize("backend", ["csv", "jsonl"])
+def test_odd_values_are_normalised(hg, audit_files, engine_settings, backend):
+    engine_settings['audit_backend'] = backend
+    hg.pending_background_errors()
+    hg.append_audit("SHA256", "a\nb.txt", "file", "12", "caché", "abc")
+    hg.append_audit("MD5", "c.txt", "file", None, 0.25, None)
+    hg.append_audit("MD5", "d.txt", "file", 3, 1, "def")
+    hg.close_audit_sink()
+    assert hg.pending_background_errors() == []
+    if backend == "csv":
+        with open(audit_files / "audit.csv", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert [(r['path_or_text'], r['size_bytes'], r['duration']) for r in rows] == [
+            ("a b.txt", "12", ""), ("c.txt", "", "0.250000"), ("d.txt", "3", "1.000000")]
+    else:
+        with open(audit_files / "audit.jsonl", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        assert [(r['size_bytes'], r['duration'], r['hash']) for r in rows] == [(12, None, "abc"), (None, 0.25, ""), (3, 1.0, "def")]
+
+
+def test_write_failures_are_reported(hg, audit_files, monkeypatch, engine_settings):
+    blocked = audit_files / "blocked"
+    blocked.mkdir()
+    monkeypatch.setattr(hg, "AUDIT_CSV", blocked)  # a directory can't be opened for appending
+    hg.pending_background_errors()
+    hg.append_audit("SHA256", "a.txt", "file", 1, 0.1, "abc")
+    hg.close_audit_sink()
+    errors = hg.pending_background_errors()
+    assert len(errors) == 1 and "1 entradas" in errors[0]
+
+
+def test_history(hg, audit_files, engine_settings):
+    hg.append_audit("SHA256", "x.bin", "file", 1, 0.1, "one")
+    hg.append_audit("SHA256", "y.bin", "file", 1, 0.1, "other")
+    hg.append_audit("SHA256", "x.bin", "file", 1, 0.1, "two")
+    assert [r['hash'] for r in hg.audit_history("x.bin")] == ["one", "two"]
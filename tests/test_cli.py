@@ -0,0 +1,99 @@
+import hashlib
+
+import pytest
+
+
+@pytest.fixture
+def tree(tmp_path, make_file):
+    make_file("data/a.txt", b"alpha")
+    make_file("data/sub/b.txt", b"bravo")
+    return tmp_path / "data"
+
+
+def run(hg, *argv):
+    return hg.cli_main([str(a) for a in argv])
+
+
+def test_hash(hg, make_file, capsys):
+    path = make_file("a.txt", b"hello")
+    assert run(hg, "hash", path, "--algos", "MD5") == hg.EXIT_OK
+    out = capsys.readouterr().out
+    assert hashlib.sha256(b"hello").hexdigest() in out
+    assert hashlib.md5(b"hello").hexdigest() in out
+
+
+def test_hash_missing_file(hg, tmp_path):
+    assert run(hg, "hash", tmp_path / "nope") == hg.EXIT_ERROR
+
+
+def test_unknown_algorithm(hg, make_file, capsys):
+    assert run(hg, "hash", make_file("a.txt"), "-a", "NOPE") == hg.EXIT_ERROR
+    assert "no soportado" in capsys.readouterr().err
+
+
+def test_parser_builds_only_the_chosen_command(hg, capsys):
+    sub = next(a for a in hg.build_cli_parser("compare")._actions if a.dest == 'command')
+    assert list(sub.choices) == ["compare"]
+    full = next(a for a in hg.build_cli_parser()._actions if a.dest == 'command')
+    assert sub.metavar == "{" + ",".join(full.choices) + "}"  # the usage line still lists them all
+    for argv in (["nope"], ["compare", "a", "b", "--bogus"]):
+        with pytest.raises(SystemExit):
+            run(hg, *argv)
+        assert "{hash,batch,manifest," in capsys.readouterr().err
+
+
+def test_compare(hg, make_file):
+    a, b, c = make_file("a", b"same"), make_file("b", b"same"), make_file("c", b"diff")
+    assert run(hg, "compare", a, b) == hg.EXIT_OK
+    assert run(hg, "compare", a, c) == hg.EXIT_DIFF
+    assert run(hg, "compare", a, hashlib.sha256(b"same").hexdigest()) == hg.EXIT_OK
+    assert run(hg, "compare", a, "not-a-file") == hg.EXIT_ERROR
+
+
+def test_manifest_verify_exit_codes(hg, tree, tmp_path):
+    manifest = tmp_path / "m.jsonl"
+    assert run(hg, "manifest", "create", tree, "-o", manifest, "--mode", "threads") == hg.EXIT_OK
+    assert run(hg, "manifest", "verify", manifest, "--mode", "threads") == hg.EXIT_OK
+    (tree / "sub" / "b.txt").write_bytes(b"BRAVO")  # same size, different content
+    assert run(hg, "manifest", "verify", manifest, "--mode", "threads") == hg.EXIT_DIFF
+    (tree / "new.txt").write_bytes(b"extra")
+    assert run(hg, "manifest", "verify", manifest, "--mode", "threads", "--no-extra") == hg.EXIT_DIFF
+
+
+def test_manifest_verify_read_errors_fail(hg, tree, tmp_path, monkeypatch, capsys):
+    manifest = tmp_path / "m.jsonl"
+    assert run(hg, "manifest", "create", tree, "-o", manifest, "--mode", "threads") == hg.EXIT_OK
+    real = hg.compute_hashes_file_sync
+
+    def flaky(path, *a, **kw):
+        if path.endswith("b.txt"):
+            raise OSError(5, "Input/output error", path)  # the full-hash read fails; stat and sampling passed
+        return real(path, *a, **kw)
+    monkeypatch.setattr(hg, "compute_hashes_file_sync", flaky)
+    capsys.readouterr()
+    assert run(hg, "manifest", "verify", manifest, "--mode", "threads") == hg.EXIT_ERROR
+    out, err = capsys.readouterr()
+    assert "b.txt - ERROR [Errno 5] Input/output error" in out
+    assert "MISMATCH" not in out
+    assert "Encontradas 0 discrepancias; 1 archivos sin verificar" in err
+
+
+def test_manifest_diff_exit_codes(hg, tree, tmp_path):
+    old, new = tmp_path / "old.jsonl", tmp_path / "new.jsonl"
+    assert run(hg, "manifest", "create", tree, "-o", old, "--mode", "threads") == hg.EXIT_OK
+    assert run(hg, "manifest", "diff", old, old) == hg.EXIT_OK
+    (tree / "a.txt").write_bytes(b"changed")
+    assert run(hg, "manifest", "create", tree, "-o", new, "--mode", "threads") == hg.EXIT_OK
+    assert run(hg, "manifest", "diff", old, new) == hg.EXIT_DIFF
+
+
+def test_batch_missing_file(hg, make_file, tmp_path):
+    ok = make_file("a.txt", b"x")
+    assert run(hg, "batch", ok, "--mode", "threads") == hg.EXIT_OK
+    assert run(hg, "batch", ok, tmp_path / "missing", "--mode", "threads") == hg.EXIT_ERROR
+
+
+def test_algorithms_lists_the_registry(hg, capsys):
+    assert run(hg, "algorithms") == hg.EXIT_OK
+    out = capsys.readouterr().out
+    assert "SHA256" in out and "CRC32C" in out
@@ -0,0 +1,92 @@
+import hashlib
+import os
+
+import pytest
+
+CHUNK = 1000
+
+
+@pytest.fixture
+def pair(make_file, engine_settings):
+    """Two 10-chunk files that differ at bytes 2500-2502 and 7000."""
+    engine_settings['chunk_size'] = CHUNK
+    data = os.urandom(10 * CHUNK)
+    other = bytearray(data)
+    for i in (2500, 2501, 2502, 7000):
+        other[i] ^= 0xFF
+    return make_file("a.bin", data), make_file("b.bin", bytes(other)), data, bytes(other)
+
+
+def test_stops_at_the_first_differing_byte(hg, pair):
+    a, b, _, _ = pair
+    res = hg.compare_files_engine(a, b)
+    assert (res['equal'], res['reason'], res['first_diff']) == (False, "bytes", 2500)
+    assert res['compared'] == 3 * CHUNK  # the chunk holding the difference, not the rest
+    assert res['diff_bytes'] == 3
+    assert res['digest_a'] is res['digest_b'] is None  # a partial digest would be wrong, so none
+    assert hg.format_compare_result(res, "SHA256") == "DISTINTO desde el byte 2500 (3 bytes distintos en los primeros 3000 comparados)"
+
+
+def test_count_all_reads_both_files_whole(hg, pair):
+    a, b, data, other = pair
+    res = hg.compare_files_engine(a, b, "MD5", count_all=True)
+    assert (res['first_diff'], res['diff_bytes'], res['compared']) == (2500, 4, 10 * CHUNK)
+    assert res['digest_a'] == hashlib.md5(data).hexdigest()
+    assert res['digest_b'] == hashlib.md5(other).hexdigest()
+
+
+@pytest.mark.parametrize("offset", [0, 999, 1000, 9999])
+def test_first_diff_at_chunk_edges(hg, make_file, engine_settings, offset):
+    engine_settings['chunk_size'] = CHUNK
+    data = os.urandom(10 * CHUNK)
+    other = bytearray(data)
+    other[offset] ^= 1
+    res = hg.compare_files_engine(make_file("a", data), make_file("b", bytes(other)), count_all=True)
+    assert (res['first_diff'], res['diff_bytes']) == (offset, 1)
+
+
+@pytest.mark.parametrize("method", ["bytes", "hash"])
+def test_equal_files(hg, make_file, method):
+    data = os.urandom(5_000)
+    res = hg.compare_files_engine(make_file("a", data), make_file("b", data), method=method)
+    assert res['equal'] and res['reason'] == method
+    assert res['digest_a'] == res['digest_b'] == hashlib.sha256(data).hexdigest()
+
+
+def test_empty_files(hg, make_file):
+    a, b = make_file("a"), make_file("b")
+    res = hg.compare_files_engine(a, b)
+    assert res['equal'] and (res['first_diff'], res['diff_bytes'], res['compared']) == (None, 0, 0)
+    assert res['digest_a'] == hashlib.sha256(b"").hexdigest()
+    assert hg.compare_files_engine(a, make_file("c", b"x"))['reason'] == "size"
+
+
+def test_different_sizes_are_not_read(hg, make_file, monkeypatch):
+    monkeypatch.setattr(hg, "_pread", lambda *a: pytest.fail("file content read"))
+    res = hg.compare_files_engine(make_file("a", b"abc"), make_file("b", b"abcd"))
+    assert (res['equal'], res['reason'], res['size_a'], res['size_b']) == (False, "size", 3, 4)
+    assert hg.format_compare_result(res, "SHA256") == "DISTINTO tamaño: A=3 bytes, B=4 bytes (sin leer los archivos)"
+
+
+def test_hash_method_has_no_offset(hg, pair):
+    a, b, data, other = pair
+    res = hg.compare_files_engine(a, b, method="hash")
+    assert (res['equal'], res['first_diff'], res['diff_bytes']) == (False, None, None)
+    assert (res['digest_a'], res['digest_b']) == (hashlib.sha256(data).hexdigest(), hashlib.sha256(other).hexdigest())
+
+
+def test_sample_method(hg, make_file):
+    data = os.urandom(100_000)
+    a, b = make_file("a", data), make_file("b", data)
+    res = hg.compare_files_engine(a, b, method="sample")
+    assert res['equal'] and res['digest_a'] == hg.sample_digest(a)
+    assert hg.format_compare_result(res, "SHA256").startswith("PROBABLEMENTE IGUALES")
+    with open(b, "r+b") as f:
+        f.write(b"\0" if data[0] else b"\1")  # the first block is always sampled
+    res = hg.compare_files_engine(a, b, hg.FINGERPRINT_ALGO)  # the fingerprint forces the sample method
+    assert (res['equal'], res['reason']) == (False, "sample")
+
+
+def test_unknown_method(hg, make_file):
+    with pytest.raises(Exception, match="no soportado"):
+        hg.compare_files_engine(make_file("a"), make_file("b"), method="nope")
@@ -0,0 +1,76 @@
+import hashlib
+import os
+
+import pytest
+
+EDGE = 100
+
+
+@pytest.fixture
+def tree(hg, tmp_path, make_file, monkeypatch):
+    """Files of up to 2*EDGE bytes settle in stage 2; bigger ones need the full hash of stage 3."""
+    monkeypatch.setattr(hg, "DEDUPE_EDGE", EDGE)
+    small = b"s" * 50
+    make_file("root/a/small", small)
+    make_file("root/b/small copy", small)
+    os.link(tmp_path / "root/a/small", tmp_path / "root/a/small hardlink")  # same inode: not a duplicate
+    make_file("root/unique", b"u" * 77)  # no other file of this size
+    make_file("root/d1", b"1" * 60)  # same size, different content
+    make_file("root/d2", b"2" * 60)
+    big = b"H" * EDGE + os.urandom(800) + b"T" * EDGE
+    make_file("root/big1", big)
+    make_file("root/sub/big2", big)
+    make_file("root/big other middle", big[:EDGE] + os.urandom(800) + big[-EDGE:])  # same partial digest
+    make_file("root/empty1")
+    make_file("root/empty2")
+    make_file("root/skip/big3", big)  # pruned by the exclude
+    return str(tmp_path / "root"), big
+
+
+def _run(hg, folder, **kw):
+    job = hg.DedupeJob([folder], "SHA256", options=hg.WalkOptions(exclude=["skip"]), **kw)
+    collector = hg.DuplicateCollector("SHA256")
+    assert not hg.run_job_blocking(job, collector.feed)
+    assert collector.errors == []
+    return collector
+
+
+def test_duplicate_groups(hg, tree):
+    folder, big = tree
+    groups = _run(hg, folder).groups()
+    rel = [[os.path.relpath(p, folder) for p in g['paths']] for g in groups]
+    assert rel[0] == ["big1", os.path.join("sub", "big2")]
+    assert rel[1] in ([os.path.join("a", name), os.path.join("b", "small copy")] for name in ("small", "small hardlink"))  # one link of the inode
+    assert groups[0]['hash'] == hashlib.sha256(big).hexdigest()
+    assert groups[1]['hash'] == hashlib.sha256(b"s" * 50).hexdigest()  # small files: the partial digest is the full one
+    assert [g['reclaimable'] for g in groups] == [len(big), 50]
+
+
+def test_stage_counters(hg, tree):
+    folder, big = tree
+    stats = _run(hg, folder).stats
+    assert stats == {
+        'files': 9, 'bytes': 3 * 50 + 77 + 2 * 60 + 3 * len(big),  # empty files and the excluded folder aren't counted
+        'partial_files': 7, 'partial_bytes': 2 * 50 + 2 * 60 + 3 * 2 * EDGE,  # unique size dropped, hard link collapsed
+        'full_files': 3, 'full_bytes': 3 * len(big)}  # only the big files with equal edges
+    assert hg.format_dedupe_stats(stats) == (
+        f"Recorridos: 9 archivos ({hg.format_bytes(stats['bytes'])}); hash parcial 7 ({hg.format_bytes(stats['partial_bytes'])}); "
+        f"hash completo 3 ({hg.format_bytes(stats['full_bytes'])})")
+
+
+def test_small_groups_settle_without_a_full_hash(hg, tree, monkeypatch):
+    folder, _ = tree
+    hashed = []
+    real = hg.hash_file_task
+
+    def spy(arg, *a, **kw):
+        hashed.append(os.path.basename(arg[0]))
+        return real(arg, *a, **kw)
+    monkeypatch.setattr(hg, "hash_file_task", spy)
+    _run(hg, folder)
+    assert sorted(hashed) == ["big other middle", "big1", "big2"]
+
+
+def test_fingerprint_is_refused(hg):
+    with pytest.raises(Exception, match="no sirve"):
+        hg.DedupeJob(["."], hg.FINGERPRINT_ALGO)
@@ -0,0 +1,78 @@
+import contextlib
+import os
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def cache(hg, tmp_path, monkeypatch, engine_settings):
+    """A fresh DigestCache installed as this process's cache."""
+    c = hg.DigestCache(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(hg, "_digest_cache", c)
+    monkeypatch.setattr(hg, "_digest_cache_pid", os.getpid())
+    engine_settings['cache'] = True
+    yield c
+    with contextlib.suppress(sqlite3.ProgrammingError):  # already closed by the test
+        c.close()
+
+
+def test_second_pass_is_served_from_the_cache(hg, cache, make_file):
+    path = make_file("a.bin", b"payload" * 1000)
+    first, second = {}, {}
+    d1, _, _ = hg.compute_hashes_file_sync(path, ["SHA256", "MD5"], stats=first)
+    d2, _, _ = hg.compute_hashes_file_sync(path, ["SHA256", "MD5"], stats=second)
+    assert first['cached'] == []
+    assert sorted(second['cached']) == ["MD5", "SHA256"]
+    assert d1 == d2
+
+
+def test_changed_file_misses(hg, cache, make_file):
+    path = make_file("a.bin", b"one")
+    hg.compute_hashes_file_sync(path, ["SHA256"])
+    with open(path, "ab") as f:
+        f.write(b"two")
+    stats = {}
+    digests, _, _ = hg.compute_hashes_file_sync(path, ["SHA256"], stats=stats)
+    assert stats['cached'] == []
+    assert digests["SHA256"] == hg.hashlib.sha256(b"onetwo").hexdigest()
+
+
+def test_writes_are_committed_in_batches(hg, tmp_path, make_file):
+    db = tmp_path / "batch.sqlite3"
+    st = os.stat(make_file("a", b"x"))
+    cache = hg.DigestCache(db)
+    commits = []
+    cache._conn.set_trace_callback(lambda sql: commits.append(sql) if sql.strip().upper().startswith("COMMIT") else None)
+    n = hg.DIGEST_CACHE_FLUSH_ROWS * 2
+    for i in range(n):
+        cache.put(st, f"ALG{i}", f"{i:08x}")
+    for i in range(n):
+        assert cache.get(st, f"ALG{i}") == f"{i:08x}"
+    assert 1 <= len(commits) <= 6  # not one per put / hit
+    cache.close()
+    reopened = hg.DigestCache(db)
+    assert reopened.stats()['entries'] == n
+    reopened.close()
+
+
+def test_pending_writes_are_visible_before_the_commit(hg, tmp_path, make_file):
+    st = os.stat(make_file("a", b"x"))
+    cache = hg.DigestCache(tmp_path / "c.sqlite3")
+    cache.put(st, "SHA256", "abc")
+    assert cache.get(st, "SHA256") == "abc"
+    assert cache.stats() == {'hits': 1, 'misses': 0, 'entries': 1}
+    cache.close()
+
+
+def test_unusable_database_is_reported(hg, monkeypatch, engine_settings):
+    def broken(*a, **kw):
+        raise sqlite3.OperationalError("unable to open database file")
+    monkeypatch.setattr(hg, "DigestCache", broken)
+    monkeypatch.setattr(hg, "_digest_cache", None)
+    hg.pending_background_errors()
+    engine_settings['cache'] = True
+    assert hg.get_digest_cache() is None
+    assert engine_settings['cache'] is False
+    errors = hg.pending_background_errors()
+    assert len(errors) == 1 and "unable to open database file" in errors[0]
@@ -0,0 +1,86 @@
+import csv
+import gzip
+import io
+import json
+import lzma
+
+import pytest
+
+ROWS = [
+    {'file': "/data/año, 1.txt", 'size': "12", 'hash': "ab" * 32, 'duration': "0.250", 'algorithm': "SHA256", 'known': ""},
+    {'file': "/data/\"q\".bin", 'size': "0", 'hash': "cd" * 32, 'duration': "caché", 'algorithm': "SHA256", 'known': "KNOWN (nsrl)"},
+    {'file': "/data/c", 'size': "7", 'hash': "ef" * 16, 'duration': "1.5", 'algorithm': "MD5", 'known': ""},
+]
+OPENERS = {"": open, ".gz": gzip.open, ".xz": lzma.open}
+
+
+def _read(path, comp):
+    with OPENERS[comp](path, "rt", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def _export(hg, path, rows, kind=None):
+    with hg.BatchExportWriter(str(path), kind, algo_declared="SHA256") as w:
+        for row in rows:
+            w.write(row)
+    return w
+
+
+@pytest.mark.parametrize("comp", ["", ".gz", ".xz"])
+@pytest.mark.parametrize("kind", ["txt", "csv", "json", "jsonl"])
+def test_round_trip(hg, tmp_path, kind, comp):
+    path = tmp_path / f"out.{kind}{comp}"
+    assert hg.batch_export_kind(str(path)) == kind
+    assert _export(hg, path, ROWS).count == 3
+    text = _read(path, comp)
+    if kind == "csv":
+        assert list(csv.DictReader(io.StringIO(text))) == ROWS
+    elif kind == "json":
+        assert json.loads(text) == ROWS
+    elif kind == "jsonl":
+        records = [json.loads(line) for line in text.splitlines()]
+        assert records[:-1] == ROWS
+        summary = records[-1]
+        assert summary['format'] == hg.BATCH_SUMMARY_FORMAT
+        assert (summary['items'], summary['total_duration'], summary['algorithm']) == (3, 1.75, "SHA256")  # "caché" isn't a duration
+    else:
+        assert [line[6:] for line in text.splitlines() if line.startswith("Hash: ")] == [r['hash'] for r in ROWS]
+        assert "Archivo: año, 1.txt\n" in text and "Conjunto de hashes: KNOWN (nsrl)\n" in text
+        assert text.endswith("# Elementos: 3\n# Duración total (sumada cuando disponible): 1.750000 segundos\n")
+
+
+@pytest.mark.parametrize("kind,expected", [("json", []), ("csv", []), ("jsonl", None)])
+def test_empty_export(hg, tmp_path, kind, expected):
+    path = tmp_path / f"out.{kind}"
+    _export(hg, path, [])
+    text = path.read_text(encoding="utf-8")
+    if kind == "json":
+        assert text == "[]"
+    elif kind == "csv":
+        assert text.strip() == ",".join(hg.BATCH_EXPORT_FIELDS)
+    else:
+        assert json.loads(text)['items'] == 0
+
+
+def test_kind_overrides_the_name(hg, tmp_path):
+    path = tmp_path / "out.dat"
+    assert hg.batch_export_kind(str(path)) is None
+    _export(hg, path, ROWS[:1], "json")
+    assert json.loads(path.read_text(encoding="utf-8")) == ROWS[:1]
+
+
+@pytest.mark.parametrize("kind", ["txt", "json", "jsonl"])
+def test_failed_export_has_no_trailer(hg, tmp_path, kind):
+    path = tmp_path / f"out.{kind}"
+
+    def rows():
+        yield ROWS[0]
+        raise OSError("disk gone")
+    with pytest.raises(OSError):
+        _export(hg, path, rows())
+    text = path.read_text(encoding="utf-8")
+    assert ROWS[0]['hash'] in text
+    assert "# Elementos" not in text and not text.endswith("]") and hg.BATCH_SUMMARY_FORMAT not in text
+    if kind == "json":
+        with pytest.raises(ValueError):
+            json.loads(text)
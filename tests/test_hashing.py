@@ -0,0 +1,86 @@
+import hashlib
+import zlib
+
+import pytest
+
+
+def test_several_digests_from_one_pass(hg, make_file):
+    data = bytes(range(256)) * 40000  # ~10 MB: several reads at the default chunk size
+    path = make_file("a.bin", data)
+    digests, timings, duration = hg.compute_hashes_file_sync(path, ["MD5", "SHA256", "CRC32", "Adler32"])
+    assert digests == {
+        "MD5": hashlib.md5(data).hexdigest(),
+        "SHA256": hashlib.sha256(data).hexdigest(),
+        "CRC32": format(zlib.crc32(data), "08x"),
+        "Adler32": format(zlib.adler32(data), "08x"),
+    }
+    assert set(timings) == set(digests)
+    assert duration >= 0
+
+
+def test_small_chunks_give_the_same_digests(hg, make_file, engine_settings):
+    data = b"x" * 100_001
+    path = make_file("a.bin", data)
+    engine_settings['chunk_size'] = 4096
+    for backend in ("read", "readinto", "mmap", "readahead"):
+        digests, _, _ = hg.compute_hashes_file_sync(path, ["SHA1", "BLAKE2b"], io_backend=backend)
+        assert digests == {"SHA1": hashlib.sha1(data).hexdigest(), "BLAKE2b": hashlib.blake2b(data).hexdigest()}, backend
+
+
+def test_empty_file(hg, make_file):
+    path = make_file("empty", b"")
+    digests, _, _ = hg.compute_hashes_file_sync(path, ["SHA256"])
+    assert digests["SHA256"] == hashlib.sha256(b"").hexdigest()
+
+
+def test_duplicate_algorithms_are_hashed_once(hg, make_file):
+    path = make_file("a.txt", b"abc")
+    digests, timings, _ = hg.compute_hashes_file_sync(path, ["MD5", "MD5", "SHA1"])
+    assert list(digests) == ["MD5", "SHA1"]
+    assert list(timings) == ["MD5", "SHA1"]
+
+
+def test_no_algorithm_is_an_error(hg, make_file):
+    path = make_file("a.txt", b"abc")
+    with pytest.raises(Exception):
+        hg.compute_hashes_file_sync(path, [])
+
+
+def test_unknown_algorithm_is_an_error(hg, make_file):
+    path = make_file("a.txt", b"abc")
+    with pytest.raises(Exception, match="no soportado"):
+        hg.compute_hashes_file_sync(path, ["NOPE"])
+
+
+def test_single_digest_wrapper(hg, make_file):
+    path = make_file("a.txt", b"hello")
+    digest, duration = hg.compute_hash_file_sync(path, "SHA256")
+    assert digest == hashlib.sha256(b"hello").hexdigest()
+    assert duration >= 0
+
+
+def test_crc32c_check_value(hg, make_file):
+    path = make_file("check", b"123456789")
+    assert hg.compute_hashes_file_sync(path, ["CRC32C"])[0]["CRC32C"] == "e3069283"
+
+
+def test_progress_callbacks(hg, make_file, engine_settings):
+    engine_settings['chunk_size'] = 64 * 1024
+    path = make_file("big.bin", b"z" * (1024 * 1024))
+    pcts, snaps = [], []
+    hg.compute_hashes_file_sync(path, ["SHA256"], progress_cb=pcts.append, progress_snapshot_cb=snaps.append)
+    assert pcts and all(isinstance(p, int) for p in pcts)
+    assert pcts[-1] == 100
+    assert snaps[-1]['done'] == snaps[-1]['total'] == 1024 * 1024
+    pcts.clear()
+    hg.compute_hash_file_sync(path, "MD5", pcts.append)
+    assert pcts[-1] == 100
+
+
+def test_progress_callback_errors_are_not_hidden(hg, make_file):
+    path = make_file("a.bin", b"abc")
+
+    def broken(pct):
+        raise RuntimeError("callback bug")
+    with pytest.raises(RuntimeError, match="callback bug"):
+        hg.compute_hash_file_sync(path, "SHA256", broken)
@@ -0,0 +1,64 @@
+import hashlib
+import os
+
+import pytest
+
+DIGESTS = sorted(hashlib.sha256(str(i).encode()).hexdigest() for i in range(500))
+
+
+@pytest.fixture
+def digest_list(tmp_path):
+    path = tmp_path / "list.sha256"
+    lines = [f"{h}  file{i}" for i, h in enumerate(DIGESTS)] + [DIGESTS[0].upper() + " *dup", "no digest here"]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("bloom", [False, True])
+def test_lookups(hg, tmp_path, digest_list, bloom):
+    out = str(tmp_path / "known.hashset")
+    header = hg.build_hashset([digest_list], out, "SHA256", bloom=bloom)
+    assert header['count'] == len(DIGESTS)
+    assert header['invalid'] == 0
+    assert bool(header['bloom_bits']) == bloom
+    with hg.HashSetIndex(out) as ix:
+        assert len(ix) == len(DIGESTS)
+        assert ix.label == "known"
+        assert all(h in ix for h in DIGESTS)
+        assert DIGESTS[3].upper() in ix
+        assert hashlib.sha256(b"other").hexdigest() not in ix
+        assert "zz" * 32 not in ix
+        assert DIGESTS[0][:-2] not in ix  # wrong width
+        assert hg.hashset_status([ix], {"SHA256": DIGESTS[7]}) == "KNOWN (known)"
+        assert hg.hashset_status([ix], {"MD5": DIGESTS[7][:32]}) == "UNKNOWN"
+    assert not os.path.exists(out + ".tmp")
+
+
+def test_bad_manifest_digests_are_skipped_and_counted(hg, tmp_path):
+    manifest = str(tmp_path / "m.jsonl")
+    good = hashlib.sha256(b"good").hexdigest()
+    with hg.ManifestWriter(manifest, "SHA256", "/base", ["SHA256"]) as w:
+        w.write({'path': "good", 'hash': good, 'size': 4, 'algorithm': "SHA256"})
+        w.write({'path': "short", 'hash': good[:-1], 'size': 4, 'algorithm': "SHA256"})
+        w.write({'path': "not-hex", 'hash': "x" * 64, 'size': 4, 'algorithm': "SHA256"})
+    out = str(tmp_path / "m.hashset")
+    header = hg.build_hashset([manifest], out, "SHA256")
+    assert (header['count'], header['invalid']) == (1, 2)
+    with hg.HashSetIndex(out) as ix:
+        assert good in ix
+
+
+def test_long_label_fails_without_leaving_files(hg, tmp_path, digest_list):
+    out = str(tmp_path / "known.hashset")
+    with pytest.raises(Exception, match="demasiado larga"):
+        hg.build_hashset([digest_list], out, "SHA256", label="x" * hg.HASHSET_HEADER_SIZE)
+    assert not [n for n in os.listdir(tmp_path) if n.startswith("known")]
+
+
+def test_failed_source_leaves_no_tmp(hg, tmp_path, digest_list):
+    out = str(tmp_path / "known.hashset")
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text('{"format": "x"}\n{broken\n{"path": "a"}\n')
+    with pytest.raises(Exception):
+        hg.build_hashset([digest_list, str(bad)], out, "SHA256")
+    assert not os.path.exists(out) and not os.path.exists(out + ".tmp")
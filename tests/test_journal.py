@@ -0,0 +1,97 @@
+import functools
+import os
+
+import pytest
+
+
+@pytest.fixture
+def files(make_file):
+    return [make_file(f"f{i}.txt", f"content {i}".encode()) for i in range(4)]
+
+
+def _record(hg, path, algos):
+    return hg.batch_journal_record(hg.hash_file_task((path, algos)))
+
+
+def test_resume_keeps_unchanged_finished_files(hg, tmp_path, files):
+    journal = str(tmp_path / "batch.journal")
+    algos = ["SHA256", "MD5"]
+    with hg.JobJournal(journal, {'kind': 'batch', 'algorithms': algos}) as j:
+        for p in files[:3]:
+            j.write(_record(hg, p, algos))
+    with open(files[1], "ab") as f:
+        f.write(b" changed since")  # its record no longer applies
+    header, done = hg.load_batch_journal(journal, algos)
+    assert header['algorithms'] == algos
+    assert sorted(done) == sorted([files[0], files[2]])
+    assert done[files[0]]['digests']["MD5"] == hg.hashlib.md5(b"content 0").hexdigest()
+
+
+def test_resume_needs_the_same_algorithms(hg, tmp_path, files):
+    journal = str(tmp_path / "batch.journal")
+    with hg.JobJournal(journal, {'kind': 'batch', 'algorithms': ["SHA256"]}) as j:
+        j.write(_record(hg, files[0], ["SHA256"]))
+    assert hg.load_batch_journal(journal, ["MD5"])[1] == {}
+    assert list(hg.load_batch_journal(journal)[1]) == [files[0]]
+
+
+def test_finished_journal_is_not_resumed(hg, tmp_path, files):
+    journal = str(tmp_path / "batch.journal")
+    j = hg.JobJournal(journal, {'kind': 'batch', 'algorithms': ["SHA256"]})
+    j.write(_record(hg, files[0], ["SHA256"]))
+    j.finish()
+    assert hg.load_batch_journal(journal) == (None, {})
+
+
+def test_torn_tail_and_appending_after_a_crash(hg, tmp_path, files):
+    journal = str(tmp_path / "batch.journal")
+    with hg.JobJournal(journal, {'kind': 'batch', 'algorithms': ["SHA256"]}) as j:
+        j.write(_record(hg, files[0], ["SHA256"]))
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"path": "half-writ')  # crash mid-write
+    with hg.JobJournal(journal) as j:  # reopened to append: the torn line is cut first
+        j.write(_record(hg, files[1], ["SHA256"]))
+    _, done = hg.load_batch_journal(journal)
+    assert sorted(done) == sorted(files[:2])
+
+
+def test_a_file_logged_twice_keeps_its_last_record(hg, tmp_path, files):
+    journal = str(tmp_path / "batch.journal")
+    rec = _record(hg, files[0], ["SHA256"])
+    with hg.JobJournal(journal, {'kind': 'batch', 'algorithms': ["SHA256"]}) as j:
+        j.write(dict(rec, timings={"SHA256": 1.0}))
+        j.write(dict(rec, timings={"SHA256": 2.0}))
+    assert hg.load_batch_journal(journal)[1][files[0]]['timings'] == {"SHA256": 2.0}
+
+
+def test_journal_records_keeps_the_last_record_per_path(hg, tmp_path, monkeypatch):
+    monkeypatch.setattr(hg, "external_sort", functools.partial(hg.external_sort, run_lines=2))  # spilled runs
+    journal = str(tmp_path / "m.journal")
+    paths = ["b", "a\tb", "ñ/\"x\"", "a", "a b"]
+    with hg.JobJournal(journal, {'kind': 'manifest'}) as j:
+        for n in range(3):
+            for p in paths[n:]:
+                j.write({'path': p, 'size': n})
+        j.write({'finished': True})
+    records = [(rec['path'], rec['size']) for rec in hg.journal_records(journal)]
+    assert sorted(records) == [("a", 2), ("a\tb", 1), ("a b", 2), ("b", 0), ("ñ/\"x\"", 2)]
+    assert list(hg.journal_records(str(tmp_path / "missing"))) == []
+
+
+def test_batch_file_list_round_trip(hg, tmp_path):
+    path = tmp_path / "batch.files"
+    items = [(f"/data/ñ {i}\tx.bin", i if i % 2 else None) for i in range(1000)]
+    assert hg.write_batch_file_list(path, iter(items)) == 1000
+    assert list(hg.read_batch_file_list(path)) == items
+    assert not os.path.exists(str(path) + ".tmp")
+
+
+def test_cli_batch_resumes_from_its_journal(hg, tmp_path, files, capsys):
+    journal = str(tmp_path / "cli.journal")
+    with hg.JobJournal(journal, {'kind': 'batch', 'algorithms': ["SHA256"]}) as j:  # interrupted run: no 'finished' mark
+        for p in files[:2]:
+            j.write(_record(hg, p, ["SHA256"]))
+    assert hg.cli_main(["batch", *files, "--journal", journal, "--mode", "threads"]) == hg.EXIT_OK
+    captured = capsys.readouterr()
+    assert "Reanudando: 2 archivos" in captured.err
+    assert all(hg.hashlib.sha256(f"content {i}".encode()).hexdigest() in captured.out for i in range(4))
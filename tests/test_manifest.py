@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def tree(tmp_path, make_file):
+    make_file("data/a.txt", b"alpha")
+    make_file("data/sub/b.txt", b"bravo")
+    make_file("data/sub/c.bin", os.urandom(10_000))
+    return str(tmp_path / "data")
+
+
+def test_unreadable_file_keeps_manifest_incomplete(hg, tree, tmp_path, monkeypatch, capsys):
+    out = str(tmp_path / "m.jsonl")
+    real = hg.compute_hashes_file_sync
+
+    def flaky(path, *a, **kw):
+        if path.endswith("b.txt"):
+            raise PermissionError(13, "Permission denied", path)
+        return real(path, *a, **kw)
+    monkeypatch.setattr(hg, "compute_hashes_file_sync", flaky)
+    rc = hg.cli_main(["manifest", "create", tree, "-o", out, "--mode", "threads", "--no-cache"])
+    assert rc == hg.EXIT_ERROR
+    assert "b.txt" in capsys.readouterr().err
+    _, entries = hg.open_manifest(out)
+    assert sorted(e['path'] for e in entries) == ["a.txt", os.path.join("sub", "c.bin")]
+    assert os.path.exists(out + hg.JOURNAL_SUFFIX)  # not marked complete
+
+    # the same command again only hashes the file that failed
+    monkeypatch.setattr(hg, "compute_hashes_file_sync", real)
+    rc = hg.cli_main(["manifest", "create", tree, "-o", out, "--mode", "threads", "--no-cache"])
+    assert rc == hg.EXIT_OK
+    assert "Reanudando: 2 archivos" in capsys.readouterr().err
+    _, entries = hg.open_manifest(out)
+    assert len(list(entries)) == 3
+    assert not os.path.exists(out + hg.JOURNAL_SUFFIX)
+
+
+ENTRIES = [
+    {'path': "a.txt", 'hash': "aa" * 32, 'size': 5, 'algorithm': "SHA256", 'mtime_ns': 1, 'sample': "11" * 16,
+     'hashes': {"SHA256": "aa" * 32, "MD5": "bb" * 16}},
+    {'path': "dir/ñ b.txt", 'hash': "cc" * 32, 'size': 7, 'algorithm': "SHA256", 'mtime_ns': 2, 'sample': "22" * 16,
+     'hashes': {"SHA256": "cc" * 32, "MD5": "dd" * 16}},
+]
+
+
+@pytest.mark.parametrize("name", ["m.jsonl", "m.jsonl.gz", "m.json", "m.csv", "m.txt"])
+def test_writer_round_trip(hg, tmp_path, name):
+    out = str(tmp_path / name)
+    with hg.ManifestWriter(out, "SHA256", "/base", ["SHA256", "MD5"]) as w:
+        for e in ENTRIES:
+            w.write(e)
+    assert w.count == 2
+    header, entries = hg.open_manifest(out)
+    entries = list(entries)
+    assert [hg.manifest_entry_path(e) for e in entries] == ["a.txt", "dir/ñ b.txt"]
+    assert [hg.entry_hashes(e).get("MD5") for e in entries] == ["bb" * 16, "dd" * 16]
+    assert [e['hash'] for e in entries] == ["aa" * 32, "cc" * 32]
+    if not name.endswith(".txt"):
+        assert header['algorithm'] == "SHA256"
+    if name.endswith((".jsonl", ".jsonl.gz", ".json")):
+        assert header['base_folder'] == "/base"
+        assert [int(e['size']) for e in entries] == [5, 7]
+
+
+def _write_jsonl(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(line + "\n" for line in lines))
+
+
+def test_torn_last_line_is_skipped(hg, tmp_path):
+    path = str(tmp_path / "m.jsonl")
+    _write_jsonl(path, ['{"path": "a"}', '{"path": "b"}', '{"path": "c", "ha'])
+    assert [r['path'] for r in hg._iter_jsonl(path)] == ["a", "b"]
+
+
+def test_torn_last_line_followed_by_blank_lines(hg, tmp_path):
+    path = str(tmp_path / "m.jsonl")
+    _write_jsonl(path, ['{"path": "a"}', '{"pa', '', ''])
+    assert [r['path'] for r in hg._iter_jsonl(path)] == ["a"]
+
+
+def test_corrupt_line_in_the_middle_raises(hg, tmp_path):
+    path = str(tmp_path / "m.jsonl")
+    _write_jsonl(path, ['{"path": "a"}', 'garbage', '{"path": "c"}'])
+    it = hg._iter_jsonl(path)
+    assert next(it)['path'] == "a"
+    with pytest.raises(Exception, match="línea 2"):
+        list(it)
+
+
+def test_truncated_gzip_keeps_what_was_flushed(hg, tmp_path):
+    out = str(tmp_path / "m.jsonl.gz")
+    with hg.ManifestWriter(out, "SHA256", "/base") as w:
+        for i in range(5000):
+            w.write({'path': f"f{i}", 'hash': f"{i:064x}", 'size': i, 'algorithm': "SHA256"})
+    data = open(out, "rb").read()
+    with open(out, "wb") as f:
+        f.write(data[:len(data) // 2])
+    _, entries = hg.open_manifest(out)
+    paths = [e['path'] for e in entries]
+    assert 0 < len(paths) < 5000
+    assert paths == [f"f{i}" for i in range(len(paths))]
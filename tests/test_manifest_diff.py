@@ -0,0 +1,56 @@
+import pytest
+
+
+def h(c, n=64):
+    return c * n
+
+
+OLD = {"a.txt": h("a"), "b/x.bin": h("b"), "c.txt": h("c"), "d.txt": h("d"), "same.txt": h("e")}
+NEW = {"a.txt": h("1"), "moved/x.bin": h("b"), "c.txt": h("c"), "copy.txt": h("c"), "e.txt": h("2"), "same.txt": h("e")}
+
+
+def write(hg, path, digests, algos=("SHA256",)):
+    with hg.ManifestWriter(str(path), algos[0], "/base", list(algos)) as w:
+        for rel, digest in digests.items():
+            w.write({'path': rel, 'hash': digest, 'size': 10, 'algorithm': algos[0],
+                     'hashes': {a: digest[:32] if a == "MD5" else digest for a in algos}})
+    return str(path)
+
+
+@pytest.mark.parametrize("old_name,new_name", [("old.jsonl", "new.jsonl"), ("old.csv", "new.jsonl.gz"), ("old.txt", "new.csv")])
+def test_statuses(hg, tmp_path, old_name, new_name):
+    old = write(hg, tmp_path / old_name, OLD)
+    new = write(hg, tmp_path / new_name, NEW)
+    stats = {}
+    changes = {rel: (status, info) for status, rel, info in hg.diff_manifests(old, new, stats=stats)}
+    assert {rel: s for rel, (s, _) in changes.items()} == {
+        "a.txt": "MODIFIED", "moved/x.bin": "MOVED", "copy.txt": "DUPLICATED", "e.txt": "ADDED", "d.txt": "REMOVED"}
+    assert changes["a.txt"][1]['old_hash'] == h("a") and changes["a.txt"][1]['new_hash'] == h("1")
+    assert changes["moved/x.bin"][1]['from'] == "b/x.bin"
+    assert changes["copy.txt"][1]['from'] == "c.txt"
+    assert stats == {'old': 5, 'new': 6, 'unchanged': 2}
+
+
+def test_identical_manifests(hg, tmp_path):
+    old = write(hg, tmp_path / "old.jsonl", OLD)
+    assert list(hg.diff_manifests(old, old)) == []
+
+
+def test_moves_pair_same_file_names_first(hg, tmp_path):
+    old = write(hg, tmp_path / "old.jsonl", {"r1/one.bin": h("f"), "r2/two.bin": h("f")})
+    new = write(hg, tmp_path / "new.jsonl", {"n/two.bin": h("f"), "n/one.bin": h("f")})
+    moves = {rel: info['from'] for status, rel, info in hg.diff_manifests(old, new) if status == 'MOVED'}
+    assert moves == {"n/one.bin": "r1/one.bin", "n/two.bin": "r2/two.bin"}
+
+
+def test_compares_by_another_recorded_algorithm(hg, tmp_path):
+    old = write(hg, tmp_path / "old.jsonl", {"a.txt": h("a")}, ("SHA256", "MD5"))
+    new = write(hg, tmp_path / "new.jsonl", {"a.txt": h("a")[:32] + h("9", 32)}, ("SHA256", "MD5"))
+    assert [s for s, _, _ in hg.diff_manifests(old, new)] == ['MODIFIED']  # SHA256 differs
+    assert list(hg.diff_manifests(old, new, "MD5")) == []  # the MD5 is the same
+
+
+def test_algorithm_not_recorded(hg, tmp_path):
+    old = write(hg, tmp_path / "old.jsonl", OLD)
+    with pytest.raises(Exception, match="no registra hashes"):
+        list(hg.diff_manifests(old, old, "MD5"))
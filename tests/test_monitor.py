@@ -0,0 +1,94 @@
+import os
+import queue
+import time
+
+import pytest
+
+
+@pytest.fixture
+def tree(tmp_path, make_file):
+    make_file("data/a.txt", b"alpha")
+    make_file("data/sub/b.txt", b"bravo")
+    return str(tmp_path / "data")
+
+
+def _events_until(job, stop, timeout=10.0):
+    """Events of a running job until stop(event) is true (or the job is done)."""
+    seen = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            event = job.events.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        seen.append(event)
+        if stop(event) or event[0] == 'done':
+            return seen
+    raise AssertionError(f"timed out; events so far: {seen}")
+
+
+def _create(hg, tree, manifest):
+    rc = hg.cli_main(["manifest", "create", tree, "-o", str(manifest), "--mode", "threads", "--no-cache"])
+    assert rc == hg.EXIT_OK
+
+
+@pytest.mark.parametrize("name", ["m.jsonl", "m.csv"])
+def test_changes_are_journaled_and_merged_on_stop(hg, tree, tmp_path, name):
+    manifest = tmp_path / name
+    _create(hg, tree, manifest)
+    before = manifest.read_bytes()
+    job = hg.MonitorJob(str(manifest), base=tree, poll=True, interval=0.05, workers=2).start()  # CSV has no base folder
+    _events_until(job, lambda e: e[0] == 'status' and e[2].startswith("Vigilando"))
+
+    with open(os.path.join(tree, "a.txt"), "ab") as f:
+        f.write(b" and more")
+    os.remove(os.path.join(tree, "sub", "b.txt"))
+    with open(os.path.join(tree, "new.txt"), "wb") as f:
+        f.write(b"charlie")
+    changes = {}
+    _events_until(job, lambda e: e[0] == 'change' and not changes.update({e[1]: e[2]['change']}) and len(changes) == 3)
+    assert changes == {"a.txt": "MODIFIED", os.path.join("sub", "b.txt"): "DELETED", "new.txt": "ADDED"}
+    assert manifest.read_bytes() == before  # only the sidecar journal is written while watching
+    assert os.path.exists(str(manifest) + hg.MONITOR_SUFFIX)
+
+    job.control.cancel()
+    assert _events_until(job, lambda e: False)[-1][0] == 'done'
+    assert not os.path.exists(str(manifest) + hg.MONITOR_SUFFIX)
+    _, entries = hg.open_manifest(str(manifest))
+    digests = {hg.manifest_entry_path(e): e['hash'] for e in entries}
+    assert digests == {"a.txt": hg.hashlib.sha256(b"alpha and more").hexdigest(),
+                       "new.txt": hg.hashlib.sha256(b"charlie").hexdigest()}
+
+
+def test_leftover_journal_is_merged_by_the_next_monitor(hg, tree, tmp_path):
+    manifest = tmp_path / "m.jsonl"
+    _create(hg, tree, manifest)
+    with hg.JobJournal(str(manifest) + hg.MONITOR_SUFFIX, {'kind': 'monitor', 'manifest': os.path.abspath(manifest)}) as j:
+        j.write({'path': os.path.join("sub", "b.txt"), 'deleted': True})
+    os.remove(os.path.join(tree, "sub", "b.txt"))
+    job = hg.MonitorJob(str(manifest), poll=True, interval=0.05, workers=1).start()
+    events = _events_until(job, lambda e: e[0] == 'status' and e[2].startswith("Vigilando"))
+    assert not [e for e in events if e[0] in ('change', 'error')]  # already known from the journal
+    job.control.cancel()
+    _events_until(job, lambda e: False)
+    _, entries = hg.open_manifest(str(manifest))
+    assert [hg.manifest_entry_path(e) for e in entries] == ["a.txt"]
+
+
+def test_txt_manifest_is_refused(hg, tree, tmp_path):
+    manifest = tmp_path / "m.txt"
+    _create(hg, tree, manifest)
+    before = manifest.read_bytes()
+    job = hg.MonitorJob(str(manifest), poll=True, interval=0.05).start()
+    events = _events_until(job, lambda e: False)
+    errors = [e for e in events if e[0] == 'error']
+    assert errors and errors[0][1] is None and "JSONL" in errors[0][2]
+    assert manifest.read_bytes() == before
+
+
+def test_poll_period_backs_off_for_slow_passes(hg):
+    watcher = hg.PollWatcher(1.0)
+    watcher.pass_took(0.05)
+    assert watcher.period == 1.0
+    watcher.pass_took(0.5)
+    assert watcher.period == pytest.approx(0.5 / hg.MONITOR_POLL_DUTY)
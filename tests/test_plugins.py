@@ -0,0 +1,84 @@
+import functools
+import sys
+
+import pytest
+
+PLUGIN = '''
+class Sum8:
+    def __init__(self):
+        self.value = 0
+    def update(self, data):
+        self.value = (self.value + sum(data)) & 0xFF
+    def hexdigest(self):
+        return format(self.value, '02x')
+
+def register(register_algorithm):
+    register_algorithm("TEST-SUM8", Sum8, 1, cryptographic=False)
+'''
+
+
+@pytest.fixture
+def plugins(hg, tmp_path, monkeypatch):
+    """A plugins folder nobody has looked in yet; what its plugins register is dropped afterwards."""
+    folder = tmp_path / "plugins"
+    folder.mkdir()
+    monkeypatch.setattr(hg, "_plugins", None)
+    monkeypatch.setattr(hg, "plugin_files", functools.partial(hg.plugin_files, folder))
+    before = set(hg.ALGORITHMS)
+    yield folder
+    for name in set(hg.ALGORITHMS) - before:
+        del hg.ALGORITHMS[name]
+        del hg._ALGO_NAMES[name.upper()]
+        if name in hg.SUPPORTED_ALGOS:
+            hg.SUPPORTED_ALGOS.remove(name)
+
+
+def test_plugins_load_on_first_unknown_name(hg, plugins, make_file):
+    (plugins / "sum8.py").write_text(PLUGIN)
+    assert hg.parse_algo_list("SHA256, MD5") == ["SHA256", "MD5"]
+    assert hg._plugins is None  # built-in names don't need them
+    assert hg.parse_algo_list("test-sum8") == ["TEST-SUM8"]
+    assert hg._plugins == [str(plugins / "sum8.py")]
+    digests, _, _ = hg.compute_hashes_file_sync(make_file("a", b"\x01\x02\xff"), ["TEST-SUM8"])
+    assert digests["TEST-SUM8"] == "02"
+
+
+def test_unknown_name_still_fails_after_loading(hg, plugins):
+    with pytest.raises(Exception, match="no soportado"):
+        hg.algorithm_info("NOPE")
+    assert hg._plugins == []
+
+
+def test_broken_plugin_is_reported(hg, plugins, capsys):
+    (plugins / "broken.py").write_text("raise RuntimeError('boom')\n")
+    assert hg.cli_main(["algorithms"]) == hg.EXIT_OK
+    err = capsys.readouterr().err
+    assert "Plugin omitido: broken.py: boom" in err
+
+
+def test_spawned_workers_get_the_parent_plugins(hg, plugins):
+    path = plugins / "sum8.py"
+    path.write_text(PLUGIN)
+    hg._apply_engine_settings({}, [str(path)])  # what a process-pool worker runs first
+    assert "TEST-SUM8" in hg.SUPPORTED_ALGOS
+
+
+def test_dotted_requires_checks_the_submodule_without_importing(hg, tmp_path, monkeypatch):
+    pkg = tmp_path / "fakecrypto" / "Hash"
+    pkg.mkdir(parents=True)
+    (tmp_path / "fakecrypto" / "__init__.py").write_text("raise ImportError('imported')\n")
+    (pkg / "__init__.py").write_text("")
+    (pkg / "SHA256.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    assert hg._module_available("fakecrypto")
+    assert hg._module_available("fakecrypto.Hash.SHA256")
+    assert not hg._module_available("fakecrypto.Hash.Whirlpool")
+    assert not hg._module_available("fakecrypto.Nope.Whirlpool")
+    assert "fakecrypto" not in sys.modules
+
+
+def test_plugin_algorithm_in_process_mode(hg, plugins, make_file, capsys):
+    (plugins / "sum8.py").write_text(PLUGIN)
+    path = make_file("a", b"\x01\x02\xff")
+    assert hg.cli_main(["batch", path, "-a", "TEST-SUM8", "--mode", "processes", "--workers", "2"]) == hg.EXIT_OK
+    assert "02" in capsys.readouterr().out
@@ -0,0 +1,33 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGET = 0.050  # seconds a CLI run may add to the bare interpreter's own startup
+RUNS = 25  # at most; sampling stops once the best times meet the target
+
+
+def test_cli_cold_start(tmp_path):
+    """`hash` of a small file in a fresh interpreter, with the module's bytecode cached by the first run."""
+    for name in ("Hash_Generator_v3.0.py", "hash_generator.py"):
+        shutil.copy(ROOT / name, tmp_path / name)
+    (tmp_path / "a.txt").write_bytes(b"alpha")
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    cli = [sys.executable, "Hash_Generator_v3.0.py", "hash", "--no-cache", "a.txt"]
+    bare = [sys.executable, "-c", "pass"]
+    subprocess.run(cli, cwd=tmp_path, env=env, check=True, capture_output=True)
+    assert list((tmp_path / "__pycache__").glob("hash_generator.*.pyc"))
+    best = {'cli': float('inf'), 'bare': float('inf')}
+    for _ in range(RUNS):  # interleaved, best of each: a busy spell of the machine shouldn't count
+        for key, cmd in (('cli', cli), ('bare', bare)):
+            start = time.perf_counter()
+            subprocess.run(cmd, cwd=tmp_path, env=env, check=True, capture_output=True)
+            best[key] = min(best[key], time.perf_counter() - start)
+        overhead = best['cli'] - best['bare']
+        if overhead < TARGET:
+            break
+    assert overhead < TARGET, f"CLI startup {overhead * 1000:.0f} ms over the bare interpreter (target {TARGET * 1000:.0f} ms)"
@@ -0,0 +1,83 @@
+import hashlib
+import os
+
+import pytest
+
+TREE = "SHA256-TREE-64M"
+LEAF = 1000
+
+
+@pytest.fixture(autouse=True)
+def small_leaves(hg, monkeypatch):
+    """1000-byte leaves, so a few KB make a tree with odd levels and a short last leaf."""
+    monkeypatch.setitem(hg.TREE_ALGOS, TREE, ("SHA256", LEAF))
+
+
+def _leaf(data):
+    return hashlib.sha256(b"\x00" + data).digest()
+
+
+def test_root_layout(hg, make_file):
+    data = os.urandom(2500)  # leaves 0-999, 1000-1999, 2000-2499
+    l0, l1, l2 = _leaf(data[:1000]), _leaf(data[1000:2000]), _leaf(data[2000:])
+    root = hashlib.sha256(b"\x01" + hashlib.sha256(b"\x01" + l0 + l1).digest() + l2).hexdigest()  # odd node moves up
+    assert hg.tree_hash_file(make_file("f", data), TREE)[0] == root
+    assert hg.tree_root("SHA256", []) == _leaf(b"").hex()
+
+
+@pytest.mark.parametrize("size", [0, 1, 999, 1000, 1001, 2500, 7000, 16001])
+def test_sequential_root_equals_parallel_root(hg, make_file, size):
+    data = os.urandom(size)
+    root, leaves = hg.tree_hash_file(make_file("f", data), TREE, workers=4)
+    h = hg.TreeHash(TREE)
+    h.update(data)
+    assert h.hexdigest() == root
+    assert h.all_leaves() == leaves
+    assert len(leaves) == max(1, -(-size // LEAF))
+
+
+@pytest.mark.parametrize("chunk", [7, 999, 1000, 4096, 1 << 20])
+def test_root_is_stable_across_chunk_sizes(hg, make_file, engine_settings, chunk):
+    data = os.urandom(12_345)
+    path = make_file("f", data)
+    expected = hg.tree_hash_file(path, TREE)[0]
+    h = hg.TreeHash(TREE)
+    for i in range(0, len(data), chunk):
+        h.update(data[i:i + chunk])
+    assert h.hexdigest() == expected
+    engine_settings['chunk_size'] = chunk
+    assert hg.compute_hashes_file_sync(path, [TREE, "MD5"])[0][TREE] == expected
+
+
+def test_mixed_with_other_algorithms_in_one_pass(hg, make_file):
+    data = os.urandom(5_500)
+    path = make_file("f", data)
+    root, leaves = hg.tree_hash_file(path, TREE)
+    stats = {}
+    digests, _, _ = hg.compute_hashes_file_sync(path, ["MD5", TREE, "SHA256"], stats=stats)
+    assert digests == {"MD5": hashlib.md5(data).hexdigest(), TREE: root, "SHA256": hashlib.sha256(data).hexdigest()}
+    assert stats['leaves'][TREE] == leaves
+
+
+def test_verify_names_the_corrupted_leaf(hg, make_file):
+    path = make_file("f", os.urandom(5_500))
+    root, leaves = hg.tree_hash_file(path, TREE)
+    with open(path, "r+b") as f:
+        f.seek(2_345)
+        f.write(b"\x00\xff")
+    arg = (path, {TREE: root}, {TREE: leaves})
+    assert hg.verify_hash_task(arg) == ('MISMATCH', f"{TREE} bytes 2000-2999")
+    assert hg.verify_hash_task(arg + ((0, 2000),)) == ('OK', "(bytes 0-2000)")
+    assert hg.verify_hash_task(arg + ((1_500, 2_400),)) == ('MISMATCH', f"{TREE} bytes 2000-2999")
+
+
+def test_verify_from_a_manifest(hg, tmp_path, make_file, capsys):
+    make_file("data/f.bin", os.urandom(4_200))
+    manifest = str(tmp_path / "m.jsonl")
+    assert hg.cli_main(["manifest", "create", str(tmp_path / "data"), "-o", manifest, "-a", TREE, "--mode", "threads"]) == hg.EXIT_OK
+    with open(tmp_path / "data" / "f.bin", "r+b") as f:
+        f.seek(4_100)
+        f.write(b"!")
+    capsys.readouterr()
+    assert hg.cli_main(["manifest", "verify", manifest, "--mode", "threads"]) == hg.EXIT_DIFF
+    assert f"f.bin - MISMATCH {TREE} bytes 4000-4999" in capsys.readouterr().out
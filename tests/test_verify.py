@@ -0,0 +1,147 @@
+import errno
+import functools
+import hashlib
+import os
+
+import pytest
+
+
+def test_hash_tier_reports_unreadable_files_as_errors(hg, make_file, monkeypatch):
+    path = make_file("b.txt", b"bravo")
+
+    def failing(p, *a, **kw):
+        raise OSError(errno.EIO, "Input/output error", p)
+    monkeypatch.setattr(hg, "compute_hashes_file_sync", failing)
+    assert hg.verify_hash_task((path, {"SHA256": hashlib.sha256(b"bravo").hexdigest()})) == ('ERROR', f"[Errno 5] Input/output error: '{path}'")
+
+
+def test_hash_tier_on_a_directory(hg, tmp_path):
+    status, _ = hg.verify_hash_task((str(tmp_path), {"SHA256": "00" * 32}))
+    assert status == 'ERROR'
+
+
+def test_hash_tier_other_failures_propagate(hg, make_file, monkeypatch):
+    def broken(*a, **kw):
+        raise ValueError("bug")
+    monkeypatch.setattr(hg, "compute_hashes_file_sync", broken)
+    with pytest.raises(ValueError):
+        hg.verify_hash_task((make_file("a"), {"SHA256": "00" * 32}))
+
+
+def test_entry_with_only_secondary_digests(hg, make_file, tmp_path):
+    path = make_file("a.txt", b"alpha")
+    entries = [{'path': "a.txt", 'hashes': {"MD5": hashlib.md5(b"alpha").hexdigest()}}, {'path': "none.txt", 'size': 3}]
+    plan = list(hg.plan_verification(entries, "SHA256", str(tmp_path)))
+    assert [rec[2] for rec in plan] == [{"MD5": hashlib.md5(b"alpha").hexdigest()}, {}]
+    assert hg.verify_hash_task((path, plan[0][2])) == ('OK', '')
+    assert hg.verify_hash_task((path, plan[1][2])) == ('ERROR', '(no recorded digest)')
+
+
+@pytest.fixture
+def tree(tmp_path, make_file):
+    make_file("data/a.txt", b"alpha")
+    make_file("data/sub/b.txt", b"bravo")
+    make_file("data/big.bin", os.urandom(2 * 1024 * 1024))
+    return str(tmp_path / "data")
+
+
+@pytest.fixture
+def manifest(hg, tree, tmp_path):
+    out = str(tmp_path / "m.jsonl")
+    assert hg.cli_main(["manifest", "create", tree, "-o", out, "--mode", "threads", "--no-cache"]) == hg.EXIT_OK
+    return out
+
+
+def _edit_keeping_stat(path, offset, data):
+    """Overwrite bytes in place and put the mtime back, so only reading the content can tell."""
+    st = os.stat(path)
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(data)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def _verify(hg, manifest, level, extra=True):
+    header, entries = hg.open_manifest(manifest)
+    base = header['base_folder']
+    job = hg.VerifyJob(hg.plan_verification(entries, header['algorithm'], base), level=level, base=base if extra else None,
+                       skip_extra=[manifest], mode="Hilos")
+    results, extras = {}, []
+
+    def on_event(kind, key, value):
+        if kind == 'result':
+            results[key.replace(os.sep, "/")] = value[0]
+        elif kind == 'extra':
+            extras.append(value)
+        elif kind == 'error':
+            raise AssertionError((key, value))
+    assert not hg.run_job_blocking(job, on_event)
+    return results, extras
+
+
+def _no_reads(hg, monkeypatch):
+    def read(*a, **kw):
+        raise AssertionError("file content read")
+    monkeypatch.setattr(hg, "compute_hashes_file_sync", read)
+    monkeypatch.setattr(hg, "sample_digest", read)
+
+
+def test_stat_tier(hg, tmp_path):
+    path = tmp_path / "f"
+    path.write_bytes(b"12345")
+    st = os.stat(path)
+    meta = {'size': 5, 'mtime_ns': st.st_mtime_ns}
+    assert hg.stat_check(str(tmp_path / "gone"), meta, "full") == ('MISSING', '')
+    assert hg.stat_check(str(path), dict(meta, size=6), "full")[0] == 'SIZE_MISMATCH'
+    assert hg.stat_check(str(path), meta, "full") is None  # passed on
+    assert hg.stat_check(str(path), meta, "quick") == ('OK', '(stat)')
+    assert hg.stat_check(str(path), dict(meta, mtime_ns=1), "quick") == ('MTIME_CHANGED', '')
+
+
+def test_quick_level_never_reads_content(hg, manifest, tree, monkeypatch):
+    _no_reads(hg, monkeypatch)
+    results, extras = _verify(hg, manifest, "quick")
+    assert results == {"a.txt": 'OK', "sub/b.txt": 'OK', "big.bin": 'OK'}
+    assert extras == []
+
+
+def test_sample_tier(hg, tmp_path):
+    path = tmp_path / "f"
+    path.write_bytes(os.urandom(100_000))
+    meta = {'sample': hg.sample_digest(str(path))}
+    assert hg.sample_check(str(path), meta, "sample") == ('OK', '(muestreo)')
+    assert hg.sample_check(str(path), meta, "full") is None
+    assert hg.sample_check(str(path), {}, "sample") == ('OK', '(stat)')
+    _edit_keeping_stat(path, 50_000, b"\0" * 10)
+    assert hg.sample_check(str(path), meta, "full") == ('SAMPLE_MISMATCH', '')
+
+
+def test_sample_level_catches_a_same_size_edit(hg, manifest, tree, monkeypatch):
+    _edit_keeping_stat(os.path.join(tree, "sub", "b.txt"), 0, b"B")
+    monkeypatch.setattr(hg, "compute_hashes_file_sync", lambda *a, **kw: pytest.fail("full hash at sample level"))
+    results, _ = _verify(hg, manifest, "sample")
+    assert results == {"a.txt": 'OK', "sub/b.txt": 'SAMPLE_MISMATCH', "big.bin": 'OK'}
+
+
+def test_full_level_catches_an_edit_between_samples(hg, manifest, tree):
+    _edit_keeping_stat(os.path.join(tree, "big.bin"), 100_000, b"\xff" * 16)  # between the first two sampled blocks
+    assert _verify(hg, manifest, "sample")[0]["big.bin"] == 'OK'
+    assert _verify(hg, manifest, "full")[0] == {"a.txt": 'OK', "sub/b.txt": 'OK', "big.bin": 'MISMATCH'}
+
+
+def test_extra_files_with_spilled_sort_runs(hg, manifest, tree, monkeypatch):
+    monkeypatch.setattr(hg, "external_sort", functools.partial(hg.external_sort, run_lines=2))
+    for i in range(7):
+        with open(os.path.join(tree, "sub", f"new{i}.txt"), "wb") as f:
+            f.write(b"x")
+    os.remove(os.path.join(tree, "a.txt"))
+    results, extras = _verify(hg, manifest, "quick")
+    assert results["a.txt"] == 'MISSING'
+    assert sorted(extras) == sorted(os.path.join("sub", f"new{i}.txt") for i in range(7))
+    assert _verify(hg, manifest, "quick", extra=False)[1] == []
+
+
+def test_external_sort_merges_runs(hg):
+    lines = [f"{i * 7919 % 1000:04d}" for i in range(1000)]
+    assert list(hg.external_sort(iter(lines), run_lines=64)) == sorted(lines)
+    assert list(hg.external_sort(iter([]), run_lines=64)) == []
@@ -0,0 +1,175 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def tree(tmp_path, make_file):
+    make_file("root/a.txt", b"a" * 5)
+    make_file("root/b.log", b"b" * 500)
+    make_file("root/big.bin", b"c" * 10_000)
+    make_file("root/sub/c.txt", b"d" * 2_000)
+    make_file("root/sub/deep/d.TXT", b"e")
+    make_file("root/.git/config")
+    make_file("root/node_modules/x/y.js")
+    return str(tmp_path / "root")
+
+
+def _walk(hg, root, options=None, skip=()):
+    return sorted(os.path.relpath(p, root).replace(os.sep, "/") for p, _ in hg.walk_files(root, options, skip))
+
+
+ALL = [".git/config", "a.txt", "b.log", "big.bin", "node_modules/x/y.js", "sub/c.txt", "sub/deep/d.TXT"]
+
+
+def test_defaults_walk_everything(hg, tree):
+    assert _walk(hg, tree) == ALL
+    assert all(st.st_size == os.path.getsize(p) for p, st in hg.walk_files(tree))
+
+
+@pytest.mark.parametrize("include,expected", [
+    (["*.txt"], ["a.txt", "sub/c.txt"]),  # case-sensitive
+    (["*.txt", "*.TXT"], ["a.txt", "sub/c.txt", "sub/deep/d.TXT"]),
+    (["sub/*"], ["sub/c.txt", "sub/deep/d.TXT"]),  # against the relative path too; '*' crosses '/'
+    (["re:.*\\.(log|bin)$"], ["b.log", "big.bin"]),
+    (["re:[ab]\\."], ["a.txt", "b.log"]),  # anchored at the start, like a glob
+])
+def test_include(hg, tree, include, expected):
+    assert _walk(hg, tree, hg.WalkOptions(include=include)) == expected
+
+
+@pytest.mark.parametrize("exclude,expected", [
+    ([".git", "node_modules"], ["a.txt", "b.log", "big.bin", "sub/c.txt", "sub/deep/d.TXT"]),
+    (["deep"], [p for p in ALL if p != "sub/deep/d.TXT"]),  # a directory name anywhere prunes it
+    (["sub/deep"], [p for p in ALL if p != "sub/deep/d.TXT"]),
+    (["*.log", "re:.*\\.bin$"], [p for p in ALL if p not in ("b.log", "big.bin")]),
+])
+def test_exclude(hg, tree, exclude, expected):
+    assert _walk(hg, tree, hg.WalkOptions(exclude=exclude)) == expected
+
+
+def test_excluded_directories_are_not_listed(hg, tree, monkeypatch):
+    listed = []
+    real = os.scandir
+
+    def scandir(path):
+        listed.append(os.path.relpath(path, tree).replace(os.sep, "/"))
+        return real(path)
+    monkeypatch.setattr(os, "scandir", scandir)
+    _walk(hg, tree, hg.WalkOptions(exclude=["node_modules", "sub"]))
+    assert sorted(listed) == [".", ".git"]
+
+
+def test_exclude_wins_over_include(hg, tree):
+    assert _walk(hg, tree, hg.WalkOptions(include=["*.txt"], exclude=["sub"])) == ["a.txt"]
+
+
+def test_size_bounds(hg, tree):
+    assert _walk(hg, tree, hg.WalkOptions(min_size="500", max_size="2000")) == ["b.log", "sub/c.txt"]  # both inclusive
+    assert _walk(hg, tree, hg.WalkOptions(min_size="9K")) == ["big.bin"]
+    assert _walk(hg, tree, hg.WalkOptions(max_size=0)) == [".git/config", "node_modules/x/y.js"]
+
+
+def test_parse_size(hg):
+    assert [hg.parse_size(t) for t in ("512", "64K", "1.5g", "2MB", " 1T ", "", None, 7)] == [
+        512, 64 << 10, 3 << 29, 2 << 20, 1 << 40, None, None, 7]
+    with pytest.raises(Exception, match="Tamaño no válido"):
+        hg.parse_size("12Q")
+
+
+@pytest.fixture
+def links(tmp_path, make_file):
+    make_file("root/f.txt", b"f")
+    make_file("outside/o.txt", b"o")
+    make_file("outside/inner/i.txt", b"i")
+    root = tmp_path / "root"
+    os.symlink(tmp_path / "root" / "f.txt", root / "f-link.txt")
+    os.symlink(tmp_path / "outside", root / "out")
+    os.symlink(tmp_path / "outside", root / "out-again")  # the same directory twice
+    os.symlink(tmp_path / "outside" / "inner", root / "inner")  # and one also reachable through "out"
+    os.symlink(root, tmp_path / "outside" / "back")  # a loop back to the root
+    os.symlink(tmp_path / "gone", root / "dangling")
+    return str(root)
+
+
+def test_symlinks_files(hg, links):
+    assert _walk(hg, links) == ["f-link.txt", "f.txt"]  # linked files, but no linked directories
+
+
+def test_symlinks_skip(hg, links):
+    assert _walk(hg, links, hg.WalkOptions(symlinks="skip")) == ["f.txt"]
+
+
+def test_symlinks_follow_walks_each_directory_once(hg, links):
+    walked = _walk(hg, links, hg.WalkOptions(symlinks="follow"))
+    assert walked[:2] == ["f-link.txt", "f.txt"]
+    outside = sorted(walked[2:], key=os.path.basename)
+    assert [os.path.basename(p) for p in outside] == ["i.txt", "o.txt"]  # through whichever link came first
+    assert outside[1] in ("out/o.txt", "out-again/o.txt")
+    assert not any("back" in p for p in walked)  # the loop to the root was cut
+
+
+def test_invalid_symlink_policy(hg):
+    with pytest.raises(Exception, match="enlaces no válida"):
+        hg.WalkOptions(symlinks="always")
+
+
+class _Entry:
+    """A DirEntry whose stat() reports another device for the names in other_fs."""
+    def __init__(self, entry, other_fs):
+        self._entry, self._other_fs = entry, other_fs
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def stat(self, **kw):
+        st = self._entry.stat(**kw)
+        if self.name not in self._other_fs:
+            return st
+        fields = list(st)
+        fields[2] += 1  # st_dev
+        return os.stat_result(fields)
+
+
+class _Scandir:
+    def __init__(self, it, other_fs):
+        self._it, self._other_fs = it, other_fs
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._it.close()
+
+    def __iter__(self):
+        return (_Entry(e, self._other_fs) for e in self._it)
+
+
+def test_same_fs(hg, tree, monkeypatch):
+    real = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: _Scandir(real(path), {"sub", "big.bin"}))  # a mount point and a file on it
+    assert _walk(hg, tree, hg.WalkOptions(same_fs=True)) == [".git/config", "a.txt", "b.log", "node_modules/x/y.js"]
+    assert _walk(hg, tree) == ALL
+
+
+def test_skip(hg, tree):
+    skip = [os.path.join(tree, "a.txt"), os.path.join(tree, "sub", ".", "c.txt"), os.path.join(tree, "nothing")]  # normalized
+    assert _walk(hg, tree, skip=skip) == [p for p in ALL if p not in ("a.txt", "sub/c.txt")]
+
+
+def test_unreadable_directory_is_skipped(hg, tree, monkeypatch):
+    real = os.scandir
+
+    def scandir(path):
+        if os.path.basename(path) == "sub":
+            raise PermissionError(13, "Permission denied", path)
+        return real(path)
+    monkeypatch.setattr(os, "scandir", scandir)
+    assert _walk(hg, tree) == [p for p in ALL if not p.startswith("sub/")]
+
+
+def test_options_round_trip(hg):
+    opts = hg.WalkOptions(["*.txt"], ["re:tmp"], "1K", None, "skip", True)
+    assert hg.WalkOptions.from_dict(opts.to_dict()).to_dict() == opts.to_dict() == {
+        'include': ["*.txt"], 'exclude': ["re:tmp"], 'min_size': 1024, 'max_size': None, 'symlinks': "skip", 'same_fs': True}
+    assert hg.WalkOptions.from_dict(None).is_default() and not opts.is_default()